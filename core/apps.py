@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .metrics import install_query_tracking
+        from . import signals  # noqa: F401
+        connection_created.connect(install_query_tracking, dispatch_uid='core_query_tracking')
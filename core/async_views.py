@@ -0,0 +1,177 @@
+"""Async (ASGI) variants of the read-heavy views, served under ``api/async/``.
+
+DRF's APIView is sync-only, so these are plain Django views with ``async def``
+handlers. They use the async ORM and cache API, authenticate the JWT
+themselves (through the same user cache as CachedJWTAuthentication), and
+return the same JSON as their sync counterparts in views.py.
+Under a WSGI server they still work but gain nothing.
+"""
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken,TokenError
+from .authentication import aload_auth_user,token_user_id
+from .caching import acached_summary,asummary_cache_key,log_cache_status
+from .conditional import aconditional_get
+from .fast_serializers import FastGoalSerializer,FastProgressSerializer
+from .models import Goal,Progress,ProgressRollup
+from .pagination import CustomPagination,KeysetPagination
+from .serializers import GoalSerializer,ProgressSerializer
+from .summaries import abuild_summary
+from .throttling import TierUserThrottle
+
+logger=logging.getLogger(__name__)
+
+jwt_authentication=JWTAuthentication()
+
+
+async def authenticate(request):
+    """The active user named by the request's JWT access token, or None."""
+    header=jwt_authentication.get_header(request)
+    raw_token=jwt_authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        user_id=token_user_id(jwt_authentication.get_validated_token(raw_token))
+    except (InvalidToken,TokenError):
+        return None
+    user=await aload_auth_user(user_id)
+    return user if user is not None and user.is_active else None
+
+
+async def goal_id_for_number(user,goalNum):
+    return await Goal.objects.filter(user=user,ordinal=goalNum).values_list('id',flat=True).afirst()
+
+
+class AsyncAPIView(View):
+    """JWT-authenticated async view; ``self.api_request`` is a DRF Request for pagination and throttles."""
+    throttle_classes=()
+
+    async def dispatch(self,request,*args,**kwargs):
+        user=await authenticate(request)
+        if user is None:
+            return JsonResponse({'detail':'Authentication credentials were not provided.'},status=401)
+        request.user=user
+        self.api_request=Request(request)
+        self.api_request.user=user
+
+        for throttle_class in self.throttle_classes:
+            throttle=throttle_class()
+            if not await sync_to_async(throttle.allow_request)(self.api_request,self):
+                wait=throttle.wait()
+                response=JsonResponse({'detail':'Request was throttled.'},status=429)
+                if wait is not None:
+                    response['Retry-After']=str(int(wait))
+                return response
+
+        try:
+            return await super().dispatch(request,*args,**kwargs)
+        except NotFound as exc:
+            return JsonResponse({'detail':str(exc.detail)},status=404)
+        except Exception as exc:
+            # Same JSON 500 as the sync views, not Django's HTML error page.
+            logger.exception("Async view %s failed",type(self).__name__)
+            return JsonResponse({'error':f'Server error: {str(exc)}'},status=500)
+
+
+class AsyncSummaryView(AsyncAPIView):
+    kind=None
+    granularity=None
+    timeout_setting=None
+
+    @aconditional_get
+    async def get(self,request,goalNum=None):
+        cache_key=await asummary_cache_key(self.kind,request.user.id,goalNum)
+
+        async def compute():
+            goal_id=None
+            if goalNum is not None:
+                goal_id=await goal_id_for_number(request.user,goalNum)
+                if goal_id is None:
+                    return None
+            return await abuild_summary(request.user.id,self.granularity,goal_id)
+
+        data,hit=await acached_summary(cache_key,compute,getattr(settings,self.timeout_setting,300))
+        log_cache_status(logger,cache_key,hit=hit)
+        if data is None:
+            return JsonResponse({'error':'Invalid goal number'},status=400)
+        return JsonResponse(data,safe=False)
+
+
+class AsyncWeeklySummaryView(AsyncSummaryView):
+    kind='weekly'
+    granularity=ProgressRollup.Granularity.WEEK
+    timeout_setting='WEEKLY_SUMMARY_CACHE_TIMEOUT'
+
+
+class AsyncMonthlySummaryView(AsyncSummaryView):
+    kind='monthly'
+    granularity=ProgressRollup.Granularity.MONTH
+    timeout_setting='MONTHLY_SUMMARY_CACHE_TIMEOUT'
+
+
+class AsyncGoalsView(AsyncAPIView):
+    pagination_class=CustomPagination
+    cursor_pagination_class=KeysetPagination
+
+    @aconditional_get
+    async def get(self,request,goalNum=None):
+        goals=Goal.objects.filter(user=request.user)
+        category=request.GET.get('category')
+        is_complete=request.GET.get('is_complete')
+        if category:
+            goals=goals.filter(category=category)
+        if is_complete:
+            goals=goals.filter(is_complete=is_complete)
+
+        if goalNum:
+            if category or is_complete:
+                goal=await goals.order_by('id')[goalNum-1:goalNum].afirst()
+            else:
+                goal=await goals.filter(ordinal=goalNum).afirst()
+            if goal is None:
+                return JsonResponse({"error":"Goal not found"},status=404)
+            return JsonResponse(GoalSerializer(goal).data)
+
+        if self.cursor_pagination_class.requested(self.api_request):
+            paginator=self.cursor_pagination_class()
+        else:
+            goals=goals.order_by('id')
+            paginator=self.pagination_class()
+        rows=FastGoalSerializer.values(goals)
+        page=await paginator.apaginate_queryset(rows,self.api_request)
+        if page is not None:
+            return JsonResponse(paginator.get_paginated_response(FastGoalSerializer.serialize(page)).data)
+        return JsonResponse(FastGoalSerializer.serialize([row async for row in rows]),safe=False)
+
+
+class AsyncProgressView(AsyncAPIView):
+    throttle_classes=(TierUserThrottle,)
+    cursor_pagination_class=KeysetPagination
+
+    @aconditional_get
+    async def get(self,request,goalNum,progressNum=None):
+        goal_id=await goal_id_for_number(request.user,goalNum)
+        if goal_id is None:
+            return JsonResponse({"error":"invalid goalNum"},status=404)
+
+        progresses=Progress.objects.filter(goal_id=goal_id).order_by("id")
+
+        if progressNum:
+            progress=await progresses.filter(ordinal=progressNum).afirst()
+            if progress is None:
+                return JsonResponse({"error":"invalid progressNum"},status=404)
+            return JsonResponse(ProgressSerializer(progress).data)
+
+        rows=FastProgressSerializer.values(progresses)
+        if self.cursor_pagination_class.requested(self.api_request):
+            paginator=self.cursor_pagination_class()
+            page=await paginator.apaginate_queryset(rows,self.api_request)
+            return JsonResponse(paginator.get_paginated_response(FastProgressSerializer.serialize(page)).data)
+
+        return JsonResponse(FastProgressSerializer.serialize([row async for row in rows]),safe=False)
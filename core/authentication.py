@@ -0,0 +1,72 @@
+"""JWT authentication that does not query the user table on every request.
+
+The user row JWTAuthentication needs (id, username, tier and the flags
+permissions look at) is cached by user id and rebuilt into a CustomUser with
+every other field deferred, so views and throttles keep working unchanged and
+only touching a deferred field (email, password, ...) costs a query.
+CustomUser.save/delete drop the cached row, so tier changes and deactivation
+apply to the next request.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed,InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .caching import AUTH_USER_KEY,auth_user_cache
+from .models import CustomUser
+
+# In model field order, as Model.from_db expects.
+AUTH_USER_FIELDS=('id','is_superuser','username','is_staff','is_active','tier')
+
+
+def _timeout():
+    return getattr(settings,'AUTH_USER_CACHE_TIMEOUT',60*15)
+
+
+def _user_from_row(row):
+    return CustomUser.from_db(DEFAULT_DB_ALIAS,AUTH_USER_FIELDS,row)
+
+
+def load_auth_user(user_id):
+    """A CustomUser with only AUTH_USER_FIELDS loaded, or None if there is no such user."""
+    key=AUTH_USER_KEY.format(user_id=user_id)
+    row=auth_user_cache.get(key)
+    if row is None:
+        row=CustomUser.objects.filter(pk=user_id).values_list(*AUTH_USER_FIELDS).first()
+        if row is None:
+            return None
+        auth_user_cache.set(key,row,timeout=_timeout())
+    return _user_from_row(row)
+
+
+async def aload_auth_user(user_id):
+    key=AUTH_USER_KEY.format(user_id=user_id)
+    row=await auth_user_cache.aget(key)
+    if row is None:
+        row=await CustomUser.objects.filter(pk=user_id).values_list(*AUTH_USER_FIELDS).afirst()
+        if row is None:
+            return None
+        await auth_user_cache.aset(key,row,timeout=_timeout())
+    return _user_from_row(row)
+
+
+def token_user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self,validated_token):
+        # Revocation compares the password hash, which is not cached.
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD!='id':
+            return super().get_user(validated_token)
+
+        user=load_auth_user(token_user_id(validated_token))
+        if user is None:
+            raise AuthenticationFailed(_("User not found"),code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"),code="user_inactive")
+        return user
@@ -0,0 +1,175 @@
+"""A two-tier cache: a small per-process LRU (L1) in front of a shared cache alias (L2).
+
+Configure it as its own alias and point ``SHARED`` at the shared one::
+
+    'tiered': {
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'LOCATION': 'learnflow-l1',
+        'OPTIONS': {'SHARED': 'default', 'MAX_ENTRIES': 1000, 'LOCAL_TIMEOUT': 5},
+    }
+
+L1 entries live at most ``LOCAL_TIMEOUT`` seconds and are never copied, so
+cached values must be treated as read-only. Writes go through to L2, but
+another process only sees them once its own L1 entry expires. Use the tier
+for keys that change name when their data changes (the generation-versioned
+summary keys), and keep counters, generations and locks on the shared alias.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT,BaseCache
+
+# L1 state is per process, not per thread: Django hands each thread its own
+# backend instance, so the store is shared by LOCATION like LocMemCache does.
+_stores={}
+_stores_lock=threading.Lock()
+
+
+class LocalStore:
+    def __init__(self):
+        self.lock=threading.Lock()
+        self.entries=OrderedDict()
+        self.l1_hits=0
+        self.l2_hits=0
+        self.misses=0
+
+    def record(self,tier):
+        with self.lock:
+            setattr(self,tier,getattr(self,tier)+1)
+
+
+def local_store(name):
+    with _stores_lock:
+        return _stores.setdefault(name,LocalStore())
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self,location,params):
+        super().__init__(params)
+        options=params.get('OPTIONS',{})
+        self.shared_alias=options.get('SHARED','default')
+        self.local_timeout=options.get('LOCAL_TIMEOUT',5)
+        self.store=local_store(location or self.shared_alias)
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_get(self,key):
+        store=self.store
+        with store.lock:
+            entry=store.entries.get(key)
+            if entry is None:
+                return None
+            expires_at,value=entry
+            if expires_at<=time.monotonic():
+                del store.entries[key]
+                return None
+            store.entries.move_to_end(key)
+            store.l1_hits+=1
+            return entry
+
+    def _local_set(self,key,value,timeout):
+        ttl=self.local_timeout if timeout is None else min(self.local_timeout,timeout)
+        if ttl<=0:
+            return
+        store=self.store
+        with store.lock:
+            store.entries[key]=(time.monotonic()+ttl,value)
+            store.entries.move_to_end(key)
+            while len(store.entries)>self._max_entries:
+                store.entries.popitem(last=False)
+
+    def _local_delete(self,key):
+        with self.store.lock:
+            self.store.entries.pop(key,None)
+
+    def _timeout(self,timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self,key,default=None,version=None):
+        local_key=self.make_and_validate_key(key,version=version)
+        entry=self._local_get(local_key)
+        if entry is not None:
+            return entry[1]
+        sentinel=object()
+        value=self.shared.get(key,sentinel,version=version)
+        if value is sentinel:
+            self.store.record('misses')
+            return default
+        self.store.record('l2_hits')
+        self._local_set(local_key,value,None)
+        return value
+
+    async def aget(self,key,default=None,version=None):
+        local_key=self.make_and_validate_key(key,version=version)
+        entry=self._local_get(local_key)
+        if entry is not None:
+            return entry[1]
+        sentinel=object()
+        value=await self.shared.aget(key,sentinel,version=version)
+        if value is sentinel:
+            self.store.record('misses')
+            return default
+        self.store.record('l2_hits')
+        self._local_set(local_key,value,None)
+        return value
+
+    def set(self,key,value,timeout=DEFAULT_TIMEOUT,version=None):
+        timeout=self._timeout(timeout)
+        self.shared.set(key,value,timeout=timeout,version=version)
+        self._local_set(self.make_and_validate_key(key,version=version),value,timeout)
+
+    async def aset(self,key,value,timeout=DEFAULT_TIMEOUT,version=None):
+        timeout=self._timeout(timeout)
+        await self.shared.aset(key,value,timeout=timeout,version=version)
+        self._local_set(self.make_and_validate_key(key,version=version),value,timeout)
+
+    def add(self,key,value,timeout=DEFAULT_TIMEOUT,version=None):
+        timeout=self._timeout(timeout)
+        added=self.shared.add(key,value,timeout=timeout,version=version)
+        if added:
+            self._local_set(self.make_and_validate_key(key,version=version),value,timeout)
+        return added
+
+    def touch(self,key,timeout=DEFAULT_TIMEOUT,version=None):
+        return self.shared.touch(key,timeout=self._timeout(timeout),version=version)
+
+    def delete(self,key,version=None):
+        self._local_delete(self.make_and_validate_key(key,version=version))
+        return self.shared.delete(key,version=version)
+
+    def has_key(self,key,version=None):
+        if self._local_get(self.make_and_validate_key(key,version=version)) is not None:
+            return True
+        return self.shared.has_key(key,version=version)
+
+    def incr(self,key,delta=1,version=None):
+        # Counters must be exact across processes: never serve them from L1.
+        self._local_delete(self.make_and_validate_key(key,version=version))
+        return self.shared.incr(key,delta,version=version)
+
+    def clear(self):
+        with self.store.lock:
+            self.store.entries.clear()
+        self.shared.clear()
+
+    def stats(self):
+        store=self.store
+        with store.lock:
+            l1_hits,l2_hits,misses,entries=store.l1_hits,store.l2_hits,store.misses,len(store.entries)
+        lookups=l1_hits+l2_hits+misses
+        return {
+            'l1_hits':l1_hits,
+            'l2_hits':l2_hits,
+            'misses':misses,
+            'l1_entries':entries,
+            'l1_hit_ratio':l1_hits/lookups if lookups else 0.0,
+            # Of the lookups that got past L1, how many L2 answered.
+            'l2_hit_ratio':l2_hits/(l2_hits+misses) if l2_hits+misses else 0.0,
+        }
+
+    def reset_stats(self):
+        with self.store.lock:
+            self.store.l1_hits=self.store.l2_hits=self.store.misses=0
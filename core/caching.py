@@ -0,0 +1,231 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache,caches
+from django.utils.connection import ConnectionProxy
+from django.db import transaction
+from .metrics import record_cache_result
+
+GENERATION_KEY="cache_generation_{user_id}"
+AUTH_USER_KEY="auth_user_{user_id}"
+LOCK_KEY="{key}_lock"
+# How often a request waiting on another's recompute looks for the result.
+LOCK_POLL_INTERVAL=0.02
+
+# Where summary payloads are stored (the two-tier cache in settings); the
+# generation keys that version them always live on the shared default cache.
+summary_cache=ConnectionProxy(caches,getattr(settings,'SUMMARY_CACHE_ALIAS','default'))
+# Where JWT authentication keeps its per-user row (see core/authentication.py).
+auth_user_cache=ConnectionProxy(caches,getattr(settings,'AUTH_USER_CACHE_ALIAS','default'))
+
+
+class CacheStats:
+    """Process-local hit/miss counters for the summary caches."""
+    def __init__(self):
+        self._lock=threading.Lock()
+        self.hits=0
+        self.misses=0
+
+    def record(self,hit):
+        with self._lock:
+            if hit:
+                self.hits+=1
+            else:
+                self.misses+=1
+            return self.hit_ratio
+
+    @property
+    def hit_ratio(self):
+        total=self.hits+self.misses
+        return self.hits/total if total else 0.0
+
+
+summary_cache_stats=CacheStats()
+
+
+def _fresh_generation():
+    # Seed from the clock rather than 1, so a generation that was evicted
+    # never restarts at a value old entries were stored under.
+    return time.time_ns()//1000
+
+
+def get_user_generation(user_id):
+    key=GENERATION_KEY.format(user_id=user_id)
+    generation=cache.get(key)
+    if generation is None:
+        cache.add(key,_fresh_generation(),timeout=None)
+        generation=cache.get(key)
+    return generation
+
+
+async def aget_user_generation(user_id):
+    key=GENERATION_KEY.format(user_id=user_id)
+    generation=await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key,_fresh_generation(),timeout=None)
+        generation=await cache.aget(key)
+    return generation
+
+
+def bump_user_generation(user_id):
+    key=GENERATION_KEY.format(user_id=user_id)
+    generation=cache.get(key)
+    if generation is not None:
+        try:
+            # Step up to the clock (and by at least 1), so a generation is also
+            # the time of the user's last write (see generation_timestamp).
+            return cache.incr(key,max(1,_fresh_generation()-generation))
+        except ValueError:
+            pass
+    generation=_fresh_generation()
+    cache.set(key,generation,timeout=None)
+    return generation
+
+
+def generation_timestamp(generation):
+    """The Unix time (whole seconds) of the write that set ``generation``, at the latest."""
+    return generation//1_000_000
+
+
+def bump_user_generation_on_commit(user_id):
+    """Invalidate a user's cached summaries once the current write is committed.
+
+    Bumping before commit would let a concurrent reader cache pre-write data
+    under the new generation.
+    """
+    transaction.on_commit(lambda:bump_user_generation(user_id),robust=True)
+
+
+def invalidate_auth_user(user_id):
+    auth_user_cache.delete(AUTH_USER_KEY.format(user_id=user_id))
+
+
+def invalidate_auth_user_on_commit(user_id):
+    """Drop a user's cached authentication row now and again after commit.
+
+    The first delete covers requests made inside the transaction; the second
+    one drops a row a concurrent request cached from the pre-commit state.
+    """
+    invalidate_auth_user(user_id)
+    transaction.on_commit(lambda:invalidate_auth_user(user_id),robust=True)
+
+
+def _summary_key(kind,user_id,goalNum,window,generation):
+    scope=goalNum if goalNum is not None else 'all'
+    if window is not None:
+        scope=f"{scope}_{window}"
+    return f"{kind}_summary_{user_id}_{scope}_v{generation}"
+
+
+def summary_cache_key(kind,user_id,goalNum=None,window=None):
+    return _summary_key(kind,user_id,goalNum,window,get_user_generation(user_id))
+
+
+async def asummary_cache_key(kind,user_id,goalNum=None,window=None):
+    return _summary_key(kind,user_id,goalNum,window,await aget_user_generation(user_id))
+
+
+def _settings():
+    return (
+        getattr(settings,'SUMMARY_CACHE_LOCK_TIMEOUT',10),
+        getattr(settings,'SUMMARY_CACHE_LOCK_WAIT',2),
+        getattr(settings,'SUMMARY_CACHE_EARLY_REFRESH_BETA',1.0),
+    )
+
+
+def _is_fresh(entry,beta):
+    """XFetch: refresh early with a probability that grows as expiry nears and with compute cost."""
+    _,compute_seconds,expires_at=entry
+    if not beta:
+        return time.time()<expires_at
+    return time.time()-compute_seconds*beta*math.log(1.0-random.random())<expires_at
+
+
+def _entry(value,started,timeout):
+    expires_at=time.time()+timeout if timeout is not None else math.inf
+    return (value,time.perf_counter()-started,expires_at)
+
+
+def cached_summary(key,compute,timeout):
+    """``(value, hit)`` for a summary key, computing it at most once across concurrent requests.
+
+    Entries are stored with their compute cost and expiry. On a miss, or on a hit
+    picked for early refresh, only the request that wins a short lock on the
+    shared cache calls ``compute``; the others keep serving the current entry or,
+    on a cold key, wait briefly for the winner's result. ``compute`` returning
+    None means "nothing to cache" (e.g. an unknown goal).
+    """
+    lock_timeout,lock_wait,beta=_settings()
+    entry=summary_cache.get(key)
+    if entry is not None and _is_fresh(entry,beta):
+        return entry[0],True
+
+    lock_key=LOCK_KEY.format(key=key)
+    if not cache.add(lock_key,1,timeout=lock_timeout):
+        if entry is not None:
+            return entry[0],True
+        deadline=time.monotonic()+lock_wait
+        while time.monotonic()<deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry=summary_cache.get(key)
+            if entry is not None:
+                return entry[0],True
+            if not cache.has_key(lock_key):
+                break
+        # The holder cached nothing, or is slow or gone: compute rather than fail.
+        lock_key=None
+
+    try:
+        started=time.perf_counter()
+        value=compute()
+        if value is not None:
+            summary_cache.set(key,_entry(value,started,timeout),timeout=timeout)
+        return value,False
+    finally:
+        if lock_key is not None:
+            cache.delete(lock_key)
+
+
+async def acached_summary(key,compute,timeout):
+    """``cached_summary`` for async views; ``compute`` is a coroutine function."""
+    lock_timeout,lock_wait,beta=_settings()
+    entry=await summary_cache.aget(key)
+    if entry is not None and _is_fresh(entry,beta):
+        return entry[0],True
+
+    lock_key=LOCK_KEY.format(key=key)
+    if not await cache.aadd(lock_key,1,timeout=lock_timeout):
+        if entry is not None:
+            return entry[0],True
+        deadline=time.monotonic()+lock_wait
+        while time.monotonic()<deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry=await summary_cache.aget(key)
+            if entry is not None:
+                return entry[0],True
+            if not await cache.ahas_key(lock_key):
+                break
+        lock_key=None
+
+    try:
+        started=time.perf_counter()
+        value=await compute()
+        if value is not None:
+            await summary_cache.aset(key,_entry(value,started,timeout),timeout=timeout)
+        return value,False
+    finally:
+        if lock_key is not None:
+            await cache.adelete(lock_key)
+
+
+def log_cache_status(logger,cache_key,hit):
+    status='hit' if hit else 'miss'
+    hit_ratio=summary_cache_stats.record(hit)
+    record_cache_result(hit)
+    logger.info(
+        "Cache %s for key: %s (hit ratio %.2f)",status,cache_key,hit_ratio,
+        extra={'cache_status':status,'hit_ratio':hit_ratio},
+    )
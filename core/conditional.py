@@ -0,0 +1,71 @@
+"""Conditional GET for the per-user read endpoints.
+
+Every write to a user's goals or progress bumps their cache generation (see
+core/caching.py), so the generation alone tells whether anything a read
+endpoint returns may have changed. ``conditional_get`` (``aconditional_get``
+for the async views) turns it into an ETag and Last-Modified before the view
+runs and answers a matching ``If-None-Match``/``If-Modified-Since`` with 304,
+with no query and no serialization. Last-Modified has one-second resolution, so clients should
+send ``If-None-Match`` (which takes precedence) whenever they have an ETag.
+While the last write is in the current second a later write in the same
+second would keep the same Last-Modified, so none is sent and
+``If-Modified-Since`` is ignored until the second has passed.
+"""
+import time
+from functools import wraps
+from hashlib import md5
+from django.utils.cache import get_conditional_response,patch_cache_control
+from django.utils.http import http_date
+from .caching import aget_user_generation,generation_timestamp,get_user_generation
+
+
+def user_etag(request,generation):
+    # The body also depends on the URL (filters, page, absolute links) and the
+    # negotiated format, so they are part of the tag.
+    key=f"{request.user.id}|{generation}|{request.build_absolute_uri()}|{request.META.get('HTTP_ACCEPT','')}"
+    return f'"{md5(key.encode(),usedforsecurity=False).hexdigest()}"'
+
+
+def validators(request,generation):
+    """(ETag, Last-Modified timestamp or None) for a user's current generation."""
+    last_modified=generation_timestamp(generation)
+    if last_modified>=int(time.time()):
+        last_modified=None
+    return user_etag(request,generation),last_modified
+
+
+def with_validators(response,etag,last_modified):
+    # Errors (unknown goal, bad since) are not representations to revalidate.
+    if response.status_code==200:
+        response.headers.setdefault('ETag',etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified',http_date(last_modified))
+    return response
+
+
+def conditional_get(view_method):
+    """Wrap an APIView ``get`` so unchanged polls get 304 Not Modified."""
+    @wraps(view_method)
+    def wrapper(self,request,*args,**kwargs):
+        etag,last_modified=validators(request,get_user_generation(request.user.id))
+        response=get_conditional_response(request,etag=etag,last_modified=last_modified)
+        if response is None:
+            response=with_validators(view_method(self,request,*args,**kwargs),etag,last_modified)
+        # Per-user data: never shared, always revalidated rather than served from
+        # a heuristic freshness lifetime.
+        patch_cache_control(response,private=True,no_cache=True)
+        return response
+    return wrapper
+
+
+def aconditional_get(view_method):
+    """``conditional_get`` for the ``async def get`` handlers in async_views.py."""
+    @wraps(view_method)
+    async def wrapper(self,request,*args,**kwargs):
+        etag,last_modified=validators(request,await aget_user_generation(request.user.id))
+        response=get_conditional_response(request,etag=etag,last_modified=last_modified)
+        if response is None:
+            response=with_validators(await view_method(self,request,*args,**kwargs),etag,last_modified)
+        patch_cache_control(response,private=True,no_cache=True)
+        return response
+    return wrapper
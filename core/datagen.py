@@ -0,0 +1,226 @@
+"""Deterministic synthetic data for scale testing.
+
+Builds users across both tiers, goals in every category and a history of
+Progress spread over the weeks and months before a fixed anchor date
+(``now``, by default derived from the seed). Users and goals go in with
+chunked ``bulk_create``; Progress and its rollups, which are the bulk of the
+rows, are written as pre-adapted tuples with ``executemany`` because Django's
+per-field preparation in ``bulk_create`` dominates at a million rows. Stored
+goal totals, ordinals and summary rollups are computed while generating, so
+the dataset looks the same as one built through the API.
+"""
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime,timedelta,timezone as dt_timezone
+from django.contrib.auth.hashers import make_password
+from django.db import connection,transaction
+from django.utils import timezone
+from django.utils.duration import duration_microseconds
+from .models import CustomUser,Goal,Progress,ProgressRollup,bucket_starts
+
+QUARTER_HOUR=timedelta(minutes=15)
+ANCHOR=datetime(2025,1,1,tzinfo=dt_timezone.utc)
+
+
+def anchor_for(seed):
+    """The fixed "now" a seed's history ends at, so a seed gives the same rows on any day."""
+    return ANCHOR+timedelta(days=seed%365)
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """Let explicit created_at/updated_at values through auto_now/auto_now_add."""
+    fields=[
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field,'auto_now',False) or getattr(field,'auto_now_add',False)
+    ]
+    saved=[(field,field.auto_now,field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now=field.auto_now_add=False
+    try:
+        yield
+    finally:
+        for field,auto_now,auto_now_add in saved:
+            field.auto_now,field.auto_now_add=auto_now,auto_now_add
+
+
+def insert_sql(model,field_names):
+    quote=connection.ops.quote_name
+    columns=[model._meta.get_field(name).column for name in field_names]
+    return "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(column) for column in columns),
+        ", ".join(["%s"]*len(columns)),
+    )
+
+
+class DatasetGenerator:
+    progress_fields=('goal','progress','logged_hours','total_hours','is_complete','created_at','updated_at','ordinal')
+    rollup_fields=('user','goal','granularity','bucket_start','logged_hours','entry_count')
+
+    def __init__(self,users=100,goals_per_user=3,progress=10000,years=2,premium_ratio=0.2,
+                 seed=42,prefix='synth',batch_size=5000,now=None,stdout=None):
+        self.users=users
+        self.goals_per_user=goals_per_user
+        self.progress=progress
+        self.years=years
+        self.premium_ratio=premium_ratio
+        self.prefix=f"{prefix}{seed}_"
+        self.batch_size=batch_size
+        self.rng=random.Random(seed)
+        self.now=now or anchor_for(seed)
+        self.start=self.now-timedelta(days=365*years)
+        self.stdout=stdout
+        self.tz=timezone.get_current_timezone()
+        self._bucket_cache={}
+        self._date_cache={}
+        native_durations=connection.features.has_native_duration_field
+        self.adapt_duration=(lambda value:value) if native_durations else duration_microseconds
+        self.adapt_datetime=connection.ops.adapt_datetimefield_value
+
+    def log(self,message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def moment_between(self,start,end):
+        return start+timedelta(seconds=self.rng.uniform(0,max((end-start).total_seconds(),1)))
+
+    def buckets_for(self,timestamp):
+        # The local date, and so the bucket, is fixed within any 15-minute block.
+        block=int(timestamp)//900
+        buckets=self._bucket_cache.get(block)
+        if buckets is None:
+            local_date=datetime.fromtimestamp(block*900,tz=self.tz).date()
+            buckets=self._date_cache.get(local_date)
+            if buckets is None:
+                moment=datetime.fromtimestamp(block*900,tz=dt_timezone.utc)
+                buckets=self._date_cache[local_date]=tuple(
+                    (granularity,self.adapt_datetime(bucket_start))
+                    for granularity,bucket_start in bucket_starts(moment).items()
+                )
+            self._bucket_cache[block]=buckets
+        return buckets
+
+    def existing(self):
+        return CustomUser.objects.filter(username__startswith=self.prefix)
+
+    def clear(self):
+        users=self.existing()
+        with transaction.atomic():
+            # The whole dataset goes, so skip the per-row delete signals (and the
+            # instance loading they force) for the bulk of it.
+            rows=Progress.objects.filter(goal__user__in=users)._raw_delete(Progress.objects.db)
+            deleted,_=users.delete()
+        return deleted+rows
+
+    def create_users(self):
+        password=make_password('synthetic-password',salt=self.prefix.rstrip('_'))
+        users=[]
+        for i in range(self.users):
+            joined=self.moment_between(self.start,self.start+(self.now-self.start)/4)
+            users.append(CustomUser(
+                username=f"{self.prefix}{i}",
+                email=f"{self.prefix}{i}@example.com",
+                password=password,
+                tier='premium' if self.rng.random()<self.premium_ratio else 'free',
+                date_joined=joined,
+            ))
+        return CustomUser.objects.bulk_create(users,batch_size=self.batch_size)
+
+    def create_goals(self,users):
+        categories=list(Goal.CategoryType.values)
+        goals=[]
+        for user in users:
+            for ordinal in range(1,self.goals_per_user+1):
+                created=self.moment_between(user.date_joined,self.now-timedelta(days=7))
+                goals.append(Goal(
+                    user_id=user.id,
+                    goal_name=f"Goal {ordinal} for {user.username}",
+                    category=self.rng.choice(categories),
+                    deadline=(created+timedelta(days=self.rng.randint(30,365))).date() if self.rng.random()<0.6 else None,
+                    created_at=created,
+                    updated_at=created,
+                    ordinal=ordinal,
+                ))
+        return Goal.objects.bulk_create(goals,batch_size=self.batch_size)
+
+    def progress_counts(self,goals):
+        # Heavy-tailed: a few goals get most of the progress, like real usage.
+        weights=[self.rng.paretovariate(1.2) for _ in goals]
+        return Counter(self.rng.choices(range(len(goals)),weights=weights,k=self.progress))
+
+    def create_progress(self,goals):
+        counts=self.progress_counts(goals)
+        progress_sql=insert_sql(Progress,self.progress_fields)
+        rollup_sql=insert_sql(ProgressRollup,self.rollup_fields)
+        goal_sql="UPDATE {} SET {}=%s, {}=%s, {}=%s, {}=%s WHERE {}=%s".format(
+            *map(connection.ops.quote_name,(
+                Goal._meta.db_table,'total_logged_hours','total_planned_hours','progress_count','last_progress_date','id',
+            ))
+        )
+        uniform,randint=self.rng.uniform,self.rng.randint
+        adapt_duration,adapt_datetime=self.adapt_duration,self.adapt_datetime
+        now=self.now.timestamp()
+        progress_rows=[]
+        rollup_rows=[]
+        goal_rows=[]
+        created=0
+
+        with connection.cursor() as cursor:
+            for index,goal in enumerate(goals):
+                count=counts.get(index,0)
+                if not count:
+                    continue
+                start=goal.created_at.timestamp()
+                timestamps=sorted(uniform(start,now) for _ in range(count))
+                logged_total=planned_total=0
+                buckets={}
+                for ordinal,timestamp in enumerate(timestamps,start=1):
+                    planned_quarters=randint(4,40)
+                    logged_quarters=randint(0,planned_quarters)
+                    logged=QUARTER_HOUR*logged_quarters
+                    moment=adapt_datetime(datetime.fromtimestamp(timestamp,tz=dt_timezone.utc))
+                    progress_rows.append((
+                        goal.id,f"Session {ordinal}",adapt_duration(logged),adapt_duration(QUARTER_HOUR*planned_quarters),
+                        logged_quarters>=planned_quarters,moment,moment,ordinal,
+                    ))
+                    logged_total+=logged_quarters
+                    planned_total+=planned_quarters
+                    for bucket in self.buckets_for(timestamp):
+                        bucket_logged,bucket_count=buckets.get(bucket,(0,0))
+                        buckets[bucket]=(bucket_logged+logged_quarters,bucket_count+1)
+
+                goal_rows.append((
+                    adapt_duration(QUARTER_HOUR*logged_total),adapt_duration(QUARTER_HOUR*planned_total),count,
+                    adapt_datetime(datetime.fromtimestamp(timestamps[-1],tz=dt_timezone.utc)),goal.id,
+                ))
+                rollup_rows.extend(
+                    (goal.user_id,goal.id,granularity,bucket_start,adapt_duration(QUARTER_HOUR*logged),entries)
+                    for (granularity,bucket_start),(logged,entries) in buckets.items()
+                )
+
+                if len(progress_rows)>=self.batch_size:
+                    cursor.executemany(progress_sql,progress_rows)
+                    created+=len(progress_rows)
+                    progress_rows=[]
+                    self.log(f"  {created} progress rows")
+                if len(rollup_rows)>=self.batch_size:
+                    cursor.executemany(rollup_sql,rollup_rows)
+                    rollup_rows=[]
+
+            for sql,rows in ((progress_sql,progress_rows),(rollup_sql,rollup_rows),(goal_sql,goal_rows)):
+                if rows:
+                    cursor.executemany(sql,rows)
+        return created+len(progress_rows)
+
+    def generate(self):
+        """Create the dataset; returns the created users."""
+        with transaction.atomic(),historical_timestamps(Goal):
+            users=self.create_users()
+            self.log(f"Created {len(users)} users")
+            goals=self.create_goals(users)
+            self.log(f"Created {len(goals)} goals")
+            created=self.create_progress(goals)
+            self.log(f"Created {created} progress rows")
+        return users
@@ -0,0 +1,158 @@
+"""Read-only fast path for list and summary payloads.
+
+A ValuesSerializer mirrors a DRF serializer's output field for field, but works
+on ``values_list(named=True)`` rows instead of model instances. The field list
+and each field's converter are worked out once from the DRF serializer, so per
+row there is no model instantiation, no ``get_attribute`` walk and no
+``to_representation`` dispatch. Model properties (``completion_percentage``)
+are evaluated against the row itself, so the columns they read must be listed in
+``property_columns``.
+
+The output must stay identical to the DRF serializer's; FastSerializerTests
+compare the two.
+"""
+from django.conf import settings
+from django.utils import timezone
+from django.utils.duration import duration_string
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .serializers import (
+    CategoryTotalSerializer, DashboardGoalSerializer, GoalSerializer, MonthlySummarySerializer, ProgressSerializer,
+    WeeklySummarySerializer,
+)
+
+# Field types whose to_representation returns database values unchanged
+# (matched exactly: subclasses such as MultipleChoiceField may not).
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+    serializers.IntegerField, serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField,
+)
+
+
+def _is_iso(field, setting):
+    output_format = getattr(field, 'format', getattr(api_settings, setting))
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def datetime_converter(field, tz):
+    if not _is_iso(field, 'DATETIME_FORMAT') or getattr(field, 'timezone', None) or tz is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def converter(field, tz):
+    """The cheapest callable giving ``field.to_representation(value)`` for a non-null database value (None = as is)."""
+    if isinstance(field, serializers.DateTimeField):
+        return datetime_converter(field, tz)
+    if isinstance(field, serializers.DateField):
+        return (lambda value: value.isoformat()) if _is_iso(field, 'DATE_FORMAT') else field.to_representation
+    if isinstance(field, serializers.DurationField):
+        return duration_string
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+    return field.to_representation
+
+
+class ValuesSerializer:
+    serializer_class = None
+    # For fields backed by a model property: the columns the property reads.
+    property_columns = {}
+    # Columns fetched for the caller's own use (e.g. keyset cursors), not output.
+    extra_columns = ()
+
+    @classmethod
+    def plan(cls):
+        """``(columns, fields)`` compiled once per class from the DRF serializer."""
+        if '_plan' not in cls.__dict__:
+            model = getattr(getattr(cls.serializer_class, 'Meta', None), 'model', None)
+            columns = []
+
+            def column(name):
+                if name not in columns:
+                    columns.append(name)
+                return columns.index(name)
+
+            fields = []
+            for name, field in cls.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                attribute = getattr(model, field.source, None) if model is not None else None
+                if isinstance(attribute, property):
+                    for name_read in cls.property_columns[name]:
+                        column(name_read)
+                    fields.append((name, None, attribute.fget, field))
+                elif model is not None:
+                    fields.append((name, column(model._meta.get_field(field.source).attname), None, field))
+                else:
+                    fields.append((name, column(field.source), None, field))
+            for name in cls.extra_columns:
+                column(name)
+            cls._plan = (tuple(columns), tuple(fields))
+        return cls._plan
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values_list(*cls.plan()[0], named=True)
+
+    @classmethod
+    def converters(cls):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return [
+            (name, index, prop if prop is not None else converter(field, tz))
+            for name, index, prop, field in cls.plan()[1]
+        ]
+
+    @classmethod
+    def serialize(cls, rows):
+        """A list of dicts, as ``serializer_class(rows, many=True).data`` would give for the same objects."""
+        converters = cls.converters()
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert in converters:
+                if index is None:
+                    item[name] = convert(row)
+                    continue
+                value = row[index]
+                item[name] = value if value is None or convert is None else convert(value)
+            data.append(item)
+        return data
+
+    @classmethod
+    def serialize_one(cls, row):
+        return cls.serialize((row,))[0]
+
+
+class FastGoalSerializer(ValuesSerializer):
+    serializer_class = GoalSerializer
+    property_columns = {'completion_percentage': ('total_logged_hours', 'total_planned_hours')}
+
+
+class FastProgressSerializer(ValuesSerializer):
+    serializer_class = ProgressSerializer
+    property_columns = {'percentage_complete': ('logged_hours', 'total_hours')}
+
+
+class FastDashboardGoalSerializer(ValuesSerializer):
+    serializer_class = DashboardGoalSerializer
+    property_columns = FastGoalSerializer.property_columns
+    extra_columns = ('id',)
+
+
+# Plain serializers: rows are tuples in field order.
+class FastWeeklySummarySerializer(ValuesSerializer):
+    serializer_class = WeeklySummarySerializer
+
+
+class FastMonthlySummarySerializer(ValuesSerializer):
+    serializer_class = MonthlySummarySerializer
+
+
+class FastCategoryTotalSerializer(ValuesSerializer):
+    serializer_class = CategoryTotalSerializer
@@ -0,0 +1,211 @@
+"""Queued, batched JSON file logging that keeps disk I/O off the request path.
+
+``QueuedRotatingFileHandler`` is what ``settings.LOGGING`` attaches to loggers:
+``emit`` only puts the record on an in-memory queue. A ``BatchingQueueListener``
+thread drains the queue in batches and hands each batch to a
+``BatchingRotatingFileHandler``, which formats the records as JSON lines and
+writes and flushes them in one call, rotating by size.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from datetime import datetime,timezone
+from logging.handlers import QueueHandler,QueueListener,RotatingFileHandler
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+STANDARD_ATTRS=frozenset(vars(logging.LogRecord('','',0,'',None,None,None)))|{'message','asctime','taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with any ``extra`` fields at the top level."""
+    encode=json.JSONEncoder(default=str).encode
+
+    def __init__(self):
+        super().__init__()
+        self._second=None
+        self._second_text=''
+
+    def format_time(self,created):
+        # Records arrive in bursts from the same second; reuse its ISO prefix.
+        second=int(created)
+        if second!=self._second:
+            self._second=second
+            self._second_text=datetime.fromtimestamp(second,tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        return f"{self._second_text}.{int((created-second)*1000):03d}Z"
+
+    def format(self,record):
+        fields=record.__dict__
+        entry={
+            'time':self.format_time(record.created),
+            'level':record.levelname,
+            'logger':record.name,
+            'module':record.module,
+            'message':fields.get('message') or record.getMessage(),
+        }
+        for key in sorted(fields.keys()-STANDARD_ATTRS):
+            entry[key]=fields[key]
+        if record.exc_info and not record.exc_text:
+            record.exc_text=self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info']=record.exc_text
+        return self.encode(entry)
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that can write a whole batch of records with one flush."""
+
+    def emit_batch(self,records):
+        lines=[]
+        for record in records:
+            try:
+                lines.append(self.format(record)+self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream=self._open()
+            size=self.stream.tell()
+            chunk=[]
+            for line in lines:
+                if self.maxBytes>0 and chunk and size+len(line)>=self.maxBytes:
+                    self.stream.write(''.join(chunk))
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream=self._open()
+                    chunk,size=[],0
+                chunk.append(line)
+                size+=len(line)
+            self.stream.write(''.join(chunk))
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that drains up to ``batch_size`` queued records per handler call."""
+
+    def __init__(self,queue,*handlers,batch_size=256,flush_interval=0.05,respect_handler_level=True):
+        super().__init__(queue,*handlers,respect_handler_level=respect_handler_level)
+        self.batch_size=batch_size
+        self.flush_interval=flush_interval
+
+    def handle_batch(self,records):
+        records=[self.prepare(record) for record in records]
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                wanted=[record for record in records if record.levelno>=handler.level]
+            else:
+                wanted=records
+            if hasattr(handler,'emit_batch'):
+                wanted=[record for record in wanted if handler.filter(record)]
+                if wanted:
+                    handler.emit_batch(wanted)
+            else:
+                for record in wanted:
+                    handler.handle(record)
+
+    def _monitor(self):
+        while True:
+            batch=[]
+            flushed=[]
+            record=self.dequeue(True)
+            while record is not self._sentinel:
+                if isinstance(record,threading.Event):
+                    flushed.append(record)
+                else:
+                    batch.append(record)
+                if len(batch)>=self.batch_size:
+                    break
+                try:
+                    record=self.dequeue(False)
+                except queue.Empty:
+                    break
+            if batch:
+                self.handle_batch(batch)
+            for event in flushed:
+                event.set()
+            if record is self._sentinel:
+                break
+            if len(batch)<self.batch_size and not flushed:
+                # Let a trickle of records build up into a batch instead of
+                # waking (and taking the GIL) for every one.
+                time.sleep(self.flush_interval)
+
+
+class QueuedRotatingFileHandler(QueueHandler):
+    """Log to a rotating JSON-lines file from a background writer thread.
+
+    Takes the ``RotatingFileHandler`` arguments plus ``batch_size`` and
+    ``queue_size``. Once ``queue_size`` records are waiting, new ones are
+    dropped and counted in ``dropped`` rather than blocking the caller.
+    """
+
+    def __init__(self,filename,maxBytes=10*1024*1024,backupCount=5,encoding='utf-8',batch_size=256,queue_size=10000):
+        super().__init__(queue.SimpleQueue())
+        self.queue_size=queue_size
+        self.batch_size=batch_size
+        self.dropped=0
+        self.target=BatchingRotatingFileHandler(filename,maxBytes=maxBytes,backupCount=backupCount,encoding=encoding,delay=True)
+        self.target.setFormatter(JsonFormatter())
+        self.listener=None
+        self.start()
+
+        handler=weakref.ref(self)
+        atexit.register(lambda:handler() and handler().stop())
+        # A forked child (gunicorn/celery prefork) inherits the queue but not the writer thread.
+        os.register_at_fork(after_in_child=lambda:handler() and handler()._restart_in_child())
+
+    def start(self):
+        self.listener=BatchingQueueListener(self.queue,self.target,batch_size=self.batch_size)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+
+    def _restart_in_child(self):
+        self.queue=queue.SimpleQueue()
+        self.start()
+
+    def prepare(self,record):
+        # Only what must happen on the caller's thread: resolve the message now,
+        # since args may change before the writer gets to it, and hand over a
+        # shallow copy so later handlers do not mutate what the writer reads.
+        # JSON formatting happens in the writer thread.
+        prepared=logging.LogRecord.__new__(logging.LogRecord)
+        prepared.__dict__.update(record.__dict__)
+        prepared.message=record.getMessage()
+        return prepared
+
+    def enqueue(self,record):
+        if self.queue.qsize()>=self.queue_size:
+            self.dropped+=1
+        else:
+            self.queue.put_nowait(record)
+
+    def flush(self):
+        """Block until everything queued so far has been written."""
+        if self.listener is not None and self.listener._thread is not None:
+            written=threading.Event()
+            self.queue.put_nowait(written)
+            written.wait()
+        self.target.flush()
+
+    def setLevel(self,level):
+        super().setLevel(level)
+        self.target.setLevel(level)
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum,Count
+from datetime import timedelta
+from core.caching import bump_user_generation
+from core.models import Goal,Progress
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored progress totals (logged, planned, count) on every Goal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch_size', type=int, default=1000, help='Goals written per bulk_update')
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+        updated = 0
+        users = set()
+
+        with transaction.atomic():
+            totals = {
+                row['goal']: row
+                for row in Progress.objects.values('goal').annotate(
+                    logged=Sum('logged_hours'),
+                    planned=Sum('total_hours'),
+                    count=Count('id'),
+                ).order_by()
+            }
+
+            batch = []
+            for goal in Goal.objects.only('id', 'user_id').order_by('id').iterator(chunk_size=batch_size):
+                row = totals.get(goal.id, {})
+                goal.total_logged_hours = row.get('logged') or timedelta()
+                goal.total_planned_hours = row.get('planned') or timedelta()
+                goal.progress_count = row.get('count', 0)
+                batch.append(goal)
+                users.add(goal.user_id)
+                if len(batch) >= batch_size:
+                    Goal.objects.bulk_update(batch, ['total_logged_hours', 'total_planned_hours', 'progress_count'])
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                Goal.objects.bulk_update(batch, ['total_logged_hours', 'total_planned_hours', 'progress_count'])
+                updated += len(batch)
+
+        # Cached goal lists and dashboards carry the old totals until the generation moves.
+        for user in users:
+            bump_user_generation(user)
+        self.stdout.write(self.style.SUCCESS(f"Backfilled progress totals for {updated} goals"))
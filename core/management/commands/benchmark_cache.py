@@ -1,61 +1,186 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand,CommandError
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.urls import URLPattern
+from rest_framework_simplejwt.tokens import RefreshToken
 from tabulate import tabulate
+from core import urls as core_urls
+from core.datagen import DatasetGenerator
+import json
+import re
 import time
+import uuid
 import logging
 
 logger=logging.getLogger(__name__)
 
+API_PREFIX='/api/'
+PATH_PARAM=re.compile(r'<(?:\w+:)?\w+>')
+
+# Request bodies for endpoints that only accept POST.
+POST_PAYLOADS={
+    'RegsisterUser':lambda:{
+        'username':f"bench_{uuid.uuid4().hex[:12]}",'password':'bench-password-1','tier':'free',
+        'email':'bench@example.com','first_name':'Bench','last_name':'User',
+    },
+    'BulkProgressView':lambda:[
+        {'goalNum':1,'progress':'Bench session','logged_hours':'00:30:00','total_hours':'01:00:00'}
+        for _ in range(10)
+    ],
+    'ProgressAddTimeView':lambda:{'logged_hours':'00:05:00'},
+}
+
+
+def percentile(sorted_values,pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank=max(1,-(-len(sorted_values)*pct//100))
+    return sorted_values[int(rank)-1]
+
+
 class Command(BaseCommand):
-    help = 'Benchmark MonthlySummaryView and WeeklySummaryView with and without caching'
+    help = 'Benchmark every core API endpoint with JWT auth across dataset sizes: p50/p95/p99 latency, query counts and bytes, with optional baseline regression checks'
 
     def add_arguments(self, parser):
-        parser.add_argument('--user_id', type=int, default=1, help='User ID for benchmarking')
+        parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated Progress rows per user to sweep')
+        parser.add_argument('--goals', type=int, default=5, help='Goals per benchmark user')
+        parser.add_argument('--runs', type=int, default=30, help='Timed requests per endpoint and cache state')
+        parser.add_argument('--endpoint', default=None, help='Only benchmark paths containing this substring')
+        parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+        parser.add_argument('--baseline', default=None, help='JSON report from an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative p95 increase over the baseline')
+        parser.add_argument('--min_delta_ms', type=float, default=1.0, help='Ignore p95 increases smaller than this')
 
-    def handle(self, *args, **kwargs):
-        user_id = kwargs['user_id']
-        client = Client()
-        urls = {
-            'Monthly Summary': f'/api/summary/monthly/1/?user_id={user_id}',
-            'Weekly Summary': f'/api/summary/weekly/1/?user_id={user_id}'
-        }
-        results = []
+    def endpoints(self, only=None):
+        """(method, path, view name) for every route in core.urls, with path parameters set to 1."""
+        endpoints=[]
+        for pattern in core_urls.urlpatterns:
+            if not isinstance(pattern,URLPattern):
+                continue
+            view_class=pattern.callback.view_class
+            path=API_PREFIX+PATH_PARAM.sub('1',str(pattern.pattern))
+            if only and only not in path:
+                continue
+            if hasattr(view_class,'get'):
+                endpoints.append(('GET',path,view_class.__name__))
+            elif view_class.__name__ in POST_PAYLOADS:
+                endpoints.append(('POST',path,view_class.__name__))
+        # Writes last, so they disturb the dataset the reads see as little as possible.
+        return sorted(endpoints,key=lambda endpoint:endpoint[0]!='GET')
+
+    def seed(self, size, goals):
+        # A premium user so the throttle stays out of the measurements.
+        generator=DatasetGenerator(users=1,goals_per_user=goals,progress=size,premium_ratio=1,prefix=f"bench{size}_",now=timezone.now())
+        return generator.generate()[0]
+
+    def request(self, client, method, path, view_name):
+        if method=='GET':
+            return client.get(path)
+        return client.post(path,POST_PAYLOADS[view_name](),content_type='application/json')
 
-        for view_name, url in urls.items():
-            # Benchmark without cache
-            no_cache_times = []
-            for i in range(100):
+    def measure(self, client, endpoint, runs, cache_state):
+        method,path,view_name=endpoint
+        cache.clear()
+        if cache_state=='warm':
+            self.request(client,method,path,view_name)
+
+        timings=[]
+        queries=[]
+        size=0
+        statuses=set()
+        for _ in range(runs):
+            if cache_state=='cold':
                 cache.clear()
-                start_time = time.time()
-                response = client.get(url)
-                end_time = time.time()
-                if response.status_code != 200:
-                    self.stdout.write(self.style.ERROR(f"{view_name} no-cache request {i+1} failed: {response.content}"))
-                    return
-                no_cache_times.append((end_time - start_time) * 1000)
-                self.stdout.write(self.style.SUCCESS(f"{view_name} no-cache request {i+1}: {no_cache_times[-1]:.2f} ms"))
-
-            # Benchmark with cache (pre-populate cache first)
-            cache_times = []
+            with CaptureQueriesContext(connection) as ctx:
+                start=time.perf_counter_ns()
+                response=self.request(client,method,path,view_name)
+                body=b''.join(response.streaming_content) if response.streaming else response.content
+                timings.append(time.perf_counter_ns()-start)
+            queries.append(len(ctx.captured_queries))
+            size=len(body)
+            statuses.add(response.status_code)
+
+        timings.sort()
+        queries.sort()
+        return {
+            'endpoint':path,
+            'method':method,
+            'cache':cache_state,
+            'status':sorted(statuses),
+            'p50_ms':round(percentile(timings,50)/1e6,3),
+            'p95_ms':round(percentile(timings,95)/1e6,3),
+            'p99_ms':round(percentile(timings,99)/1e6,3),
+            'mean_ms':round(sum(timings)/len(timings)/1e6,3),
+            'queries':queries[len(queries)//2],
+            'bytes':size,
+        }
+
+    def compare(self, results, baseline, tolerance, min_delta_ms):
+        previous={
+            (row['endpoint'],row['method'],row['size'],row['cache']):row
+            for row in baseline.get('results',[])
+        }
+        regressions=[]
+        for row in results:
+            base=previous.get((row['endpoint'],row['method'],row['size'],row['cache']))
+            if base is None:
+                continue
+            delta=row['p95_ms']-base['p95_ms']
+            if delta>min_delta_ms and row['p95_ms']>base['p95_ms']*(1+tolerance):
+                regressions.append(f"{row['method']} {row['endpoint']} size={row['size']} {row['cache']}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+            if row['queries']>base['queries']:
+                regressions.append(f"{row['method']} {row['endpoint']} size={row['size']} {row['cache']}: queries {base['queries']} -> {row['queries']}")
+        return regressions
+
+    def handle(self, *args, **kwargs):
+        sizes=[int(size) for size in kwargs['sizes'].split(',') if size.strip()]
+        runs=kwargs['runs']
+        endpoints=self.endpoints(kwargs['endpoint'])
+        results=[]
+
+        # Seed and measure in a throwaway test database, never the configured one.
+        old_name=connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0,autoclobber=True,serialize=False)
+        try:
+            for size in sizes:
+                user=self.seed(size,kwargs['goals'])
+                client=Client(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+                for endpoint in endpoints:
+                    for cache_state in ('cold','warm'):
+                        row=self.measure(client,endpoint,runs,cache_state)
+                        row['size']=size
+                        results.append(row)
+                        self.stdout.write(f"{row['method']} {row['endpoint']} size={size} {cache_state}: p50 {row['p50_ms']}ms p95 {row['p95_ms']}ms")
+        finally:
             cache.clear()
-            response = client.get(url)
-            if response.status_code != 200:
-                self.stdout.write(self.style.ERROR(f"{view_name} cache pre-population failed: {response.content}"))
-                return
-            for i in range(100):
-                start_time = time.time()
-                response = client.get(url)
-                end_time = time.time()
-                if response.status_code != 200:
-                    self.stdout.write(self.style.ERROR(f"{view_name} cache request {i+1} failed: {response.content}"))
-                    return
-                cache_times.append((end_time - start_time) * 1000)
-                self.stdout.write(self.style.SUCCESS(f"{view_name} cache request {i+1}: {cache_times[-1]:.2f} ms"))
-
-            results.append([f"{view_name} Without Cache", f"{sum(no_cache_times) / len(no_cache_times):.2f}"])
-            results.append([f"{view_name} With Cache", f"{sum(cache_times) / len(cache_times):.2f}"])
-
-        table = [["Scenario", "Average Latency (ms)"]] + results
+            connection.creation.destroy_test_db(old_name,verbosity=0)
+
+        report={
+            'meta':{'sizes':sizes,'runs':runs,'goals':kwargs['goals'],'vendor':connection.vendor,'created':time.time()},
+            'results':results,
+        }
+        table=[["Endpoint","Method","Size","Cache","p50 (ms)","p95 (ms)","p99 (ms)","Queries","Bytes","Status"]]+[
+            [row['endpoint'],row['method'],row['size'],row['cache'],row['p50_ms'],row['p95_ms'],row['p99_ms'],row['queries'],row['bytes'],row['status']]
+            for row in results
+        ]
         self.stdout.write("\nBenchmark Results:")
-        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
\ No newline at end of file
+        self.stdout.write(tabulate(table,headers="firstrow",tablefmt="grid"))
+
+        if kwargs['output']:
+            with open(kwargs['output'],'w') as fh:
+                json.dump(report,fh,indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {kwargs['output']}"))
+
+        if kwargs['baseline']:
+            with open(kwargs['baseline']) as fh:
+                baseline=json.load(fh)
+            regressions=self.compare(results,baseline,kwargs['tolerance'],kwargs['min_delta_ms'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(regression))
+                raise CommandError(f"{len(regressions)} regression(s) against {kwargs['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {kwargs['baseline']}"))
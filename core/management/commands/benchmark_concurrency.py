@@ -0,0 +1,148 @@
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.utils import timezone
+from django.db.backends.signals import connection_created
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from rest_framework_simplejwt.tokens import RefreshToken
+from tabulate import tabulate
+from core.datagen import DatasetGenerator
+from core.management.commands.benchmark_cache import percentile
+import asyncio
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput of the async views under ASGI with the sync views under WSGI for many simultaneous clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help='Simultaneous clients')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client')
+        parser.add_argument('--wsgi_threads', type=int, default=4, help='Worker threads for WSGI (like gunicorn --threads)')
+        parser.add_argument('--db_latency_ms', type=float, default=5.0, help='Latency added to every query, standing in for a networked database')
+        parser.add_argument('--size', type=int, default=1000, help='Progress rows in the seeded dataset')
+        parser.add_argument('--paths', default='goals/,goals/1/progress/?pagination=cursor,summary/weekly/', help='Comma-separated paths under /api/ (and /api/async/)')
+
+    def slow_query(self, execute, sql, params, many, context):
+        time.sleep(self.db_latency)
+        return execute(sql, params, many, context)
+
+    def add_latency(self, sender, connection, **kwargs):
+        if self.slow_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self.slow_query)
+
+    def run_wsgi(self, paths, clients, requests, threads, auth):
+        application = get_wsgi_application()
+
+        def call(path):
+            route, _, query = path.partition('?')
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': route, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost', 'HTTP_AUTHORIZATION': auth,
+                'wsgi.input': BytesIO(), 'wsgi.errors': BytesIO(), 'wsgi.url_scheme': 'http',
+                'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+            status = []
+            start = time.perf_counter()
+            body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+            b''.join(body)
+            body.close()
+            return time.perf_counter() - start, status[0].startswith('200')
+
+        calls = [paths[i % len(paths)] for i in range(clients * requests)]
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return list(pool.map(call, calls))
+
+    def run_asgi(self, paths, clients, requests, auth):
+        application = get_asgi_application()
+
+        async def call(path):
+            route, _, query = path.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': route, 'raw_path': route.encode(), 'query_string': query.encode(),
+                'root_path': '', 'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+                'headers': [(b'host', b'localhost'), (b'authorization', auth.encode())],
+            }
+            finished = asyncio.Event()
+            received = []
+
+            async def receive():
+                if not received:
+                    received.append(True)
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            status = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif not message.get('more_body'):
+                    finished.set()
+
+            start = time.perf_counter()
+            await application(scope, receive, send)
+            return time.perf_counter() - start, status[0] == 200
+
+        async def client(offset):
+            return [await call(paths[(offset + i) % len(paths)]) for i in range(requests)]
+
+        async def main():
+            results = await asyncio.gather(*(client(offset) for offset in range(clients)))
+            return [result for client_results in results for result in client_results]
+
+        return asyncio.run(main())
+
+    def summarize(self, name, results, elapsed):
+        timings = sorted(seconds * 1000 for seconds, _ in results)
+        return [
+            name, len(results), sum(not ok for _, ok in results),
+            f"{len(results) / elapsed:.0f}",
+            f"{percentile(timings, 50):.1f}", f"{percentile(timings, 95):.1f}",
+            f"{elapsed:.2f}",
+        ]
+
+    def handle(self, *args, **kwargs):
+        clients, requests = kwargs['clients'], kwargs['requests']
+        self.db_latency = kwargs['db_latency_ms'] / 1000
+        paths = [path.strip() for path in kwargs['paths'].split(',') if path.strip()]
+        rows = []
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        connection_created.connect(self.add_latency)
+        try:
+            generator = DatasetGenerator(users=1, goals_per_user=3, progress=kwargs['size'], premium_ratio=1, prefix='concurrency', now=timezone.now())
+            user = generator.generate()[0]
+            auth = f"Bearer {RefreshToken.for_user(user).access_token}"
+            self.add_latency(None, connection)
+
+            modes = (
+                (f"WSGI, sync views, {kwargs['wsgi_threads']} threads",
+                 lambda: self.run_wsgi([f"/api/{path}" for path in paths], clients, requests, kwargs['wsgi_threads'], auth)),
+                ("ASGI, sync views",
+                 lambda: self.run_asgi([f"/api/{path}" for path in paths], clients, requests, auth)),
+                ("ASGI, async views",
+                 lambda: self.run_asgi([f"/api/async/{path}" for path in paths], clients, requests, auth)),
+            )
+            for name, run in modes:
+                # Fresh cache per mode: same summary misses, and throttle counters start at zero.
+                cache.clear()
+                start = time.perf_counter()
+                results = run()
+                rows.append(self.summarize(name, results, time.perf_counter() - start))
+                self.stdout.write(f"{name}: {rows[-1][3]} req/s")
+        finally:
+            connection_created.disconnect(self.add_latency)
+            cache.clear()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        table = [["Mode", "Requests", "Errors", "Throughput (req/s)", "p50 (ms)", "p95 (ms)", "Wall (s)"]] + rows
+        self.stdout.write(f"\nConcurrency Benchmark ({clients} clients x {requests} requests, {kwargs['db_latency_ms']}ms per query):")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+from tabulate import tabulate
+from core.datagen import DatasetGenerator
+from core.management.commands.benchmark_cache import percentile
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare a full GET with an unchanged poll answered 304 from If-None-Match on the read endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000, help='Progress rows in the seeded dataset')
+        parser.add_argument('--runs', type=int, default=200, help='Timed requests per endpoint and mode')
+        parser.add_argument('--paths', default='goals/,goals/1/progress/,summary/weekly/,summary/dashboard/', help='Comma-separated paths under /api/')
+
+    def measure(self, client, path, runs, headers):
+        timings = []
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(runs):
+                start = time.perf_counter_ns()
+                response = client.get(path, **headers)
+                body = response.content
+                timings.append(time.perf_counter_ns() - start)
+        timings.sort()
+        return [
+            response.status_code,
+            f"{percentile(timings, 50) / 1e6:.3f}", f"{percentile(timings, 95) / 1e6:.3f}",
+            len(ctx.captured_queries) // runs, len(body),
+        ]
+
+    def handle(self, *args, **kwargs):
+        paths = [f"/api/{path.strip()}" for path in kwargs['paths'].split(',') if path.strip()]
+        rows = []
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # A premium user so the throttle stays out of the measurements.
+            generator = DatasetGenerator(users=1, goals_per_user=5, progress=kwargs['size'], premium_ratio=1, prefix='conditional', now=timezone.now())
+            user = generator.generate()[0]
+            client = Client(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+            for path in paths:
+                # Warm the summary and auth caches: the comparison is against the best full response.
+                etag = client.get(path).get('ETag', '')
+                full = self.measure(client, path, kwargs['runs'], {})
+                poll = self.measure(client, path, kwargs['runs'], {'HTTP_IF_NONE_MATCH': etag})
+                rows.append([path, 'full GET'] + full)
+                rows.append([path, 'unchanged poll'] + poll)
+                self.stdout.write(f"{path}: {full[1]}ms -> {poll[1]}ms p50")
+        finally:
+            cache.clear()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        table = [["Endpoint", "Request", "Status", "p50 (ms)", "p95 (ms)", "Queries", "Bytes"]] + rows
+        self.stdout.write(f"\nConditional GET Benchmark ({kwargs['runs']} runs, {kwargs['size']} progress rows):")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.db.utils import ConnectionHandler
+from concurrent.futures import ThreadPoolExecutor
+from tabulate import tabulate
+from learnflow_backend.database import POSTGRES_ENGINE, PROFILES, database_config
+from core.management.commands.benchmark_cache import percentile
+import os
+import tempfile
+import threading
+import time
+
+ALIAS = 'benchmark'
+TABLE = 'benchmark_writes'
+
+
+class Command(BaseCommand):
+    help = 'Compare the baseline and tuned database profiles: connection setup, per-request overhead, write throughput and reads alongside writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(reversed(PROFILES)), help='Comma-separated profiles to compare')
+        parser.add_argument('--connections', type=int, default=200, help='Connections opened (and requests simulated) per profile')
+        parser.add_argument('--writes', type=int, default=2000, help='Single-row autocommit INSERTs per profile')
+        parser.add_argument('--readers', type=int, default=4, help='Reader threads running while the writes happen')
+
+    def connections_for(self, profile, directory, test_name):
+        config = database_config(getattr(settings, 'DATABASE_URL', None), profile, os.environ)
+        if config['ENGINE'] == POSTGRES_ENGINE:
+            config['NAME'] = test_name
+        else:
+            config['NAME'] = os.path.join(directory, f"{profile}.sqlite3")
+        # Thread-local like django.db.connections: every reader gets its own connection.
+        # 'default' is only there because ConnectionHandler requires one; it is never opened.
+        return ConnectionHandler({'default': dict(connection.settings_dict), ALIAS: config})
+
+    def connection_setup(self, handler, count):
+        """(ms per cold connect, ms per request) with connections opened and released as requests do."""
+        conn = handler[ALIAS]
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter_ns()
+            conn.ensure_connection()
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            # close() really closes without a pool, and returns the connection to it with one.
+            conn.close()
+            timings.append(time.perf_counter_ns() - start)
+
+        requests = []
+        for _ in range(count):
+            start = time.perf_counter_ns()
+            conn.close_if_unusable_or_obsolete()  # request_started
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.close_if_unusable_or_obsolete()  # request_finished
+            requests.append(time.perf_counter_ns() - start)
+        conn.close()
+        timings.sort()
+        requests.sort()
+        return percentile(timings, 50) / 1e6, percentile(requests, 50) / 1e6
+
+    def write_throughput(self, handler, writes, readers):
+        """(writes/s, reads/s, reader errors) for autocommit INSERTs with readers running alongside."""
+        conn = handler[ALIAS]
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, payload VARCHAR(64))")
+        done = threading.Event()
+        reads, errors = [0] * readers, [0] * readers
+
+        def read(index):
+            reader = handler[ALIAS]
+            try:
+                while not done.is_set():
+                    try:
+                        with reader.cursor() as cursor:
+                            cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+                            cursor.fetchone()
+                        reads[index] += 1
+                    except OperationalError:
+                        errors[index] += 1
+            finally:
+                reader.close()
+
+        with ThreadPoolExecutor(max_workers=max(readers, 1)) as pool:
+            futures = [pool.submit(read, index) for index in range(readers)]
+            start = time.perf_counter()
+            with conn.cursor() as cursor:
+                for i in range(writes):
+                    cursor.execute(f"INSERT INTO {TABLE} (id, payload) VALUES (%s, %s)", [i, f"row {i}"])
+            elapsed = time.perf_counter() - start
+            done.set()
+            for future in futures:
+                future.result()
+
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {TABLE}")
+        conn.close()
+        return writes / elapsed, sum(reads) / elapsed, sum(errors)
+
+    def handle(self, *args, **kwargs):
+        profiles = [profile.strip() for profile in kwargs['profiles'].split(',') if profile.strip()]
+        postgres = connection.settings_dict['ENGINE'] == POSTGRES_ENGINE
+        rows = []
+
+        # Postgres runs against a throwaway test database; SQLite against files in a temp directory.
+        old_name = connection.settings_dict['NAME']
+        test_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False) if postgres else None
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for profile in profiles:
+                    handler = self.connections_for(profile, directory, test_name)
+                    try:
+                        connect_ms, request_ms = self.connection_setup(handler, kwargs['connections'])
+                        writes, reads, errors = self.write_throughput(handler, kwargs['writes'], kwargs['readers'])
+                    finally:
+                        close_pool = getattr(handler[ALIAS], 'close_pool', None)
+                        if close_pool is not None:
+                            close_pool()
+                        handler.close_all()
+                    rows.append([profile, f"{connect_ms:.3f}", f"{request_ms:.3f}", f"{writes:,.0f}", f"{reads:,.0f}", errors])
+                    self.stdout.write(f"{profile}: {writes:,.0f} writes/s, {reads:,.0f} reads/s")
+        finally:
+            if postgres:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        table = [["Profile", "Connect p50 (ms)", "Request p50 (ms)", "Writes/s", f"Reads/s ({kwargs['readers']} readers)", "Reader errors"]] + rows
+        self.stdout.write(f"\nDatabase Profile Benchmark ({'PostgreSQL' if postgres else 'SQLite'}, {kwargs['writes']} writes):")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
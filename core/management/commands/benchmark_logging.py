@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from tabulate import tabulate
+from core.log_handlers import QueuedRotatingFileHandler
+import logging
+import os
+import tempfile
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare request-path cost of the synchronous FileHandler and the queued JSON file handler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=5000, help='Log calls timed per handler')
+        parser.add_argument('--gap_us', type=int, default=200, help='Idle time between log calls, standing in for the rest of a request (0 for a tight loop)')
+
+    def handlers(self, directory):
+        plain = logging.FileHandler(os.path.join(directory, 'plain.log'))
+        plain.setFormatter(logging.Formatter('{levelname} {asctime} {module} {message}', style='{'))
+        queued = QueuedRotatingFileHandler(os.path.join(directory, 'queued.log'), maxBytes=0)
+        return [('FileHandler (before)', plain), ('QueuedRotatingFileHandler', queued)]
+
+    def run(self, name, handler, records, gap):
+        logger = logging.getLogger(f'benchmark_logging.{id(handler)}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        timings = []
+        try:
+            start = time.perf_counter_ns()
+            for i in range(records):
+                # The same call shape as log_cache_status on a summary request.
+                call_start = time.perf_counter_ns()
+                logger.info(
+                    "Cache %s for key: %s (hit ratio %.2f)", 'miss', f"weekly_summary_{i}_all_v1", 0.5,
+                    extra={'cache_status': 'miss', 'hit_ratio': 0.5},
+                )
+                timings.append(time.perf_counter_ns() - call_start)
+                if gap:
+                    time.sleep(gap)
+            handler.flush()
+            total = time.perf_counter_ns() - start
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+        timings.sort()
+        return [
+            name,
+            f"{sum(timings) / len(timings) / 1000:.2f}",
+            f"{timings[len(timings) // 2] / 1000:.2f}",
+            f"{timings[int(len(timings) * 0.99)] / 1000:.2f}",
+            f"{timings[-1] / 1000:.1f}",
+            f"{total / 1e6:.1f}",
+            getattr(handler, 'dropped', 0),
+        ]
+
+    def handle(self, *args, **kwargs):
+        with tempfile.TemporaryDirectory() as directory:
+            rows = [self.run(name, handler, kwargs['records'], kwargs['gap_us'] / 1e6) for name, handler in self.handlers(directory)]
+        table = [["Handler", "Mean (us)", "p50 (us)", "p99 (us)", "Max (us)", "Total (ms)", "Dropped"]] + rows
+        self.stdout.write("\nLogging Benchmark Results (cost on the calling thread):")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+from tabulate import tabulate
+from core.metrics import MetricsRegistry,install_query_tracking
+from core.middleware import RequestMetricsMiddleware
+from core import middleware as metrics_middleware
+import time
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of RequestMetricsMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000, help='Requests timed per scenario')
+        parser.add_argument('--queries', default='0,5', help='Comma-separated DB queries per request to sweep')
+        parser.add_argument('--budget_us', type=float, default=5.0, help='Overhead budget per request, excluding per-query cost')
+
+    def time_calls(self, handler, request, requests):
+        start = time.perf_counter_ns()
+        for _ in range(requests):
+            handler(request)
+        return (time.perf_counter_ns() - start) / requests / 1000
+
+    def handle(self, *args, **kwargs):
+        requests = kwargs['requests']
+        request = RequestFactory().get('/api/goals/')
+        request.resolver_match = resolve('/api/goals/')
+        body = b'x' * 512
+        rows = []
+        over_budget = False
+
+        install_query_tracking(None, connection)
+        with connection.cursor() as cursor:
+            for queries in [int(n) for n in kwargs['queries'].split(',')]:
+                def view(request, queries=queries):
+                    for _ in range(queries):
+                        cursor.execute("SELECT 1")
+                    return HttpResponse(body)
+
+                # Record into a private registry so the live counters are untouched.
+                original_registry = metrics_middleware.registry
+                metrics_middleware.registry = MetricsRegistry()
+                try:
+                    middleware = RequestMetricsMiddleware(view)
+                    self.time_calls(view, request, requests // 10)
+                    self.time_calls(middleware, request, requests // 10)
+                    bare = self.time_calls(view, request, requests)
+                    instrumented = self.time_calls(middleware, request, requests)
+                finally:
+                    metrics_middleware.registry = original_registry
+
+                overhead = instrumented - bare
+                per_request = overhead if not queries else None
+                if per_request is not None and per_request > kwargs['budget_us']:
+                    over_budget = True
+                rows.append([
+                    queries, f"{bare:.2f}", f"{instrumented:.2f}", f"{overhead:.2f}",
+                    f"{overhead / queries:.2f}" if queries else '-',
+                ])
+
+        table = [["Queries/request", "Bare (us)", "Instrumented (us)", "Overhead (us)", "Overhead/query (us)"]] + rows
+        self.stdout.write("\nMetrics Middleware Overhead:")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
+        if over_budget:
+            self.stdout.write(self.style.WARNING(f"Per-request overhead is above the {kwargs['budget_us']}us budget"))
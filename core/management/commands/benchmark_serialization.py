@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from tabulate import tabulate
+from core.datagen import DatasetGenerator
+from core.fast_serializers import FastGoalSerializer, FastProgressSerializer
+from core.models import Goal, Progress
+from core.renderers import FastJSONRenderer, orjson
+from core.serializers import GoalSerializer, ProgressSerializer
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of the list payloads through ModelSerializer + JSONRenderer with the values() fast serializers + FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--goals', type=int, default=500, help='Goals in the seeded dataset')
+        parser.add_argument('--progress', type=int, default=5000, help='Progress rows in the seeded dataset')
+        parser.add_argument('--runs', type=int, default=10, help='Timed runs per path; the best run is reported')
+
+    def best(self, runs, render):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            body = render()
+            timings.append(time.perf_counter() - start)
+        return min(timings), body
+
+    def handle(self, *args, **kwargs):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            generator = DatasetGenerator(
+                users=1, goals_per_user=kwargs['goals'], progress=kwargs['progress'], premium_ratio=1, prefix='serialization',
+            )
+            user = generator.generate()[0]
+            payloads = (
+                ('Goals', Goal.objects.filter(user=user).order_by('id'), GoalSerializer, FastGoalSerializer),
+                ('Progress', Progress.objects.filter(goal__user=user).order_by('id'), ProgressSerializer, FastProgressSerializer),
+            )
+            drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+            rows = []
+            for name, queryset, serializer_class, fast_class in payloads:
+                count = queryset.count()
+                before, expected = self.best(
+                    kwargs['runs'], lambda: drf_renderer.render(serializer_class(queryset.all(), many=True).data),
+                )
+                after, body = self.best(
+                    kwargs['runs'], lambda: fast_renderer.render(fast_class.serialize(fast_class.values(queryset.all()))),
+                )
+                rows.append([
+                    name, count,
+                    f"{count / before:,.0f}", f"{count / after:,.0f}", f"{before / after:.1f}x",
+                    'yes' if body == expected else 'NO',
+                ])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        table = [["Payload", "Rows", "Before (rows/s)", "After (rows/s)", "Speedup", "Byte-identical"]] + rows
+        encoder = 'orjson' if orjson is not None else 'json (orjson not installed)'
+        self.stdout.write(f"\nSerialization Benchmark (best of {kwargs['runs']} runs, encoder: {encoder}):")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
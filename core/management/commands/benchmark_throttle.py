@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+from django.core.cache import cache
+from rest_framework.throttling import UserRateThrottle
+from types import SimpleNamespace
+from tabulate import tabulate
+from core.throttling import TierUserThrottle,TIER_RATES
+import time
+
+
+class HistoryTierUserThrottle(UserRateThrottle):
+    """The previous TierUserThrottle: SimpleRateThrottle's timestamp-history list per user."""
+    scope='tier_user_history'
+    rate='10/day'
+    def get_rate(self):
+        return self.rate
+
+    def allow_request(self,request,view):
+        self.rate = TIER_RATES['premium'] if request.user.tier == 'premium' else TIER_RATES['free']
+        return super().allow_request(request,view)
+
+    def get_cache_key(self,request,view):
+        return self.cache_format % {'scope':f"{self.scope}_{request.user.tier}",'ident':request.user.pk}
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request cost and cached state size of the history and sliding-window tier throttles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests timed per scenario')
+
+    def seed(self, throttle, request, count):
+        """Put the user's throttle state at ``count`` requests into the current window."""
+        key = throttle.get_cache_key(request, None)
+        now = throttle.timer()
+        if isinstance(throttle, TierUserThrottle):
+            window = int(now // throttle.duration)
+            cache.set(f"{key}_{window}", count, timeout=2 * throttle.duration)
+            cache.set(f"{key}_{window - 1}", count, timeout=2 * throttle.duration)
+        else:
+            cache.set(key, [now] * count, timeout=throttle.duration)
+
+    def state_bytes(self):
+        # LocMemCache keeps pickled values; other backends do not expose them.
+        store = getattr(cache, '_cache', None)
+        return sum(len(value) for value in store.values()) if store is not None else 'n/a'
+
+    def run(self, throttle_class, tier, requests):
+        user = SimpleNamespace(is_authenticated=True, tier=tier, pk=1)
+        request = SimpleNamespace(user=user, META={})
+        timings = []
+        for _ in range(requests):
+            cache.clear()
+            throttle = throttle_class()
+            throttle.rate = TIER_RATES[tier]
+            throttle.num_requests, throttle.duration = throttle.parse_rate(throttle.rate)
+            # Worst case for the history list: one request short of the limit.
+            self.seed(throttle, request, throttle.num_requests // 2 if throttle_class is TierUserThrottle else throttle.num_requests - 1)
+            start = time.perf_counter_ns()
+            allowed = throttle.allow_request(request, None)
+            timings.append(time.perf_counter_ns() - start)
+            assert allowed
+        state = self.state_bytes()
+        timings.sort()
+        return [
+            throttle_class.__name__, tier,
+            f"{sum(timings) / len(timings) / 1000:.2f}",
+            f"{timings[len(timings) // 2] / 1000:.2f}",
+            f"{timings[int(len(timings) * 0.99)] / 1000:.2f}",
+            state,
+        ]
+
+    def handle(self, *args, **kwargs):
+        requests = kwargs['requests']
+        rows = [
+            self.run(throttle_class, tier, requests)
+            for tier in TIER_RATES
+            for throttle_class in (HistoryTierUserThrottle, TierUserThrottle)
+        ]
+        cache.clear()
+        table = [["Throttle", "Tier", "Mean (us)", "p50 (us)", "p99 (us)", "Cached state (bytes)"]] + rows
+        self.stdout.write("\nThrottle Benchmark Results:")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
@@ -0,0 +1,55 @@
+from datetime import datetime, time as dt_time
+from django.core.management.base import BaseCommand,CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from core.datagen import DatasetGenerator
+import time
+
+
+def anchor(value):
+    """``--now`` as an aware datetime; a bare date means local midnight."""
+    try:
+        moment = parse_datetime(value)
+        if moment is None and parse_date(value) is not None:
+            moment = datetime.combine(parse_date(value), dt_time.min)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise CommandError(f"--now must be an ISO date or datetime, not {value!r}")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic, seeded dataset of users, goals and historical progress for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users to create')
+        parser.add_argument('--goals_per_user', type=int, default=3, help='Goals per user')
+        parser.add_argument('--progress', type=int, default=100000, help='Total progress rows across all goals')
+        parser.add_argument('--years', type=int, default=2, help='How far back created_at timestamps go')
+        parser.add_argument('--premium_ratio', type=float, default=0.2, help='Share of users on the premium tier')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same dataset')
+        parser.add_argument('--now', help='ISO date or datetime the history ends at (default: a fixed date derived from --seed)')
+        parser.add_argument('--batch_size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--clear', action='store_true', help='Delete a previously generated dataset with this seed first')
+
+    def handle(self, *args, **kwargs):
+        generator = DatasetGenerator(
+            users=kwargs['users'],
+            goals_per_user=kwargs['goals_per_user'],
+            progress=kwargs['progress'],
+            years=kwargs['years'],
+            premium_ratio=kwargs['premium_ratio'],
+            seed=kwargs['seed'],
+            batch_size=kwargs['batch_size'],
+            now=anchor(kwargs['now']) if kwargs['now'] else None,
+            stdout=self.stdout,
+        )
+        if generator.existing().exists():
+            if not kwargs['clear']:
+                raise CommandError(f"A dataset with seed {kwargs['seed']} already exists; pass --clear to replace it")
+            self.stdout.write(f"Deleted {generator.clear()} rows from the previous dataset")
+
+        start = time.perf_counter()
+        generator.generate()
+        self.stdout.write(self.style.SUCCESS(f"Dataset generated in {time.perf_counter() - start:.1f}s"))
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand,CommandError
+from django.db import transaction
+from django.db.models import Sum,Count
+from django.db.models.functions import TruncWeek,TruncMonth
+from datetime import timedelta
+from core.caching import bump_user_generation
+from core.models import Progress,ProgressRollup
+
+TRUNCATE={
+    ProgressRollup.Granularity.WEEK:TruncWeek,
+    ProgressRollup.Granularity.MONTH:TruncMonth,
+}
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the weekly/monthly ProgressRollup table from Progress, or verify it against the raw aggregation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Only compare rollups with the raw aggregation')
+        parser.add_argument('--user_id', type=int, default=None, help='Restrict to a single user')
+        parser.add_argument('--batch_size', type=int, default=1000, help='Rows written per bulk_create')
+
+    def raw_buckets(self, user_id):
+        """The rollups as the old TruncWeek/TruncMonth aggregation over Progress would compute them."""
+        progress = Progress.objects.all()
+        if user_id is not None:
+            progress = progress.filter(goal__user_id=user_id)
+        buckets = {}
+        for granularity, trunc in TRUNCATE.items():
+            rows = progress.annotate(bucket_start=trunc('created_at')).values(
+                'goal__user_id', 'goal_id', 'bucket_start'
+            ).annotate(
+                logged=Sum('logged_hours'),
+                count=Count('id'),
+            ).order_by()
+            for row in rows:
+                key = (row['goal__user_id'], row['goal_id'], granularity, row['bucket_start'])
+                buckets[key] = (row['logged'] or timedelta(), row['count'])
+        return buckets
+
+    def stored_buckets(self, user_id):
+        rollups = ProgressRollup.objects.filter(entry_count__gt=0)
+        if user_id is not None:
+            rollups = rollups.filter(user_id=user_id)
+        return {
+            (user, goal, granularity, bucket_start): (logged, count)
+            for user, goal, granularity, bucket_start, logged, count in rollups.values_list(
+                'user_id', 'goal_id', 'granularity', 'bucket_start', 'logged_hours', 'entry_count'
+            ).iterator()
+        }
+
+    def handle(self, *args, **kwargs):
+        user_id = kwargs['user_id']
+
+        if kwargs['verify']:
+            expected = self.raw_buckets(user_id)
+            stored = self.stored_buckets(user_id)
+            mismatched = [key for key in expected.keys() | stored.keys() if expected.get(key) != stored.get(key)]
+            for key in sorted(mismatched, key=str)[:20]:
+                self.stdout.write(self.style.ERROR(
+                    f"Mismatch user={key[0]} goal={key[1]} {key[2]} {key[3]}: "
+                    f"expected {expected.get(key)} stored {stored.get(key)}"
+                ))
+            if mismatched:
+                raise CommandError(f"{len(mismatched)} of {len(expected)} rollup buckets are out of date")
+            self.stdout.write(self.style.SUCCESS(f"All {len(expected)} rollup buckets match Progress"))
+            return
+
+        with transaction.atomic():
+            rollups = ProgressRollup.objects.all()
+            if user_id is not None:
+                rollups = rollups.filter(user_id=user_id)
+            users = set(rollups.values_list('user_id', flat=True).distinct())
+            rollups.delete()
+            rows = [
+                ProgressRollup(
+                    user_id=user, goal_id=goal, granularity=granularity, bucket_start=bucket_start,
+                    logged_hours=logged, entry_count=count,
+                )
+                for (user, goal, granularity, bucket_start), (logged, count) in self.raw_buckets(user_id).items()
+            ]
+            ProgressRollup.objects.bulk_create(rows, batch_size=kwargs['batch_size'])
+        # Summaries cached from the old buckets would otherwise be served until they expire.
+        users.update(row.user_id for row in rows)
+        for user in users:
+            bump_user_generation(user)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rows)} rollup buckets"))
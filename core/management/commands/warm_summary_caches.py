@@ -0,0 +1,43 @@
+from celery.utils.time import rate
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from datetime import timedelta
+from tabulate import tabulate
+from core.tasks import summarize_summary_warming, summary_warming_batches, warm_summary_batch, warm_summary_caches
+import time
+
+
+class Command(BaseCommand):
+    help = "Precompute recently active users' summary caches (run after deploys) and report coverage"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active_within_hours', type=int, default=None, help='Warm users with progress in this many hours (default SUMMARY_WARM_ACTIVE_WITHIN_HOURS)')
+        parser.add_argument('--batch_size', type=int, default=None, help='Users per batch (default SUMMARY_WARM_BATCH_SIZE)')
+        parser.add_argument('--enqueue', action='store_true', help='Hand the batches to the Celery workers instead of warming in this process')
+        parser.add_argument('--no_pause', action='store_true', help='Ignore SUMMARY_WARM_RATE_LIMIT between batches')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['enqueue']:
+            result = warm_summary_caches.delay(kwargs['active_within_hours'], kwargs['batch_size'])
+            self.stdout.write(f"Queued summary warming as task {result.id}")
+            return
+
+        active_within = timedelta(hours=kwargs['active_within_hours']) if kwargs['active_within_hours'] else None
+        batches = summary_warming_batches(active_within, kwargs['batch_size'])
+        # Same pace as the rate-limited Celery task, so a post-deploy run does not crowd out live requests.
+        pause = 0 if kwargs['no_pause'] else 1 / rate(getattr(settings, 'SUMMARY_WARM_RATE_LIMIT', '30/m'))
+
+        started = time.time()
+        results = []
+        for index, user_ids in enumerate(batches):
+            if index and pause:
+                time.sleep(pause)
+            results.append(warm_summary_batch(user_ids))
+        summary = summarize_summary_warming(results, started_at=started)
+
+        table = [["Users", "Batches", "Keys computed", "Already cached", "Failed", "Coverage", "Hit ratio before", "Hit ratio after", "Seconds"], [
+            summary['users'], summary['batches'], summary['computed'], summary['already_cached'], summary['failed'],
+            f"{summary['coverage']:.1%}", f"{summary['hit_ratio_before']:.1%}", f"{summary['hit_ratio_after']:.1%}", summary['seconds'],
+        ]]
+        self.stdout.write("\nSummary Cache Warming:")
+        self.stdout.write(tabulate(table, headers="firstrow", tablefmt="grid"))
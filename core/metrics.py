@@ -0,0 +1,173 @@
+"""In-process request metrics, keyed by resolved URL name.
+
+``RequestMetricsMiddleware`` opens a ``RequestMetrics`` for each request; the
+DB execute wrapper (installed once on every connection as it is created) and
+``log_cache_status`` add to it, and the finished request is folded into the
+process-wide ``registry`` under one lock. Counters are per process: with
+several workers, scrape each one (or sum them in Prometheus).
+"""
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+# Upper bounds in seconds, as Prometheus histograms expect.
+LATENCY_BUCKETS=(0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0)
+
+current_request=ContextVar('current_request_metrics',default=None)
+
+
+class RequestMetrics:
+    __slots__=('queries','query_time','cache_hits','cache_misses')
+
+    def __init__(self):
+        self.queries=0
+        self.query_time=0.0
+        self.cache_hits=0
+        self.cache_misses=0
+
+
+def track_query(execute,sql,params,many,context):
+    """DB execute wrapper: time the query against the request being served, if any."""
+    metrics=current_request.get()
+    if metrics is None:
+        return execute(sql,params,many,context)
+    start=perf_counter()
+    try:
+        return execute(sql,params,many,context)
+    finally:
+        metrics.query_time+=perf_counter()-start
+        metrics.queries+=1
+
+
+def install_query_tracking(sender,connection,**kwargs):
+    """connection_created receiver: wrap the connection's queries once, for its lifetime."""
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_query)
+
+
+def record_cache_result(hit):
+    """Count a cache lookup against the request being served, if any."""
+    metrics=current_request.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits+=1
+        else:
+            metrics.cache_misses+=1
+
+
+class EndpointMetrics:
+    __slots__=('buckets','count','latency','queries','query_time','cache_hits','cache_misses','response_bytes')
+
+    def __init__(self):
+        # One slot per bucket plus +Inf; cumulated only when rendered.
+        self.buckets=[0]*(len(LATENCY_BUCKETS)+1)
+        self.count=0
+        self.latency=0.0
+        self.queries=0
+        self.query_time=0.0
+        self.cache_hits=0
+        self.cache_misses=0
+        self.response_bytes=0
+
+    def as_dict(self):
+        cumulative=0
+        histogram={}
+        for bound,count in zip(LATENCY_BUCKETS+('+Inf',),self.buckets):
+            cumulative+=count
+            histogram[str(bound)]=cumulative
+        return {
+            'requests':self.count,
+            'latency_seconds_sum':self.latency,
+            'latency_seconds_bucket':histogram,
+            'db_queries':self.queries,
+            'db_query_seconds':self.query_time,
+            'cache_hits':self.cache_hits,
+            'cache_misses':self.cache_misses,
+            'response_bytes':self.response_bytes,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock=threading.Lock()
+        self._endpoints={}
+
+    def record(self,endpoint,latency,request_metrics,response_bytes):
+        slot=bisect_left(LATENCY_BUCKETS,latency)
+        with self._lock:
+            metrics=self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics=self._endpoints[endpoint]=EndpointMetrics()
+            metrics.buckets[slot]+=1
+            metrics.count+=1
+            metrics.latency+=latency
+            metrics.queries+=request_metrics.queries
+            metrics.query_time+=request_metrics.query_time
+            metrics.cache_hits+=request_metrics.cache_hits
+            metrics.cache_misses+=request_metrics.cache_misses
+            metrics.response_bytes+=response_bytes
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint:metrics.as_dict() for endpoint,metrics in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def prometheus(self):
+        """Render the snapshot in the Prometheus text exposition format."""
+        snapshot=self.snapshot()
+        lines=[
+            '# HELP learnflow_request_duration_seconds Request latency by endpoint.',
+            '# TYPE learnflow_request_duration_seconds histogram',
+        ]
+        for endpoint,metrics in snapshot.items():
+            for bound,count in metrics['latency_seconds_bucket'].items():
+                lines.append(f'learnflow_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'learnflow_request_duration_seconds_sum{{endpoint="{endpoint}"}} {metrics["latency_seconds_sum"]}')
+            lines.append(f'learnflow_request_duration_seconds_count{{endpoint="{endpoint}"}} {metrics["requests"]}')
+
+        counters=(
+            ('db_queries','learnflow_db_queries_total','Database queries executed.'),
+            ('db_query_seconds','learnflow_db_query_seconds_total','Time spent in database queries.'),
+            ('cache_hits','learnflow_cache_hits_total','Summary cache hits.'),
+            ('cache_misses','learnflow_cache_misses_total','Summary cache misses.'),
+            ('response_bytes','learnflow_response_bytes_total','Response body bytes sent (streamed responses excluded).'),
+        )
+        for field,name,description in counters:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} counter')
+            for endpoint,metrics in snapshot.items():
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {metrics[field]}')
+        return '\n'.join(lines)+'\n'
+
+
+registry=MetricsRegistry()
+
+
+def cache_tier_stats():
+    """L1/L2 hit counts of every configured two-tier cache alias."""
+    from django.conf import settings
+    from django.core.cache import caches
+    return {
+        alias:caches[alias].stats()
+        for alias in settings.CACHES
+        if hasattr(caches[alias],'stats')
+    }
+
+
+def cache_tier_prometheus(stats):
+    lines=[
+        '# HELP learnflow_cache_tier_lookups_total Two-tier cache lookups by the tier that answered.',
+        '# TYPE learnflow_cache_tier_lookups_total counter',
+    ]
+    for alias,counts in stats.items():
+        for result in ('l1_hits','l2_hits','misses'):
+            lines.append(f'learnflow_cache_tier_lookups_total{{cache="{alias}",result="{result}"}} {counts[result]}')
+    lines.append('# HELP learnflow_cache_tier_l1_entries Entries held in the per-process L1.')
+    lines.append('# TYPE learnflow_cache_tier_l1_entries gauge')
+    for alias,counts in stats.items():
+        lines.append(f'learnflow_cache_tier_l1_entries{{cache="{alias}"}} {counts["l1_entries"]}')
+    return '\n'.join(lines)+'\n'
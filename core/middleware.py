@@ -0,0 +1,47 @@
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction,markcoroutinefunction
+from .metrics import RequestMetrics,current_request,registry
+
+
+class RequestMetricsMiddleware:
+    """Record latency, DB queries, cache hits/misses and response size per URL name."""
+    sync_capable=True
+    async_capable=True
+
+    def __init__(self,get_response):
+        self.get_response=get_response
+        # Stay async under ASGI so async views are not pushed onto a thread.
+        self.is_async=iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self,request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics=RequestMetrics()
+        token=current_request.set(metrics)
+        start=perf_counter()
+        try:
+            response=self.get_response(request)
+        finally:
+            latency=perf_counter()-start
+            current_request.reset(token)
+        self.record(request,response,latency,metrics)
+        return response
+
+    async def __acall__(self,request):
+        metrics=RequestMetrics()
+        token=current_request.set(metrics)
+        start=perf_counter()
+        try:
+            response=await self.get_response(request)
+        finally:
+            latency=perf_counter()-start
+            current_request.reset(token)
+        self.record(request,response,latency,metrics)
+        return response
+
+    def record(self,request,response,latency,metrics):
+        match=request.resolver_match
+        endpoint=(match.url_name or match.view_name) if match is not None else 'unresolved'
+        registry.record(endpoint,latency,metrics,0 if response.streaming else len(response.content))
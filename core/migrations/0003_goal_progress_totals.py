@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:22
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_totals(apps, schema_editor):
+    """Fill the new totals from existing Progress, as backfill_goal_totals does."""
+    Goal = apps.get_model('core', 'Goal')
+    Progress = apps.get_model('core', 'Progress')
+    batch = []
+    for row in Progress.objects.values('goal').annotate(
+        logged=Sum('logged_hours'), planned=Sum('total_hours'), count=Count('id'),
+    ).order_by().iterator(chunk_size=2000):
+        batch.append(Goal(
+            id=row['goal'], total_logged_hours=row['logged'] or datetime.timedelta(),
+            total_planned_hours=row['planned'] or datetime.timedelta(), progress_count=row['count'],
+        ))
+        if len(batch) >= 2000:
+            Goal.objects.bulk_update(batch, ['total_logged_hours', 'total_planned_hours', 'progress_count'])
+            batch = []
+    if batch:
+        Goal.objects.bulk_update(batch, ['total_logged_hours', 'total_planned_hours', 'progress_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_goal_last_progress_date_goal_last_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='progress_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='total_logged_hours',
+            field=models.DurationField(default=datetime.timedelta),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='total_planned_hours',
+            field=models.DurationField(default=datetime.timedelta),
+        ),
+        migrations.RunPython(populate_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:23
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+
+def populate_rollups(apps, schema_editor):
+    """Fill the rollups from existing Progress, as rebuild_progress_rollups does."""
+    Progress = apps.get_model('core', 'Progress')
+    ProgressRollup = apps.get_model('core', 'ProgressRollup')
+    batch = []
+    for granularity, trunc in (('week', TruncWeek), ('month', TruncMonth)):
+        rows = Progress.objects.annotate(bucket_start=trunc('created_at')).values(
+            'goal__user_id', 'goal_id', 'bucket_start'
+        ).annotate(logged=Sum('logged_hours'), count=Count('id')).order_by()
+        for row in rows.iterator(chunk_size=2000):
+            batch.append(ProgressRollup(
+                user_id=row['goal__user_id'], goal_id=row['goal_id'], granularity=granularity,
+                bucket_start=row['bucket_start'], logged_hours=row['logged'] or datetime.timedelta(),
+                entry_count=row['count'],
+            ))
+            if len(batch) >= 2000:
+                ProgressRollup.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        ProgressRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_goal_progress_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('bucket_start', models.DateTimeField()),
+                ('logged_hours', models.DurationField(default=datetime.timedelta)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='core.goal')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['goal', 'granularity', 'bucket_start'], name='progress_rollup_goal_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'granularity', 'bucket_start', 'goal'), name='progress_rollup_bucket_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+def number_rows(model, parent_field):
+    batch = []
+    parent, position = None, 0
+    for row in model.objects.order_by(parent_field, 'id').only('id', parent_field).iterator(chunk_size=2000):
+        if getattr(row, parent_field) != parent:
+            parent, position = getattr(row, parent_field), 0
+        position += 1
+        row.ordinal = position
+        batch.append(row)
+        if len(batch) >= 2000:
+            model.objects.bulk_update(batch, ['ordinal'])
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, ['ordinal'])
+
+
+def populate_ordinals(apps, schema_editor):
+    number_rows(apps.get_model('core', 'Goal'), 'user_id')
+    number_rows(apps.get_model('core', 'Progress'), 'goal_id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_progress_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='ordinal',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='progress',
+            name='ordinal',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['user', 'ordinal'], name='goal_user_ordinal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='progress',
+            index=models.Index(fields=['goal', 'ordinal'], name='progress_goal_ordinal_idx'),
+        ),
+        migrations.RunPython(populate_ordinals, migrations.RunPython.noop),
+    ]
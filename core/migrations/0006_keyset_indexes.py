@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_ordinals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='goal_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='progress',
+            index=models.Index(fields=['goal', 'created_at', 'id'], name='progress_goal_created_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['user', 'category', 'id'], name='goal_user_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('is_complete', True)), fields=['user', 'id'], name='goal_user_complete_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('is_complete', False)), fields=['user', 'id'], name='goal_user_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('last_reminder_sent_at__isnull', True)), fields=['last_progress_date', 'user'], name='goal_reminder_due_idx'),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models,transaction,IntegrityError
 from django.contrib.auth.models import AbstractUser 
-from datetime import timedelta
-from django.db.models import Sum
+from datetime import timedelta,datetime,time
+from django.db.models import Case,DurationField,ExpressionWrapper,F,Max,Value,When
 from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .caching import bump_user_generation_on_commit,invalidate_auth_user_on_commit
 
 class CustomUser(AbstractUser):
     TIER_CHOICES=[
@@ -14,6 +16,14 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    # JWT authentication serves users from a cache (core/authentication.py);
+    # any save may change tier or is_active, so drop the cached row.
+    # QuerySet.update() bypasses this and must call invalidate_auth_user itself;
+    # deletes are handled by a signal (core/signals.py).
+    def save(self,*args,**kwargs):
+        super().save(*args,**kwargs)
+        invalidate_auth_user_on_commit(self.pk)
+
 
 
 # Create your models here.
@@ -32,24 +42,73 @@ class Goal(models.Model):
     last_progress_date=models.DateTimeField(null=True,blank=True)
     last_reminder_sent_at=models.DateTimeField(null=True,blank=True)
 
+    # Rollups of this goal's Progress rows, kept in step by Progress.save and the delete signals
+    # so listing goals never has to aggregate per row.
+    total_logged_hours=models.DurationField(default=timedelta)
+    total_planned_hours=models.DurationField(default=timedelta)
+    progress_count=models.PositiveIntegerField(default=0)
+    # 1-based position among the user's goals (by id); this is the goalNum used in URLs.
+    ordinal=models.PositiveIntegerField(null=True,blank=True)
+
+    class Meta:
+        indexes=[
+            models.Index(fields=['user','ordinal'],name='goal_user_ordinal_idx'),
+            models.Index(fields=['user','created_at','id'],name='goal_user_created_idx'),
+            # GoalsView filters; the trailing id serves its ORDER BY id without a sort.
+            models.Index(fields=['user','category','id'],name='goal_user_category_idx'),
+            # Booleans compile to a bare column test, which SQLite cannot match
+            # against a composite index column, so each value gets a partial index.
+            models.Index(fields=['user','id'],name='goal_user_complete_idx',condition=models.Q(is_complete=True)),
+            models.Index(fields=['user','id'],name='goal_user_open_idx',condition=models.Q(is_complete=False)),
+            # Reminder candidates: only goals never reminded are indexed, and user_id
+            # rides along so the shard bounds come from the index alone.
+            models.Index(
+                fields=['last_progress_date','user'],name='goal_reminder_due_idx',
+                condition=models.Q(last_reminder_sent_at__isnull=True),
+            ),
+        ]
+
     
 
     def __str__(self):
         return f"Goal- {self.goal_name} -created_at:{self.created_at}"
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self._state.adding and self.ordinal is None:
+                # Serialise concurrent creates for the same user before taking the next number.
+                list(CustomUser.objects.select_for_update().filter(pk=self.user_id).values_list('pk'))
+                last=Goal.objects.filter(user_id=self.user_id).aggregate(last=Max('ordinal'))['last']
+                self.ordinal=(last or 0)+1
+            super().save(*args, **kwargs)
+        bump_user_generation_on_commit(self.user_id)
+
+    # Deletes (including QuerySet.delete() and cascades) are handled in core/signals.py.
     
     @property
     def completion_percentage(self):
-        agg=self.progress.aggregate(
-            total_logged=Coalesce(Sum("logged_hours"),timedelta()),
-            total_hours=Coalesce(Sum("total_hours"),timedelta()),
-        )
-        total_logged=agg["total_logged"]
-        total_hours=agg["total_hours"]
+        total_logged=self.total_logged_hours or timedelta()
+        total_hours=self.total_planned_hours or timedelta()
 
         if total_hours.total_seconds()==0:
             return 0
         return round((total_logged.total_seconds()/total_hours.total_seconds())*100,2)
 
+    @classmethod
+    def apply_progress_delta(cls,goal_id,logged=timedelta(),planned=timedelta(),count=0,touch=False):
+        """Shift a goal's stored progress totals in a single UPDATE.
+
+        New entries, or ``touch``, also stamp ``last_progress_date``.
+        """
+        fields={
+            'total_logged_hours':F('total_logged_hours')+logged,
+            'total_planned_hours':F('total_planned_hours')+planned,
+            'progress_count':F('progress_count')+count,
+        }
+        if count>0 or touch:
+            fields['last_progress_date']=timezone.now()
+        cls.objects.filter(pk=goal_id).update(**fields)
+
 
 
     
@@ -62,6 +121,22 @@ class Progress(models.Model):
     logged_hours=models.DurationField(blank=True,null=True)
     total_hours=models.DurationField(blank=True,null=True)
     updated_at=models.DateTimeField(auto_now=True)
+    # 1-based position among the goal's progress entries (by id); the progressNum used in URLs.
+    ordinal=models.PositiveIntegerField(null=True,blank=True)
+
+    class Meta:
+        indexes=[
+            models.Index(fields=['goal','ordinal'],name='progress_goal_ordinal_idx'),
+            models.Index(fields=['goal','created_at','id'],name='progress_goal_created_idx'),
+        ]
+
+    @classmethod
+    def contribution(cls,pk):
+        """``(goal_id, logged, planned)`` the stored row adds to its goal's totals, row locked (None if gone)."""
+        row=cls.objects.select_for_update().filter(pk=pk).values_list('goal_id','logged_hours','total_hours').first()
+        if row is None:
+            return None
+        return (row[0],row[1] or timedelta(),row[2] or timedelta())
 
     @property
     def percentage_complete(self):
@@ -69,8 +144,7 @@ class Progress(models.Model):
             return (self.logged_hours.total_seconds() / self.total_hours.total_seconds()) * 100
         return 0
     
-    def save(self, *args, **kwargs):
-    
+    def _normalise_hours(self):
         if isinstance(self.logged_hours, str):
             h, m, s = map(int, self.logged_hours.split(":"))
             self.logged_hours = timedelta(hours=h, minutes=m, seconds=s)
@@ -82,7 +156,121 @@ class Progress(models.Model):
         
         self.is_complete = self.logged_hours >= self.total_hours
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+    
+        self._normalise_hours()
+
+        logged=self.logged_hours or timedelta()
+        planned=self.total_hours or timedelta()
+
+        with transaction.atomic():
+            # The stored values, not the ones this instance was loaded with: add_time
+            # may have changed the row since.
+            previous=None if self._state.adding else Progress.contribution(self.pk)
+            if self._state.adding and self.ordinal is None:
+                list(Goal.objects.select_for_update().filter(pk=self.goal_id).values_list('pk'))
+                last=Progress.objects.filter(goal_id=self.goal_id).aggregate(last=Max('ordinal'))['last']
+                self.ordinal=(last or 0)+1
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                self._shift_rollups(self.goal_id,logged,planned,1)
+            elif previous[0]!=self.goal_id:
+                self._shift_rollups(previous[0],-previous[1],-previous[2],-1)
+                self._shift_rollups(self.goal_id,logged,planned,1)
+            else:
+                self._shift_rollups(self.goal_id,logged-previous[1],planned-previous[2])
+
+    @classmethod
+    def bulk_log(cls,progresses,user_id,batch_size=500):
+        """Insert new Progress rows for one user's goals in a single transaction.
+
+        Does the same duration parsing and ``is_complete`` check as ``save``, but
+        updates goal totals once per goal and rollups once per bucket.
+        """
+        for progress in progresses:
+            progress._normalise_hours()
+        goal_ids=sorted({progress.goal_id for progress in progresses})
+
+        with transaction.atomic():
+            list(Goal.objects.select_for_update().filter(pk__in=goal_ids).values_list('pk'))
+            next_ordinal={
+                goal_id:(last or 0)+1
+                for goal_id,last in cls.objects.filter(goal_id__in=goal_ids).values('goal_id').annotate(
+                    last=Max('ordinal')
+                ).order_by().values_list('goal_id','last')
+            }
+            for progress in progresses:
+                ordinal=next_ordinal.get(progress.goal_id,1)
+                progress.ordinal=ordinal
+                next_ordinal[progress.goal_id]=ordinal+1
+
+            created=cls.objects.bulk_create(progresses,batch_size=batch_size)
+
+            goal_deltas={}
+            bucket_deltas={}
+            for progress in created:
+                logged=progress.logged_hours or timedelta()
+                planned=progress.total_hours or timedelta()
+                goal_delta=goal_deltas.setdefault(progress.goal_id,[timedelta(),timedelta(),0])
+                goal_delta[0]+=logged
+                goal_delta[1]+=planned
+                goal_delta[2]+=1
+                buckets=tuple(bucket_starts(progress.created_at).values())
+                bucket_delta=bucket_deltas.setdefault((progress.goal_id,buckets),[progress.created_at,timedelta(),0])
+                bucket_delta[1]+=logged
+                bucket_delta[2]+=1
+
+            for goal_id,(logged,planned,count) in goal_deltas.items():
+                Goal.apply_progress_delta(goal_id,logged,planned,count)
+            for (goal_id,_),(created_at,logged,count) in bucket_deltas.items():
+                ProgressRollup.apply_delta(goal_id,created_at,logged,count,user_id=user_id)
+            bump_user_generation_on_commit(user_id)
+        return created
+
+    @classmethod
+    def add_time(cls,user_id,goal_ordinal,ordinal,delta):
+        """Add ``delta`` to one entry's logged_hours in a single conditional UPDATE.
+
+        The database adds to whatever the row holds when it writes, so concurrent
+        calls never lose an increment, and ``is_complete`` is recomputed in the
+        same statement. Goal totals, ``last_progress_date``, rollups and cached
+        summaries follow. Returns the updated entry, or None when there is no such
+        entry or a negative ``delta`` would take logged_hours below zero.
+        """
+        logged=ExpressionWrapper(
+            Coalesce(F('logged_hours'),Value(timedelta()))+Value(delta),output_field=DurationField()
+        )
+        entry=cls.objects.filter(goal__user_id=user_id,goal__ordinal=goal_ordinal,ordinal=ordinal)
+        with transaction.atomic():
+            updated=entry.filter(logged_hours__gte=-delta) if delta<timedelta() else entry
+            if not updated.update(
+                logged_hours=logged,
+                is_complete=Case(When(total_hours__lte=logged,then=Value(True)),default=Value(False)),
+                updated_at=timezone.now(),
+            ):
+                return None
+            progress=entry.get()
+            Goal.apply_progress_delta(progress.goal_id,logged=delta,touch=True)
+            if delta:
+                ProgressRollup.apply_delta(progress.goal_id,progress.created_at,delta,user_id=user_id)
+            bump_user_generation_on_commit(user_id)
+        return progress
+
+    def _shift_rollups(self,goal_id,logged,planned,count=0):
+        goal=self._state.fields_cache.get('goal')
+        if goal is not None and goal.pk==goal_id:
+            user_id=goal.user_id
+        else:
+            user_id=Goal.objects.filter(pk=goal_id).values_list('user_id',flat=True).first()
+
+        if logged or planned or count:
+            Goal.apply_progress_delta(goal_id,logged,planned,count)
+        if user_id is None:
+            return
+        if logged or count:
+            ProgressRollup.apply_delta(goal_id,self.created_at,logged,count,user_id=user_id)
+        bump_user_generation_on_commit(user_id)
     
 
 
@@ -96,3 +284,68 @@ class Progress(models.Model):
 
 
 
+def bucket_starts(moment):
+    """Start of the week (Monday) and month containing ``moment``, in the current timezone.
+
+    Matches what TruncWeek/TruncMonth produce for the same value.
+    """
+    day=timezone.localtime(moment).date()
+    week=day-timedelta(days=day.weekday())
+    month=day.replace(day=1)
+    return {
+        ProgressRollup.Granularity.WEEK:timezone.make_aware(datetime.combine(week,time())),
+        ProgressRollup.Granularity.MONTH:timezone.make_aware(datetime.combine(month,time())),
+    }
+
+
+class ProgressRollup(models.Model):
+    """Logged time per goal per week/month, maintained incrementally as Progress is written."""
+    class Granularity(models.TextChoices):
+        WEEK='week'
+        MONTH='month'
+    user=models.ForeignKey(CustomUser,on_delete=models.CASCADE,related_name='progress_rollups')
+    goal=models.ForeignKey(Goal,on_delete=models.CASCADE,related_name='rollups')
+    granularity=models.CharField(max_length=5,choices=Granularity.choices)
+    bucket_start=models.DateTimeField()
+    logged_hours=models.DurationField(default=timedelta)
+    entry_count=models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints=[
+            models.UniqueConstraint(
+                fields=['user','granularity','bucket_start','goal'],
+                name='progress_rollup_bucket_uniq',
+            ),
+        ]
+        indexes=[
+            models.Index(fields=['goal','granularity','bucket_start'],name='progress_rollup_goal_idx'),
+        ]
+
+    def __str__(self):
+        return f"Rollup:{self.granularity}-{self.bucket_start}-goal:{self.goal_id}-logged:{self.logged_hours}"
+
+    @classmethod
+    def apply_delta(cls,goal_id,created_at,logged=timedelta(),count=0,user_id=None):
+        """Add ``logged``/``count`` to the week and month buckets containing ``created_at``."""
+        if user_id is None:
+            user_id=Goal.objects.filter(pk=goal_id).values_list('user_id',flat=True).first()
+            if user_id is None:
+                return
+        for granularity,bucket_start in bucket_starts(created_at).items():
+            lookup={'user_id':user_id,'goal_id':goal_id,'granularity':granularity,'bucket_start':bucket_start}
+            updated=cls.objects.filter(**lookup).update(
+                logged_hours=F('logged_hours')+logged,
+                entry_count=F('entry_count')+count,
+            )
+            if updated:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(logged_hours=logged,entry_count=max(count,0),**lookup)
+            except IntegrityError:
+                # Another writer created the bucket first; fold our delta into theirs.
+                cls.objects.filter(**lookup).update(
+                    logged_hours=F('logged_hours')+logged,
+                    entry_count=F('entry_count')+count,
+                )
+
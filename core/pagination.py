@@ -1,6 +1,142 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode,urlsafe_b64encode
+from datetime import datetime
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination,PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPagination(PageNumberPagination):
     page_size=5
     page_size_query_param='page_size'
-    max_page_size=10
\ No newline at end of file
+    max_page_size=10
+
+    async def apaginate_queryset(self,queryset,request,view=None):
+        """``paginate_queryset`` for async views: the count and the page go through the async ORM."""
+        page_size=self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator=self.django_paginator_class(queryset,page_size)
+        # Paginator.count is a cached_property; fill it so page() does no sync query.
+        paginator.count=await queryset.acount()
+        page_number=self.get_page_number(request,paginator)
+        try:
+            self.page=paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number,message=str(exc)))
+        self.request=request
+        return [obj async for obj in self.page.object_list]
+
+
+class KeysetPagination(BasePagination):
+    """Opt-in cursor pagination over (created_at, id).
+
+    Enabled with ``?pagination=cursor``; each page is one indexed range query with
+    no COUNT(*), and ``next``/``previous`` carry opaque cursors.
+    """
+    page_size=CustomPagination.page_size
+    page_size_query_param='page_size'
+    max_page_size=CustomPagination.max_page_size
+    cursor_query_param='cursor'
+    mode_query_param='pagination'
+    invalid_cursor_message='Invalid cursor'
+
+    @classmethod
+    def requested(cls,request):
+        return request.query_params.get(cls.mode_query_param)=='cursor' or cls.cursor_query_param in request.query_params
+
+    def get_page_size(self,request):
+        try:
+            size=int(request.query_params[self.page_size_query_param])
+        except (KeyError,ValueError):
+            return self.page_size
+        return min(size,self.max_page_size) if size>0 else self.page_size
+
+    def encode_cursor(self,position,reverse):
+        created_at,pk=position
+        raw=f"{created_at.isoformat()}|{pk}|{int(reverse)}"
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self,request):
+        encoded=request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None,False
+        try:
+            raw=urlsafe_b64decode(encoded+'='*(-len(encoded)%4)).decode()
+            created_at,pk,reverse=raw.split('|')
+            return (datetime.fromisoformat(created_at),int(pk)),reverse=='1'
+        except (TypeError,ValueError,UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def page_queryset(self,queryset,request):
+        """The queryset for one page plus one extra row (to detect more), and the cursor state."""
+        self.request=request
+        page_size=self.get_page_size(request)
+        position,reverse=self.decode_cursor(request)
+
+        if reverse:
+            queryset=queryset.order_by('-created_at','-id')
+            if position is not None:
+                created_at,pk=position
+                queryset=queryset.filter(Q(created_at__lt=created_at)|Q(created_at=created_at,id__lt=pk))
+        else:
+            queryset=queryset.order_by('created_at','id')
+            if position is not None:
+                created_at,pk=position
+                queryset=queryset.filter(Q(created_at__gt=created_at)|Q(created_at=created_at,id__gt=pk))
+        return queryset[:page_size+1],(page_size,position,reverse)
+
+    def finish_page(self,rows,state):
+        page_size,position,reverse=state
+        has_more=len(rows)>page_size
+        rows=rows[:page_size]
+        if reverse:
+            rows.reverse()
+            has_next,has_previous=position is not None,has_more
+        else:
+            has_next,has_previous=has_more,position is not None
+
+        # Rows may be model instances or values_list(named=True) rows, so read .id rather than .pk.
+        self.next_position=(rows[-1].created_at,rows[-1].id) if rows and has_next else None
+        self.previous_position=(rows[0].created_at,rows[0].id) if rows and has_previous else None
+        return rows
+
+    def paginate_queryset(self,queryset,request,view=None):
+        queryset,state=self.page_queryset(queryset,request)
+        return self.finish_page(list(queryset),state)
+
+    async def apaginate_queryset(self,queryset,request,view=None):
+        queryset,state=self.page_queryset(queryset,request)
+        return self.finish_page([row async for row in queryset],state)
+
+    def get_link(self,position,reverse):
+        if position is None:
+            return None
+        url=self.request.build_absolute_uri()
+        url=replace_query_param(url,self.mode_query_param,'cursor')
+        return replace_query_param(url,self.cursor_query_param,self.encode_cursor(position,reverse))
+
+    def get_next_link(self):
+        return self.get_link(self.next_position,False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_position,True)
+
+    def get_paginated_response(self,data):
+        return Response({
+            'next':self.get_next_link(),
+            'previous':self.get_previous_link(),
+            'results':data,
+        })
+
+    def get_paginated_response_schema(self,schema):
+        return {
+            'type':'object',
+            'required':['results'],
+            'properties':{
+                'next':{'type':'string','nullable':True,'format':'uri'},
+                'previous':{'type':'string','nullable':True,'format':'uri'},
+                'results':schema,
+            },
+        }
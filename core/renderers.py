@@ -0,0 +1,65 @@
+"""JSON renderer that encodes with orjson when it is installed.
+
+The bytes are the same as DRF's JSONRenderer (compact separators, UTF-8,
+U+2028/U+2029 escaped). Anything orjson would write differently falls back to
+DRF's renderer:
+- indented output;
+- data with types DRF's encoder converts, including datetimes, dates, times
+  and dataclasses, which orjson would otherwise encode itself (it writes
+  ``+00:00`` where DRF writes ``Z``). UUIDs stay with orjson: both write the
+  same hyphenated string;
+- floats that Python writes in exponent form (orjson writes ``1e-5`` where
+  Python writes ``1e-05``).
+"""
+import math
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# Hand these to _unsupported instead of orjson's own encoding, so they fall back.
+PASSTHROUGH = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson is not None else 0
+
+
+class _Fallback(TypeError):
+    pass
+
+
+def _unsupported(value):
+    raise _Fallback(type(value).__name__)
+
+
+def _has_exponent_float(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            magnitude = abs(value)
+            if magnitude and (magnitude < 1e-4 or magnitude >= 1e16) or not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_unsupported, option=PASSTHROUGH)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _has_exponent_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict-javascript-subset escaping as JSONRenderer.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -1,5 +1,6 @@
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import Goal, Progress,CustomUser
 
 
@@ -17,6 +18,25 @@ class ProgressSerializer(ModelSerializer):
         read_only_fields = ["goal","percentage_complete", "created_at", "updated_at"]
         extra_kwargs = {"goal": {"read_only": True}}  
     
+class BulkProgressEntrySerializer(ProgressSerializer):
+    goalNum = serializers.IntegerField(min_value=1, write_only=True)
+
+    class Meta(ProgressSerializer.Meta):
+        fields = ProgressSerializer.Meta.fields + ["goalNum"]
+        extra_kwargs = {
+            "goal": {"read_only": True},
+            "logged_hours": {"required": True, "allow_null": False},
+            "total_hours": {"required": True, "allow_null": False},
+        }
+
+class AddTimeSerializer(serializers.Serializer):
+    logged_hours = serializers.DurationField()
+
+    def validate_logged_hours(self, value):
+        if not value:
+            raise serializers.ValidationError("must not be zero")
+        return value
+
 class WeeklySummarySerializer(serializers.Serializer):
     week_start = serializers.DateTimeField()
     total_hours = serializers.DecimalField(max_digits=10, decimal_places=2)
@@ -25,8 +45,37 @@ class MonthlySummarySerializer(serializers.Serializer):
     month_start = serializers.DateTimeField()
     total_hours = serializers.DecimalField(max_digits=10, decimal_places=2)
 
+class CategoryTotalSerializer(serializers.Serializer):
+    category = serializers.CharField()
+    total_hours = serializers.DecimalField(max_digits=10, decimal_places=2)
+    goal_count = serializers.IntegerField()
+
+class DashboardGoalSerializer(ModelSerializer):
+    goalNum = serializers.IntegerField(source="ordinal")
+    logged_hours = serializers.DurationField(source="total_logged_hours")
+    planned_hours = serializers.DurationField(source="total_planned_hours")
+
+    class Meta:
+        model = Goal
+        fields = ["goalNum", "goal_name", "category", "is_complete", "progress_count", "logged_hours", "planned_hours", "completion_percentage"]
+
+class DashboardSerializer(serializers.Serializer):
+    weekly = WeeklySummarySerializer(many=True)
+    monthly = MonthlySummarySerializer(many=True)
+    categories = CategoryTotalSerializer(many=True)
+    goals = DashboardGoalSerializer(many=True)
+
 class UserSerializer(ModelSerializer):
     class Meta:
         model = CustomUser
         fields = '__all__'
         extra_kwargs = {"password": {"write_only": True}}
+
+
+class TierTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens that also carry the user's tier, for clients to read without a profile call."""
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["tier"] = user.tier
+        return token
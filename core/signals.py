@@ -0,0 +1,53 @@
+"""Upkeep of derived data on delete.
+
+Model ``delete()`` overrides do not run for ``QuerySet.delete()`` (the admin's
+"delete selected" action) or cascades, so goal totals, rollups, ordinals,
+cache generations and cached auth users are maintained from the delete signals
+instead. Connected in CoreConfig.ready.
+"""
+from django.db.models import F,QuerySet
+from django.db.models.signals import post_delete,pre_delete
+from django.dispatch import receiver
+from .caching import bump_user_generation_on_commit,invalidate_auth_user_on_commit
+from .models import CustomUser,Goal,Progress
+
+
+def deleted_directly(origin,model):
+    """True when ``model`` rows are what was deleted, not a cascade from their goal or user."""
+    return isinstance(origin,model) or (isinstance(origin,QuerySet) and origin.model is model)
+
+
+@receiver(post_delete,sender=CustomUser,dispatch_uid='core_user_deleted')
+def user_deleted(sender,instance,**kwargs):
+    # Otherwise JWT authentication keeps serving the cached row and the deleted
+    # user's unexpired tokens keep working.
+    invalidate_auth_user_on_commit(instance.pk)
+
+
+@receiver(post_delete,sender=Goal,dispatch_uid='core_goal_deleted')
+def goal_deleted(sender,instance,origin=None,**kwargs):
+    if deleted_directly(origin,Goal) and instance.ordinal is not None:
+        # Ordinals follow id order, so shifting the rows after this id stays
+        # correct however many goals one queryset delete removes, in any order.
+        Goal.objects.filter(user_id=instance.user_id,id__gt=instance.id).update(ordinal=F('ordinal')-1)
+    bump_user_generation_on_commit(instance.user_id)
+
+
+@receiver(pre_delete,sender=Progress,dispatch_uid='core_progress_deleting')
+def progress_deleting(sender,instance,origin=None,**kwargs):
+    # Runs inside the delete's transaction: lock the row and take what it
+    # contributes now, not what it held when the instance was loaded.
+    if deleted_directly(origin,Progress):
+        instance._deleted_contribution=Progress.contribution(instance.pk)
+
+
+@receiver(post_delete,sender=Progress,dispatch_uid='core_progress_deleted')
+def progress_deleted(sender,instance,origin=None,**kwargs):
+    contribution=getattr(instance,'_deleted_contribution',None)
+    if not deleted_directly(origin,Progress) or contribution is None:
+        # Deleted along with its goal: the goal's own signal handles the user.
+        return
+    goal_id,logged,planned=contribution
+    if instance.ordinal is not None:
+        Progress.objects.filter(goal_id=goal_id,id__gt=instance.id).update(ordinal=F('ordinal')-1)
+    instance._shift_rollups(goal_id,-logged,-planned,-1)
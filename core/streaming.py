@@ -0,0 +1,38 @@
+import json
+
+STREAM_FORMATS={
+    'ndjson':'application/x-ndjson',
+    'json':'application/json',
+}
+
+_encode=json.JSONEncoder(ensure_ascii=False,separators=(',',':'),default=str).encode
+
+
+def _batches(rows,batch_size):
+    batch=[]
+    for row in rows:
+        batch.append(_encode(row))
+        if len(batch)>=batch_size:
+            yield batch
+            batch=[]
+    if batch:
+        yield batch
+
+
+def stream_rows(rows,stream_format,batch_size=500):
+    """Yield encoded ``rows`` a batch at a time, as NDJSON lines or one JSON array.
+
+    ``rows`` should be a lazy iterator (e.g. ``queryset.iterator()``) so only one
+    batch is ever held in memory.
+    """
+    if stream_format=='ndjson':
+        for batch in _batches(rows,batch_size):
+            yield '\n'.join(batch)+'\n'
+        return
+
+    yield '['
+    first=True
+    for batch in _batches(rows,batch_size):
+        yield ('' if first else ',')+','.join(batch)
+        first=False
+    yield ']'
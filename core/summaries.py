@@ -0,0 +1,138 @@
+from decimal import Decimal
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q,Sum
+from .caching import cached_summary,summary_cache_key
+from .models import Goal,ProgressRollup,bucket_starts
+from .fast_serializers import (
+    FastCategoryTotalSerializer,FastDashboardGoalSerializer,FastMonthlySummarySerializer,FastWeeklySummarySerializer,
+)
+
+HOURS=Decimal('0.01')
+
+SUMMARY_SERIALIZERS={
+    ProgressRollup.Granularity.WEEK:FastWeeklySummarySerializer,
+    ProgressRollup.Granularity.MONTH:FastMonthlySummarySerializer,
+}
+
+
+def to_hours(duration):
+    seconds=Decimal((duration or timedelta()).total_seconds())
+    return (seconds/3600).quantize(HOURS)
+
+
+def summary_queryset(user_id,granularity,goal_id=None):
+    """``(bucket_start, logged)`` rows for a user (or one of their goals), read from ProgressRollup."""
+    rollups=ProgressRollup.objects.filter(granularity=granularity,entry_count__gt=0)
+    if goal_id is not None:
+        return rollups.filter(goal_id=goal_id).order_by('bucket_start').values_list('bucket_start','logged_hours')
+    return rollups.filter(user_id=user_id).values('bucket_start').annotate(
+        logged=Sum('logged_hours')
+    ).order_by('bucket_start').values_list('bucket_start','logged')
+
+
+def summary_rows(user_id,granularity,goal_id=None):
+    """Per-bucket logged hours as ``(bucket_start, total_hours)`` pairs ordered by bucket."""
+    return [(bucket_start,to_hours(logged)) for bucket_start,logged in summary_queryset(user_id,granularity,goal_id)]
+
+
+def serialize_summary(granularity,rows):
+    """``(bucket_start, total_hours)`` rows as the summary serializer's JSON-ready list."""
+    return SUMMARY_SERIALIZERS[granularity].serialize(rows)
+
+
+def build_summary(user_id,granularity,goal_id=None):
+    """Serialized weekly/monthly summary payload, as returned by the summary views."""
+    return serialize_summary(granularity,summary_rows(user_id,granularity,goal_id))
+
+
+async def abuild_summary(user_id,granularity,goal_id=None):
+    """``build_summary`` for async views: the rollup query runs through the async ORM."""
+    rows=[
+        (bucket_start,to_hours(logged))
+        async for bucket_start,logged in summary_queryset(user_id,granularity,goal_id)
+    ]
+    return serialize_summary(granularity,rows)
+
+
+def dashboard_window(since):
+    """The first week and month bucket a ``since`` moment falls in (None for all time)."""
+    if since is None:
+        return None
+    return bucket_starts(since)
+
+
+def build_dashboard(user_id,since=None):
+    """Weekly, monthly, per-category and per-goal figures for a user in one payload.
+
+    Two queries: the user's goals (stored totals give per-goal completion) and one
+    pass over their week and month rollups. With ``since``, only buckets from the
+    one containing it onwards are returned and category totals cover the same
+    weeks; per-goal completion is always all-time.
+    """
+    goals=list(FastDashboardGoalSerializer.values(Goal.objects.filter(user_id=user_id).order_by('ordinal')))
+    goal_categories={goal.id:goal.category for goal in goals}
+
+    rollups=ProgressRollup.objects.filter(user_id=user_id,entry_count__gt=0)
+    window=dashboard_window(since)
+    if window is not None:
+        rollups=rollups.filter(
+            Q(granularity=ProgressRollup.Granularity.WEEK,bucket_start__gte=window[ProgressRollup.Granularity.WEEK])|
+            Q(granularity=ProgressRollup.Granularity.MONTH,bucket_start__gte=window[ProgressRollup.Granularity.MONTH])
+        )
+
+    buckets={ProgressRollup.Granularity.WEEK:{},ProgressRollup.Granularity.MONTH:{}}
+    windowed_categories={}
+    for granularity,bucket_start,goal_id,logged in rollups.values_list('granularity','bucket_start','goal_id','logged_hours'):
+        category=goal_categories.get(goal_id)
+        if category is None:
+            # A goal committed after the goals query: leave it out of this payload
+            # too, so the totals match the goals it lists.
+            continue
+        totals=buckets[granularity]
+        totals[bucket_start]=totals.get(bucket_start,timedelta())+logged
+        if window is not None and granularity==ProgressRollup.Granularity.WEEK:
+            windowed_categories[category]=windowed_categories.get(category,timedelta())+logged
+
+    categories={}
+    for goal in goals:
+        logged,count=categories.get(goal.category,(timedelta(),0))
+        categories[goal.category]=(logged+goal.total_logged_hours,count+1)
+    if window is not None:
+        categories={
+            category:(windowed_categories.get(category,timedelta()),count)
+            for category,(_,count) in categories.items()
+        }
+
+    # Same shape as DashboardSerializer, built with the fast serializers.
+    return {
+        'weekly':FastWeeklySummarySerializer.serialize(
+            (bucket_start,to_hours(logged)) for bucket_start,logged in sorted(buckets[ProgressRollup.Granularity.WEEK].items())
+        ),
+        'monthly':FastMonthlySummarySerializer.serialize(
+            (bucket_start,to_hours(logged)) for bucket_start,logged in sorted(buckets[ProgressRollup.Granularity.MONTH].items())
+        ),
+        'categories':FastCategoryTotalSerializer.serialize(
+            (category,to_hours(logged),count) for category,(logged,count) in sorted(categories.items())
+        ),
+        'goals':FastDashboardGoalSerializer.serialize(goals),
+    }
+
+
+def warm_user_summaries(user_id):
+    """Precompute the all-goals weekly, monthly and dashboard summaries a user's pages open with.
+
+    Goes through the same single-flight path as the views, so it never duplicates
+    a computation a live request is already running. Returns ``(computed, already_cached)``.
+    """
+    warmers=(
+        ('weekly',lambda:build_summary(user_id,ProgressRollup.Granularity.WEEK),'WEEKLY_SUMMARY_CACHE_TIMEOUT'),
+        ('monthly',lambda:build_summary(user_id,ProgressRollup.Granularity.MONTH),'MONTHLY_SUMMARY_CACHE_TIMEOUT'),
+        ('dashboard',lambda:build_dashboard(user_id),'DASHBOARD_SUMMARY_CACHE_TIMEOUT'),
+    )
+    computed=0
+    for kind,compute,timeout_setting in warmers:
+        _,hit=cached_summary(summary_cache_key(kind,user_id),compute,getattr(settings,timeout_setting,300))
+        computed+=not hit
+    return computed,len(warmers)-computed
+
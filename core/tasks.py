@@ -1,32 +1,265 @@
-from celery import shared_task
-from django.core.mail import send_mail
+from celery import shared_task,chord
+from django.conf import settings
+from django.core.mail import EmailMessage,get_connection
+from django.db import transaction
+from django.db.models import Min,Max
 from django.utils import timezone
 from datetime import timedelta
 from .models import Goal
+from .summaries import warm_user_summaries
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-@shared_task
-def send_reminder_emails():
-    logger.info("Starting reminder task")
-    seven_days_ago = timezone.now() - timedelta(days=7)
-    goals = Goal.objects.filter(
-        last_progress_date__lt=seven_days_ago,
+REMINDER_AFTER = timedelta(days=7)
+REMINDER_FROM_EMAIL = "randomdude@learnflow.com"
+REMINDER_CHUNK_SIZE = 500
+REMINDER_SUMMARY_FIELDS = ('sent', 'skipped', 'failed', 'chunks')
+SUMMARY_WARM_FIELDS = ('users', 'computed', 'already_cached', 'failed')
+
+
+def inactive_goals(now=None):
+    now = now or timezone.now()
+    return Goal.objects.filter(
+        last_progress_date__lt=now - REMINDER_AFTER,
         last_reminder_sent_at__isnull=True
-    ).select_related('user')
-    logger.info(f"Found {goals.count()} inactive goals")
-    for goal in goals:
-        user = goal.user
-        logger.info(f"Sending reminder for goal {goal.id} to {user.email}")
-        send_mail(
-            subject='Remainder:Update your goal progress',
-            message=f"Hi {user.username}, you haven't updated your {goal} in over 7 days!",
-            from_email="randomdude@learnflow.com",
-            recipient_list=[user.email],
-            fail_silently=False,  
+    )
+
+
+def reminder_message(goal, connection=None):
+    user = goal.user
+    return EmailMessage(
+        subject='Remainder:Update your goal progress',
+        body=f"Hi {user.username}, you haven't updated your {goal} in over 7 days!",
+        from_email=REMINDER_FROM_EMAIL,
+        to=[user.email],
+        connection=connection,
+    )
+
+
+def shard_ranges(lowest, highest, shards):
+    """Split the inclusive user-id range [lowest, highest] into at most ``shards`` half-open ranges."""
+    span = highest - lowest + 1
+    width = max(1, -(-span // shards))
+    return [(start, min(start + width, highest + 1)) for start in range(lowest, highest + 1, width)]
+
+
+def claim_chunk(candidates, after_pk, chunk_size):
+    """Claim the next chunk of candidate goals by stamping last_reminder_sent_at.
+
+    The conditional UPDATE is the claim: a goal already stamped by an overlapping
+    run or an earlier attempt of this shard is not claimed again. Returns
+    ``(last_pk_seen, claimed_goals, skipped)``.
+    """
+    with transaction.atomic():
+        ids = list(
+            candidates.filter(pk__gt=after_pk).select_for_update(skip_locked=True)
+            .order_by('pk').values_list('pk', flat=True)[:chunk_size]
         )
-        logger.info(f"Email sent to {user.email}")
-        goal.last_reminder_sent_at = timezone.now()
-        goal.save()
-    logger.info("Reminder task completed")
\ No newline at end of file
+        if not ids:
+            return None, [], 0
+        claimed_at = timezone.now()
+        Goal.objects.filter(pk__in=ids, last_reminder_sent_at__isnull=True).update(last_reminder_sent_at=claimed_at)
+    claimed = list(
+        Goal.objects.filter(pk__in=ids, last_reminder_sent_at=claimed_at).select_related('user').only(
+            'id', 'goal_name', 'created_at', 'last_reminder_sent_at', 'user__username', 'user__email'
+        ).order_by('pk')
+    )
+    return ids[-1], claimed, len(ids) - len(claimed)
+
+
+def release_claim(goals):
+    """Undo a claim whose emails could not be sent, so the next run retries them."""
+    for claimed_at in {goal.last_reminder_sent_at for goal in goals}:
+        Goal.objects.filter(
+            pk__in=[goal.pk for goal in goals if goal.last_reminder_sent_at == claimed_at],
+            last_reminder_sent_at=claimed_at,
+        ).update(last_reminder_sent_at=None)
+
+
+def send_reminders(goals):
+    """Email each goal over one connection; returns ``(sent_goals, unsent_goals)``.
+
+    Messages go one at a time, so a failure only affects that goal: the ones
+    before it have been delivered and must stay claimed.
+    """
+    sent, unsent = [], []
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for goal in goals:
+                try:
+                    delivered = connection.send_messages([reminder_message(goal, connection)])
+                except Exception:
+                    logger.exception("Reminder for goal %d failed", goal.pk)
+                    delivered = 0
+                (sent if delivered else unsent).append(goal)
+    except Exception:
+        # Opening or closing the connection failed; only what was already sent counts.
+        logger.exception("Reminder mail connection failed")
+        unsent = [goal for goal in goals if goal not in sent]
+    return sent, unsent
+
+
+@shared_task
+def send_reminder_shard(user_id_from, user_id_to, chunk_size=REMINDER_CHUNK_SIZE):
+    """Send reminders for inactive goals owned by users in [user_id_from, user_id_to)."""
+    started = time.perf_counter()
+    candidates = inactive_goals().filter(user_id__gte=user_id_from, user_id__lt=user_id_to)
+    counts = dict.fromkeys(REMINDER_SUMMARY_FIELDS, 0)
+
+    last_pk = 0
+    while True:
+        last_pk, claimed, skipped = claim_chunk(candidates, last_pk, chunk_size)
+        if last_pk is None:
+            break
+        counts['chunks'] += 1
+        counts['skipped'] += skipped
+        sendable = [goal for goal in claimed if goal.user.email]
+        counts['skipped'] += len(claimed) - len(sendable)
+        if not sendable:
+            continue
+        sent, unsent = send_reminders(sendable)
+        counts['sent'] += len(sent)
+        if unsent:
+            logger.warning(
+                "Reminder chunk for users %d-%d: %d of %d emails failed",
+                user_id_from, user_id_to, len(unsent), len(sendable)
+            )
+            release_claim(unsent)
+            counts['failed'] += len(unsent)
+
+    counts['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(
+        "Reminder shard %d-%d: %d sent, %d skipped, %d failed in %.3fs",
+        user_id_from, user_id_to, counts['sent'], counts['skipped'], counts['failed'], counts['seconds']
+    )
+    return counts
+
+
+@shared_task
+def summarize_reminder_shards(results, started_at=None):
+    summary = {field: sum(result[field] for result in results) for field in REMINDER_SUMMARY_FIELDS}
+    summary['shards'] = len(results)
+    summary['seconds'] = round(time.time() - started_at, 3) if started_at else max(
+        (result['seconds'] for result in results), default=0.0
+    )
+    summary['emails_per_second'] = round(summary['sent'] / summary['seconds'], 1) if summary['seconds'] else 0.0
+    logger.info(
+        "Reminder task completed: %(sent)d sent, %(skipped)d skipped, %(failed)d failed "
+        "across %(shards)d shards in %(seconds).3fs (%(emails_per_second).1f/s)",
+        summary
+    )
+    return summary
+
+
+def dispatch_reminder_shards(shards=None, chunk_size=REMINDER_CHUNK_SIZE):
+    """Fan the inactive-goal set out as a chord of user-id range shards.
+
+    Returns ``(shard_count, chord_result)``; the chord's value is the combined
+    summary from summarize_reminder_shards.
+    """
+    shards = shards or getattr(settings, 'REMINDER_SHARD_COUNT', 8)
+    bounds = inactive_goals().aggregate(lowest=Min('user_id'), highest=Max('user_id'))
+    if bounds['lowest'] is None:
+        return 0, None
+    header = [
+        send_reminder_shard.s(start, stop, chunk_size)
+        for start, stop in shard_ranges(bounds['lowest'], bounds['highest'], shards)
+    ]
+    return len(header), chord(header)(summarize_reminder_shards.s(started_at=time.time()))
+
+
+@shared_task(bind=True)
+def send_reminder_emails(self, shards=None, chunk_size=REMINDER_CHUNK_SIZE):
+    logger.info("Starting reminder task")
+    shard_count, result = dispatch_reminder_shards(shards, chunk_size)
+    if result is None:
+        logger.info("Reminder task completed: no inactive goals")
+        return {'shards': 0}
+    dispatched = {'shards': shard_count, 'chord_id': result.id}
+    if self.app.conf.task_always_eager:
+        # The chord already ran inline; hand back its summary.
+        dispatched['summary'] = result.result
+    return dispatched
+
+
+def recently_active_users(since):
+    """Ids of users who logged progress on any goal since ``since``."""
+    return Goal.objects.filter(last_progress_date__gte=since).order_by('user_id').values_list('user_id', flat=True).distinct()
+
+
+# Celery applies rate_limit per worker, so warming batches trickle in behind live traffic.
+@shared_task(rate_limit=getattr(settings, 'SUMMARY_WARM_RATE_LIMIT', '30/m'))
+def warm_summary_batch(user_ids):
+    counts = dict.fromkeys(SUMMARY_WARM_FIELDS, 0)
+    for user_id in user_ids:
+        try:
+            computed, already_cached = warm_user_summaries(user_id)
+        except Exception:
+            logger.exception("Warming summaries for user %d failed", user_id)
+            counts['failed'] += 1
+            continue
+        counts['users'] += 1
+        counts['computed'] += computed
+        counts['already_cached'] += already_cached
+    return counts
+
+
+@shared_task
+def summarize_summary_warming(results, started_at=None):
+    """Combine batch counts into a coverage report.
+
+    ``hit_ratio_before`` is the share of warmed keys that were already cached,
+    i.e. the hit ratio those users' first page loads would have had without
+    warming; after warming every key of a warmed user is cached.
+    """
+    summary = {field: sum(result[field] for result in results) for field in SUMMARY_WARM_FIELDS}
+    summary['batches'] = len(results)
+    summary['seconds'] = round(time.time() - started_at, 3) if started_at else 0.0
+    keys = summary['computed'] + summary['already_cached']
+    active = summary['users'] + summary['failed']
+    summary['coverage'] = round(summary['users'] / active, 4) if active else 1.0
+    summary['hit_ratio_before'] = round(summary['already_cached'] / keys, 4) if keys else 1.0
+    summary['hit_ratio_after'] = 1.0 if keys else summary['hit_ratio_before']
+    logger.info(
+        "Summary warming completed: %(users)d users in %(batches)d batches, %(computed)d keys computed, "
+        "%(already_cached)d already cached, %(failed)d failed; coverage %(coverage).2f, "
+        "hit ratio %(hit_ratio_before).2f -> %(hit_ratio_after).2f in %(seconds).3fs",
+        summary
+    )
+    return summary
+
+
+def summary_warming_batches(active_within=None, batch_size=None, now=None):
+    active_within = active_within or timedelta(hours=getattr(settings, 'SUMMARY_WARM_ACTIVE_WITHIN_HOURS', 24 * 7))
+    batch_size = batch_size or getattr(settings, 'SUMMARY_WARM_BATCH_SIZE', 50)
+    user_ids = list(recently_active_users((now or timezone.now()) - active_within))
+    return [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+
+
+def dispatch_summary_warming(active_within=None, batch_size=None):
+    """Fan recently active users out as a chord of rate-limited warming batches.
+
+    Returns ``(batch_count, chord_result)``; the chord's value is the report
+    from summarize_summary_warming.
+    """
+    batches = summary_warming_batches(active_within, batch_size)
+    if not batches:
+        return 0, None
+    header = [warm_summary_batch.s(user_ids) for user_ids in batches]
+    return len(header), chord(header)(summarize_summary_warming.s(started_at=time.time()))
+
+
+@shared_task(bind=True)
+def warm_summary_caches(self, active_within_hours=None, batch_size=None):
+    active_within = timedelta(hours=active_within_hours) if active_within_hours else None
+    batch_count, result = dispatch_summary_warming(active_within, batch_size)
+    if result is None:
+        logger.info("Summary warming completed: no recently active users")
+        return {'batches': 0}
+    dispatched = {'batches': batch_count, 'chord_id': result.id}
+    if self.app.conf.task_always_eager:
+        dispatched['summary'] = result.result
+    return dispatched
+
@@ -1,9 +1,47 @@
-from django.test import TestCase
+from django.test import TestCase,TransactionTestCase,override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import OperationalError,close_old_connections,connection,transaction
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocMemEmailBackend
+from io import StringIO
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 
-from .models import Goal,Progress,CustomUser
-from datetime import timedelta
+from .models import Goal,Progress,CustomUser,ProgressRollup
+from .caching import LOCK_KEY,bump_user_generation,cached_summary,generation_timestamp,get_user_generation,summary_cache,summary_cache_key
+from .throttling import TierUserThrottle
+from .summaries import build_dashboard,serialize_summary,summary_queryset,summary_rows
+from .serializers import GoalSerializer,ProgressSerializer,WeeklySummarySerializer
+from .fast_serializers import FastGoalSerializer,FastProgressSerializer
+from .renderers import FastJSONRenderer
+from .tasks import warm_summary_caches,send_reminder_emails,send_reminder_shard,claim_chunk,inactive_goals,shard_ranges
+from .datagen import DatasetGenerator,historical_timestamps
+from rest_framework_simplejwt.tokens import AccessToken,RefreshToken
+from .metrics import registry as metrics_registry
+from .log_handlers import QueuedRotatingFileHandler
+from .cache_backends import TwoTierCache
+from learnflow_backend.celery import app as celery_app
+from learnflow_backend.database import database_config
+from core import urls as core_urls
+from core.management.commands.benchmark_cache import Command as BenchmarkCommand,percentile
+from unittest import mock
+from importlib import import_module
+from django.apps import apps as django_apps
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from django.utils.http import http_date
 
 class GoalsAppJWTTests(TestCase):
     def setUp(self):
@@ -151,4 +189,1329 @@ class ProgressViewTests(TestCase):
     def test_invalid_progressNum_returns_404(self):
         url = f"/api/goals/1/progress/10/"
         response = self.client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class GoalProgressTotalsTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="totals", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.goal = Goal.objects.create(user=self.user, goal_name="Learn SQL", category="Primary")
+
+    def test_totals_follow_progress_writes(self):
+        progress = Progress.objects.create(
+            goal=self.goal, progress="Joins",
+            total_hours=timedelta(hours=4), logged_hours=timedelta(hours=1)
+        )
+        Progress.objects.create(
+            goal=self.goal, progress="Indexes",
+            total_hours=timedelta(hours=2), logged_hours=timedelta(hours=1)
+        )
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.progress_count, 2)
+        self.assertEqual(self.goal.total_logged_hours, timedelta(hours=2))
+        self.assertEqual(self.goal.total_planned_hours, timedelta(hours=6))
+        self.assertIsNotNone(self.goal.last_progress_date)
+        self.assertEqual(self.goal.completion_percentage, 33.33)
+
+        progress.logged_hours = timedelta(hours=3)
+        progress.save()
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.total_logged_hours, timedelta(hours=4))
+
+        progress.delete()
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.progress_count, 1)
+        self.assertEqual(self.goal.total_logged_hours, timedelta(hours=1))
+        self.assertEqual(self.goal.total_planned_hours, timedelta(hours=2))
+
+    def test_migration_fills_totals_from_existing_progress(self):
+        Progress.objects.create(goal=self.goal, progress="a", total_hours=timedelta(hours=2), logged_hours=timedelta(hours=1))
+        Goal.objects.filter(pk=self.goal.pk).update(total_logged_hours=timedelta(0), total_planned_hours=timedelta(0), progress_count=0)
+        import_module("core.migrations.0003_goal_progress_totals").populate_totals(django_apps, None)
+        self.goal.refresh_from_db()
+        self.assertEqual((self.goal.progress_count, self.goal.total_logged_hours, self.goal.total_planned_hours), (1, timedelta(hours=1), timedelta(hours=2)))
+
+    def test_queryset_delete_keeps_totals_and_rollups(self):
+        for name in ("a", "b", "c"):
+            Progress.objects.create(goal=self.goal, progress=name, total_hours=timedelta(hours=2), logged_hours=timedelta(hours=1))
+        Progress.objects.filter(goal=self.goal, progress__in=["a", "b"]).delete()
+        self.goal.refresh_from_db()
+        self.assertEqual((self.goal.progress_count, self.goal.total_logged_hours), (1, timedelta(hours=1)))
+        self.assertEqual(list(Progress.objects.filter(goal=self.goal).values_list("ordinal", flat=True)), [1])
+        self.assertEqual(set(ProgressRollup.objects.filter(goal=self.goal).values_list("entry_count", flat=True)), {1})
+        call_command("rebuild_progress_rollups", "--verify", stdout=StringIO())
+
+    def test_save_after_concurrent_add_time_does_not_drift(self):
+        progress = Progress.objects.create(goal=self.goal, progress="a", total_hours=timedelta(hours=4), logged_hours=timedelta(hours=1))
+        stale = Progress.objects.get(pk=progress.pk)
+        Progress.add_time(self.user.id, self.goal.ordinal, progress.ordinal, timedelta(hours=1))
+        stale.progress = "renamed"
+        stale.logged_hours = timedelta(hours=3)
+        stale.save()
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.total_logged_hours, timedelta(hours=3))
+
+    def test_goal_listing_query_count_is_fixed(self):
+        def listing_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get("/api/goals/", {"page_size": 10})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        Progress.objects.create(goal=self.goal, progress="a", total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        baseline = listing_queries()
+        for i in range(5):
+            goal = Goal.objects.create(user=self.user, goal_name=f"Goal {i}")
+            Progress.objects.create(goal=goal, progress="a", total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        self.assertEqual(listing_queries(), baseline)
+
+    def test_backfill_command_repairs_drift(self):
+        Progress.objects.create(
+            goal=self.goal, progress="Joins",
+            total_hours=timedelta(hours=4), logged_hours=timedelta(hours=1)
+        )
+        Goal.objects.filter(pk=self.goal.pk).update(
+            total_logged_hours=timedelta(0), total_planned_hours=timedelta(0), progress_count=0
+        )
+        call_command("backfill_goal_totals", stdout=StringIO())
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.progress_count, 1)
+        self.assertEqual(self.goal.total_logged_hours, timedelta(hours=1))
+        self.assertEqual(self.goal.total_planned_hours, timedelta(hours=4))
+
+
+class SummaryRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="rollups", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.goal = Goal.objects.create(user=self.user, goal_name="Learn Go")
+        self.other_goal = Goal.objects.create(user=self.user, goal_name="Learn Rust")
+        self.progress = Progress.objects.create(
+            goal=self.goal, progress="Syntax",
+            total_hours=timedelta(hours=2), logged_hours=timedelta(minutes=90)
+        )
+        Progress.objects.create(
+            goal=self.other_goal, progress="Ownership",
+            total_hours=timedelta(hours=2), logged_hours=timedelta(minutes=45)
+        )
+
+    def test_weekly_summary_reads_rollups(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/summary/weekly/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["total_hours"], "2.25")
+        self.assertFalse(any("core_progress\"" in q["sql"] for q in ctx.captured_queries))
+
+    def test_monthly_summary_for_one_goal(self):
+        response = self.client.get("/api/summary/monthly/2/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["total_hours"], "0.75")
+
+    def test_rollups_follow_updates_and_deletes(self):
+        self.progress.logged_hours = timedelta(hours=2)
+        self.progress.save()
+        call_command("rebuild_progress_rollups", "--verify", stdout=StringIO())
+        self.progress.delete()
+        call_command("rebuild_progress_rollups", "--verify", stdout=StringIO())
+        response = self.client.get("/api/summary/weekly/1/")
+        self.assertEqual(response.data, [])
+
+    def test_verify_detects_drift_and_rebuild_repairs_it(self):
+        ProgressRollup.objects.filter(goal=self.goal).update(logged_hours=timedelta(0))
+        with self.assertRaises(CommandError):
+            call_command("rebuild_progress_rollups", "--verify", stdout=StringIO())
+        call_command("rebuild_progress_rollups", stdout=StringIO())
+        call_command("rebuild_progress_rollups", "--verify", stdout=StringIO())
+
+
+    def test_migration_fills_rollups_from_existing_progress(self):
+        populate_rollups = import_module("core.migrations.0004_progress_rollup").populate_rollups
+        expected = sorted(ProgressRollup.objects.values_list("goal_id", "granularity", "logged_hours", "entry_count"))
+        ProgressRollup.objects.all().delete()
+        populate_rollups(django_apps, None)
+        self.assertEqual(sorted(ProgressRollup.objects.values_list("goal_id", "granularity", "logged_hours", "entry_count")), expected)
+
+    def test_repair_commands_invalidate_cached_summaries(self):
+        ProgressRollup.objects.filter(goal=self.goal).update(logged_hours=timedelta(0))
+        self.assertEqual(self.client.get("/api/summary/weekly/").data[0]["total_hours"], "0.75")
+        call_command("rebuild_progress_rollups", stdout=StringIO())
+        self.assertEqual(self.client.get("/api/summary/weekly/").data[0]["total_hours"], "2.25")
+
+        Goal.objects.filter(pk=self.goal.pk).update(total_logged_hours=timedelta(0))
+        self.assertEqual(self.client.get("/api/summary/dashboard/").data["goals"][0]["logged_hours"], "00:00:00")
+        call_command("backfill_goal_totals", stdout=StringIO())
+        self.assertEqual(self.client.get("/api/summary/dashboard/").data["goals"][0]["logged_hours"], "01:30:00")
+
+
+class SummaryCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="generations", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.goal = Goal.objects.create(user=self.user, goal_name="Learn Elixir")
+
+    def log_progress(self, hours):
+        with self.captureOnCommitCallbacks(execute=True):
+            Progress.objects.create(
+                goal=self.goal, progress="Session",
+                total_hours=timedelta(hours=10), logged_hours=timedelta(hours=hours)
+            )
+
+    def test_progress_write_invalidates_cached_summary(self):
+        self.log_progress(1)
+        first = self.client.get("/api/summary/weekly/")
+        self.assertEqual(first.data[0]["total_hours"], "1.00")
+
+        self.log_progress(2)
+        second = self.client.get("/api/summary/weekly/")
+        self.assertEqual(second.data[0]["total_hours"], "3.00")
+
+    def test_key_is_stable_until_a_write(self):
+        key = summary_cache_key("monthly", self.user.id, 1)
+        self.assertEqual(summary_cache_key("monthly", self.user.id, 1), key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.goal.save()
+        self.assertNotEqual(summary_cache_key("monthly", self.user.id, 1), key)
+
+    def test_cache_status_logging_reports_hit_ratio(self):
+        self.log_progress(1)
+        with self.assertLogs("core.views", level="INFO") as logs:
+            self.client.get("/api/summary/monthly/")
+            self.client.get("/api/summary/monthly/")
+        self.assertIn("Cache miss", logs.records[0].getMessage())
+        self.assertIn("Cache hit", logs.records[1].getMessage())
+        self.assertTrue(hasattr(logs.records[1], "hit_ratio"))
+
+
+class OrdinalLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="ordinals", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.goals = [Goal.objects.create(user=self.user, goal_name=f"Goal {i}") for i in range(1, 6)]
+
+    def test_ordinals_are_assigned_and_compacted(self):
+        self.assertEqual([g.ordinal for g in self.goals], [1, 2, 3, 4, 5])
+        self.goals[1].delete()
+        self.assertEqual(
+            list(Goal.objects.filter(user=self.user).order_by("id").values_list("ordinal", flat=True)),
+            [1, 2, 3, 4],
+        )
+        response = self.client.get("/api/goals/2")
+        self.assertEqual(response.data["goal_name"], "Goal 3")
+
+    def test_queryset_and_cascade_deletes_compact_ordinals(self):
+        Progress.objects.create(goal=self.goals[1], progress="a", total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        Goal.objects.filter(pk__in=[self.goals[3].pk, self.goals[1].pk]).delete()
+        self.assertEqual(
+            list(Goal.objects.filter(user=self.user).order_by("id").values_list("ordinal", flat=True)),
+            [1, 2, 3],
+        )
+        self.assertEqual(self.client.get("/api/goals/2").data["goal_name"], "Goal 3")
+        self.assertFalse(ProgressRollup.objects.filter(user=self.user).exists())
+
+    def test_progress_ordinals_follow_goal(self):
+        for name in ("a", "b", "c"):
+            Progress.objects.create(goal=self.goals[0], progress=name,
+                                    total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        self.assertEqual(
+            list(Progress.objects.filter(goal=self.goals[0]).order_by("id").values_list("ordinal", flat=True)),
+            [1, 2, 3],
+        )
+        Progress.objects.get(goal=self.goals[0], ordinal=1).delete()
+        self.assertEqual(Progress.objects.get(goal=self.goals[0], ordinal=1).progress, "b")
+
+    def test_goal_lookup_plan_does_not_depend_on_position(self):
+        def lookup_sql(goalNum):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(f"/api/goals/{goalNum}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [q["sql"].replace(f"\"ordinal\" = {goalNum}", "\"ordinal\" = ?") for q in ctx.captured_queries]
+
+        first, last = lookup_sql(1), lookup_sql(5)
+        self.assertEqual(first, last)
+        self.assertFalse(any("OFFSET" in sql for sql in first))
+        plan_first = Goal.objects.filter(user=self.user, ordinal=1).explain()
+        plan_last = Goal.objects.filter(user=self.user, ordinal=5).explain()
+        self.assertEqual(plan_first, plan_last)
+        self.assertIn("goal_user_ordinal_idx", plan_first)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="cursors", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for i in range(12):
+            Goal.objects.create(user=self.user, goal_name=f"Goal {i}")
+        # Force ties on created_at so the id tie-breaker is exercised.
+        Goal.objects.filter(user=self.user, ordinal__lte=6).update(created_at=timezone.now())
+
+    def test_walks_all_goals_forward_and_back_without_count(self):
+        seen = []
+        url = "/api/goals/?pagination=cursor&page_size=5"
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+            pages.append(response.data)
+            seen.extend(goal["id"] for goal in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(pages), 3)
+        expected = list(Goal.objects.filter(user=self.user).order_by("created_at", "id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+        back = self.client.get(pages[2]["previous"])
+        self.assertEqual([g["id"] for g in back.data["results"]], [g["id"] for g in pages[1]["results"]])
+        self.assertIsNone(pages[0]["previous"])
+
+    def test_progress_listing_cursor_mode(self):
+        goal = Goal.objects.get(user=self.user, ordinal=1)
+        for i in range(7):
+            Progress.objects.create(goal=goal, progress=f"p{i}",
+                                    total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        first = self.client.get("/api/goals/1/progress/?pagination=cursor&page_size=5")
+        self.assertEqual(len(first.data["results"]), 5)
+        second = self.client.get(first.data["next"])
+        self.assertEqual([p["progress"] for p in second.data["results"]], ["p5", "p6"])
+        self.assertIsNone(second.data["next"])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get("/api/goals/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StreamingProgressListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="streamer", password="password123")
+        other = CustomUser.objects.create_user(username="other", password="password123")
+        self.goal = Goal.objects.create(user=self.user, goal_name="Learn Haskell")
+        self.other_goal = Goal.objects.create(user=other, goal_name="Learn OCaml")
+        for i in range(3):
+            Progress.objects.create(goal=self.goal, progress=f"Monads {i}",
+                                    total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        Progress.objects.create(goal=self.other_goal, progress="Functors",
+                                total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        self.client.force_authenticate(user=self.user)
+
+    def test_ndjson_stream_has_only_own_entries(self):
+        response = self.client.get("/api/progress/", {"stream": "ndjson"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["progress"] for line in lines], ["Monads 0", "Monads 1", "Monads 2"])
+
+    def test_json_stream_matches_buffered_response(self):
+        buffered = self.client.get("/api/progress/", {"goal": self.goal.ordinal})
+        streamed = self.client.get("/api/progress/", {"stream": "json", "goal": self.goal.ordinal})
+        self.assertEqual(json.loads(b"".join(streamed.streaming_content)), buffered.json())
+
+    def test_empty_json_stream_is_valid(self):
+        response = self.client.get("/api/progress/", {"stream": "json", "goal": 0})
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get("/api/progress/", {"goal": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_goal_filter_is_a_goal_num(self):
+        second = Goal.objects.create(user=self.user, goal_name="Learn Idris")
+        Progress.objects.create(goal=second, progress="Dependent types",
+                                total_hours=timedelta(hours=1), logged_hours=timedelta(0))
+        response = self.client.get("/api/progress/", {"goal": second.ordinal})
+        self.assertEqual([row["progress"] for row in response.json()], ["Dependent types"])
+        self.assertNotEqual(second.ordinal, second.id)
+
+    def test_other_users_entries_are_never_listed(self):
+        for goal in (self.other_goal.id, self.other_goal.ordinal):
+            response = self.client.get("/api/progress/", {"goal": goal, "user": self.other_goal.user_id})
+            self.assertNotIn("Functors", [row["progress"] for row in response.json()])
+        self.assertEqual(APIClient().get("/api/progress/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BulkProgressTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="bulk", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.first = Goal.objects.create(user=self.user, goal_name="Learn C")
+        self.second = Goal.objects.create(user=self.user, goal_name="Learn Zig")
+        Progress.objects.create(goal=self.first, progress="Pointers",
+                                total_hours=timedelta(hours=1), logged_hours=timedelta(hours=1))
+
+    def entries(self, count):
+        return [
+            {"goalNum": 1 + i % 2, "progress": f"Session {i}", "logged_hours": "01:00:00", "total_hours": "02:00:00"}
+            for i in range(count)
+        ]
+
+    def test_bulk_insert_across_goals(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/goals/progress/bulk/", self.entries(100), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 100)
+        self.assertLess(len(ctx.captured_queries), 20)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.progress_count, 51)
+        self.assertEqual(self.second.progress_count, 50)
+        self.assertEqual(self.second.total_logged_hours, timedelta(hours=50))
+        self.assertEqual(
+            list(Progress.objects.filter(goal=self.first).order_by("id").values_list("ordinal", flat=True)),
+            list(range(1, 52)),
+        )
+        self.assertFalse(Progress.objects.filter(goal=self.second, is_complete=True).exists())
+        call_command("rebuild_progress_rollups", "--verify", stdout=StringIO())
+
+    def test_bulk_uses_one_throttle_slot(self):
+        for _ in range(3):
+            response = self.client.post("/api/goals/progress/bulk/", {"entries": self.entries(20)}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Progress.objects.filter(goal__user=self.user).count(), 61)
+
+    def test_unknown_goal_rejects_whole_batch(self):
+        entries = self.entries(2) + [{"goalNum": 9, "progress": "x", "logged_hours": "00:10:00", "total_hours": "01:00:00"}]
+        response = self.client.post("/api/goals/progress/bulk/", entries, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data["goalNums"], [9])
+        self.assertEqual(Progress.objects.filter(goal__user=self.user).count(), 1)
+
+    def test_invalid_entry_returns_field_errors(self):
+        response = self.client.post("/api/goals/progress/bulk/", [{"goalNum": 1, "progress": "x"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("logged_hours", response.data[0])
+
+
+class ReminderTaskTests(TestCase):
+    def setUp(self):
+        self.eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.stale = timezone.now() - timedelta(days=10)
+        for i in range(7):
+            user = CustomUser.objects.create(username=f"idle{i}", email=f"idle{i}@example.com")
+            Goal.objects.create(user=user, goal_name=f"Idle goal {i}")
+        Goal.objects.update(last_progress_date=self.stale)
+        active = CustomUser.objects.create(username="active", email="active@example.com")
+        Goal.objects.create(user=active, goal_name="Fresh goal", last_progress_date=timezone.now())
+
+    def tearDown(self):
+        celery_app.conf.task_always_eager = self.eager
+
+    def test_fans_out_across_shards_and_stamps_goals(self):
+        result = send_reminder_emails.apply(kwargs={"shards": 3, "chunk_size": 2}).get()
+        self.assertEqual(result["shards"], 3)
+        self.assertEqual(result["summary"]["sent"], 7)
+        self.assertEqual(result["summary"]["failed"], 0)
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertIn("Idle goal", mail.outbox[0].body)
+        self.assertFalse(Goal.objects.filter(last_progress_date=self.stale, last_reminder_sent_at__isnull=True).exists())
+
+    def test_retried_shard_does_not_double_send(self):
+        users = list(CustomUser.objects.order_by("id").values_list("id", flat=True))
+        first = send_reminder_shard.apply(args=(users[0], users[-1] + 1)).get()
+        retry = send_reminder_shard.apply(args=(users[0], users[-1] + 1)).get()
+        self.assertEqual(first["sent"], 7)
+        self.assertEqual(retry["sent"], 0)
+        self.assertEqual(len(mail.outbox), 7)
+
+    def test_claimed_goals_are_skipped(self):
+        candidates = inactive_goals()
+        _, claimed, _ = claim_chunk(candidates, 0, 3)
+        self.assertEqual(len(claimed), 3)
+        result = send_reminder_emails.apply().get()
+        self.assertEqual(result["summary"]["sent"], 4)
+
+    def test_failed_send_releases_claim(self):
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("smtp down")), \
+                self.assertLogs("core.tasks", level="ERROR"):
+            result = send_reminder_emails.apply().get()
+        self.assertEqual(result["summary"]["failed"], 7)
+        self.assertEqual(inactive_goals().count(), 7)
+        self.assertEqual(send_reminder_emails.apply().get()["summary"]["sent"], 7)
+
+    def test_one_refused_address_only_releases_its_goal(self):
+        deliver = LocMemEmailBackend.send_messages
+
+        def refuse_one(backend, messages):
+            if any("idle2@" in address for message in messages for address in message.to):
+                raise OSError("recipient refused")
+            return deliver(backend, messages)
+
+        with mock.patch.object(LocMemEmailBackend, "send_messages", refuse_one), self.assertLogs("core.tasks", level="ERROR"):
+            first = send_reminder_emails.apply(kwargs={"shards": 1, "chunk_size": 4}).get()["summary"]
+            retry = send_reminder_emails.apply(kwargs={"shards": 1, "chunk_size": 4}).get()["summary"]
+        self.assertEqual((first["sent"], first["failed"]), (6, 1))
+        self.assertEqual((retry["sent"], retry["failed"]), (0, 1))
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(list(inactive_goals().values_list("user__username", flat=True)), ["idle2"])
+
+    def test_nothing_to_send(self):
+        Goal.objects.update(last_reminder_sent_at=timezone.now())
+        self.assertEqual(send_reminder_emails.apply().get(), {"shards": 0})
+
+    def test_shard_ranges_cover_every_user_id(self):
+        ranges = shard_ranges(3, 20, 4)
+        self.assertEqual(ranges[0][0], 3)
+        self.assertEqual(ranges[-1][1], 21)
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+
+
+class TierThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def make_user(self, tier):
+        user = CustomUser.objects.create(username=f"{tier}-user", tier=tier)
+        Goal.objects.create(user=user, goal_name="Throttled")
+        self.client.force_authenticate(user=user)
+        return user
+
+    def test_free_tier_is_limited_to_ten_per_day(self):
+        self.make_user("free")
+        codes = [self.client.get("/api/goals/1/progress/").status_code for _ in range(11)]
+        self.assertEqual(codes[:10], [status.HTTP_200_OK] * 10)
+        self.assertEqual(codes[10], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_premium_tier_gets_the_higher_rate(self):
+        self.make_user("premium")
+        codes = {self.client.get("/api/goals/1/progress/").status_code for _ in range(15)}
+        self.assertEqual(codes, {status.HTTP_200_OK})
+
+    def test_state_is_constant_size(self):
+        user = self.make_user("premium")
+        for _ in range(50):
+            self.client.get("/api/goals/1/progress/")
+        throttle = TierUserThrottle()
+        key = throttle.cache_format % {"scope": "tier_user_premium", "ident": user.pk}
+        window = int(throttle.timer() // (60 * 60 * 24))
+        self.assertEqual(cache.get(f"{key}_{window}"), 50)
+        self.assertIsNone(cache.get(key))
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        throttle = TierUserThrottle()
+        throttle.num_requests, throttle.duration = 10, 100
+        throttle.previous_count, throttle.current_count, throttle.elapsed = 10, 2, 10
+        self.assertEqual(throttle.estimated_count(), 11)
+        # Allowed again once only 80% of the previous window overlaps, 20s into this one.
+        self.assertAlmostEqual(throttle.wait(), 10)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_every_core_route_is_covered(self):
+        endpoints = BenchmarkCommand().endpoints()
+        self.assertEqual(len(endpoints), len(core_urls.urlpatterns))
+        self.assertIn(("GET", "/api/goals/1/progress/1", "ProgressView"), endpoints)
+        self.assertEqual(endpoints[-1][0], "POST")
+
+    def test_compare_flags_latency_and_query_regressions(self):
+        row = {"endpoint": "/api/goals/", "method": "GET", "size": 10, "cache": "cold", "p95_ms": 10.0, "queries": 3}
+        baseline = {"results": [dict(row, p95_ms=5.0, queries=2)]}
+        regressions = BenchmarkCommand().compare([row], baseline, tolerance=0.25, min_delta_ms=1.0)
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(BenchmarkCommand().compare([row], {"results": [row]}, 0.25, 1.0), [])
+
+
+class DatasetGeneratorTests(TestCase):
+    def test_dataset_is_historical_and_consistent(self):
+        users = DatasetGenerator(users=3, goals_per_user=2, progress=200, seed=7).generate()
+        self.assertEqual(len(users), 3)
+        goals = Goal.objects.filter(user__in=users)
+        self.assertEqual(goals.count(), 6)
+        self.assertEqual(Progress.objects.filter(goal__in=goals).count(), 200)
+        self.assertTrue(Progress.objects.filter(goal__in=goals, created_at__lt=timezone.now() - timedelta(days=30)).exists())
+
+        for goal in goals:
+            entries = Progress.objects.filter(goal=goal)
+            self.assertEqual(goal.progress_count, entries.count())
+            self.assertEqual(sorted(entries.values_list("ordinal", flat=True)), list(range(1, goal.progress_count + 1)))
+            self.assertEqual(goal.total_logged_hours, sum((p.logged_hours for p in entries), timedelta()))
+        out = StringIO()
+        call_command("rebuild_progress_rollups", "--verify", stdout=out)
+        self.assertIn("match", out.getvalue())
+
+    def test_same_seed_gives_same_dataset(self):
+        def snapshot(seed):
+            users = DatasetGenerator(users=2, goals_per_user=2, progress=50, seed=seed, prefix="snap").generate()
+            rows = list(Progress.objects.filter(goal__user__in=users).order_by("goal__ordinal", "goal__user__username", "ordinal")
+                        .values_list("goal__ordinal", "ordinal", "logged_hours", "created_at"))
+            CustomUser.objects.filter(id__in=[u.id for u in users]).delete()
+            return rows
+
+        first = snapshot(3)
+        # A day later the same seed still ends its history at the same anchor.
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(days=1)):
+            self.assertEqual(snapshot(3), first)
+
+    def test_command_anchors_history_at_now(self):
+        call_command("generate_dataset", "--users=1", "--progress=20", "--seed=11", "--now=2024-03-01", stdout=StringIO())
+        entries = Progress.objects.filter(goal__user__username__startswith="synth11_")
+        anchor = timezone.make_aware(datetime(2024, 3, 1))
+        self.assertEqual(entries.count(), 20)
+        self.assertFalse(entries.filter(created_at__gt=anchor).exists())
+        self.assertFalse(entries.filter(created_at__lt=anchor - timedelta(days=365 * 2)).exists())
+        with self.assertRaises(CommandError):
+            call_command("generate_dataset", "--seed=12", "--now=yesterday", stdout=StringIO())
+
+    def test_command_refuses_to_duplicate_a_seed(self):
+        call_command("generate_dataset", "--users=1", "--progress=5", "--seed=9", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("generate_dataset", "--users=1", "--progress=5", "--seed=9", stdout=StringIO())
+        call_command("generate_dataset", "--users=1", "--progress=5", "--seed=9", "--clear", stdout=StringIO())
+        self.assertEqual(CustomUser.objects.filter(username__startswith="synth9_").count(), 1)
+
+
+@override_settings(METRICS_TOKEN="scrape-secret")
+class RequestMetricsTests(TestCase):
+    scrape_auth = {"HTTP_AUTHORIZATION": "Bearer scrape-secret"}
+
+    def setUp(self):
+        cache.clear()
+        metrics_registry.reset()
+        self.user = CustomUser.objects.create_user(username="metrics", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Goal.objects.create(user=self.user, goal_name="Learn Zig")
+
+    def test_records_per_url_name(self):
+        self.client.get("/api/goals/")
+        self.client.get("/api/summary/weekly/")
+        self.client.get("/api/summary/weekly/")
+
+        snapshot = self.client.get("/api/metrics/?output=json", **self.scrape_auth).json()
+        goals = snapshot["goals"]
+        self.assertEqual(goals["requests"], 1)
+        self.assertGreater(goals["db_queries"], 0)
+        self.assertGreater(goals["response_bytes"], 0)
+        self.assertEqual(goals["latency_seconds_bucket"]["+Inf"], 1)
+        weekly = snapshot["weekly_summary"]
+        self.assertEqual((weekly["requests"], weekly["cache_hits"], weekly["cache_misses"]), (2, 1, 1))
+
+    def test_prometheus_text(self):
+        self.client.get("/api/goals/")
+        body = self.client.get("/api/metrics/", **self.scrape_auth).content.decode()
+        self.assertIn('learnflow_request_duration_seconds_bucket{endpoint="goals",le="+Inf"} 1', body)
+        self.assertIn('learnflow_request_duration_seconds_count{endpoint="goals"} 1', body)
+        self.assertIn('# TYPE learnflow_db_queries_total counter', body)
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+        self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer guess").status_code, 403)
+        self.assertEqual(self.client.get("/api/metrics/", **self.scrape_auth).status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_hidden_without_a_token_outside_debug(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get("/api/metrics/").status_code, 200)
+
+
+class QueuedLogHandlerTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "app.log")
+        self.logger = logging.getLogger(f"tests.queued.{self._testMethodName}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def attach(self, **kwargs):
+        handler = QueuedRotatingFileHandler(self.path, **kwargs)
+        self.logger.addHandler(handler)
+        self.addCleanup(handler.close)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler
+
+    def read_lines(self, path=None):
+        with open(path or self.path) as log_file:
+            return [json.loads(line) for line in log_file]
+
+    def test_writes_json_lines_with_extra_fields(self):
+        handler = self.attach()
+        self.logger.info("Cache %s for key: %s", "miss", "weekly_summary_1_all_v1", extra={"cache_status": "miss"})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("Chunk failed")
+        handler.flush()
+
+        first, second = self.read_lines()
+        self.assertEqual(first["message"], "Cache miss for key: weekly_summary_1_all_v1")
+        self.assertEqual(first["cache_status"], "miss")
+        self.assertEqual(first["level"], "INFO")
+        self.assertIn("ValueError: boom", second["exc_info"])
+
+    def test_rotates_by_size(self):
+        handler = self.attach(maxBytes=2000, backupCount=2, batch_size=10)
+        for i in range(60):
+            self.logger.info("Entry %d", i)
+        handler.flush()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        for path in (self.path, self.path + ".1"):
+            self.assertLessEqual(os.path.getsize(path), 2000)
+            self.assertTrue(self.read_lines(path))
+
+    def test_drops_instead_of_blocking_when_full(self):
+        handler = self.attach(queue_size=2)
+        handler.listener.stop()
+        for i in range(5):
+            self.logger.info("Entry %d", i)
+        self.assertEqual(handler.dropped, 3)
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="dashboard", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.primary = Goal.objects.create(user=self.user, goal_name="Learn Go", category="Primary")
+        self.secondary = Goal.objects.create(user=self.user, goal_name="Learn Lua", category="Secondary")
+        now = timezone.now()
+        with historical_timestamps(Progress):
+            for goal, hours, created in (
+                (self.primary, 2, now - timedelta(days=60)),
+                (self.primary, 1, now),
+                (self.secondary, 3, now),
+            ):
+                Progress.objects.create(
+                    goal=goal, progress="Session", created_at=created, updated_at=created,
+                    total_hours=timedelta(hours=4), logged_hours=timedelta(hours=hours),
+                )
+
+    def test_combines_summaries_in_two_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/summary/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 2)
+
+        self.assertEqual(len(response.data["weekly"]), 2)
+        self.assertEqual(len(response.data["monthly"]), 2)
+        self.assertEqual(response.data["weekly"], self.client.get("/api/summary/weekly/").data)
+        self.assertEqual(response.data["monthly"], self.client.get("/api/summary/monthly/").data)
+        self.assertEqual(
+            [(row["category"], row["total_hours"], row["goal_count"]) for row in response.data["categories"]],
+            [("Primary", "3.00", 1), ("Secondary", "3.00", 1)],
+        )
+        primary = response.data["goals"][0]
+        self.assertEqual((primary["goalNum"], primary["progress_count"], primary["completion_percentage"]), (1, 2, 37.5))
+
+    def test_since_limits_buckets_and_category_totals(self):
+        since = timezone.localdate().isoformat()
+        response = self.client.get(f"/api/summary/dashboard/?since={since}")
+        self.assertEqual(len(response.data["monthly"]), 1)
+        self.assertEqual(sum(float(row["total_hours"]) for row in response.data["weekly"]), 4.0)
+        self.assertEqual(
+            [(row["category"], row["total_hours"]) for row in response.data["categories"]],
+            [("Primary", "1.00"), ("Secondary", "3.00")],
+        )
+        self.assertEqual(response.data["goals"][0]["progress_count"], 2)
+        self.assertEqual(self.client.get("/api/summary/dashboard/?since=yesterday").status_code, 400)
+
+    def test_since_in_the_same_week_but_another_month_is_cached_apart(self):
+        # 2026-09-28 is a Monday: both dates start from that week, but from different months.
+        created = timezone.make_aware(datetime(2026, 9, 15, 12))
+        with historical_timestamps(Progress):
+            Progress.objects.create(
+                goal=self.primary, progress="Session", created_at=created, updated_at=created,
+                total_hours=timedelta(hours=4), logged_hours=timedelta(hours=5),
+            )
+        october = self.client.get("/api/summary/dashboard/?since=2026-10-02").data["monthly"]
+        september = self.client.get("/api/summary/dashboard/?since=2026-09-30").data["monthly"]
+        self.assertEqual(len(september), len(october) + 1)
+        self.assertTrue(str(september[0]["month_start"]).startswith("2026-09-01"))
+
+    def test_goal_created_after_the_goals_query_is_left_out(self):
+        late = Goal.objects.create(user=self.user, goal_name="Learn Nim", category="Minor")
+        ProgressRollup.apply_delta(late.id, timezone.now(), timedelta(hours=2), 1, user_id=self.user.id)
+        goals = Goal.objects.filter(user=self.user).exclude(id=late.id)
+        with mock.patch("core.summaries.Goal.objects.filter", return_value=goals):
+            data = build_dashboard(self.user.id, timezone.now())
+        self.assertEqual([row["category"] for row in data["categories"]], ["Primary", "Secondary"])
+        self.assertEqual(sum(float(row["total_hours"]) for row in data["weekly"]), 4.0)
+
+    def test_cached_as_one_unit_until_a_write(self):
+        self.client.get("/api/summary/dashboard/")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/summary/dashboard/")
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Progress.objects.create(
+                goal=self.secondary, progress="Session",
+                total_hours=timedelta(hours=1), logged_hours=timedelta(hours=1),
+            )
+        response = self.client.get("/api/summary/dashboard/")
+        self.assertEqual(response.data["categories"][1]["total_hours"], "4.00")
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="async", password="password123", tier="premium")
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        for name in ("Learn Rust", "Learn Haskell"):
+            goal = Goal.objects.create(user=self.user, goal_name=name, category="Primary")
+        for i in range(3):
+            Progress.objects.create(
+                goal=goal, progress=f"Session {i}",
+                total_hours=timedelta(hours=2), logged_hours=timedelta(hours=1),
+            )
+
+    def test_matches_sync_views(self):
+        for path in (
+            "goals/", "goals/2", "goals/?page_size=1&page=2", "goals/?pagination=cursor&page_size=1",
+            "goals/?category=Primary", "goals/2/progress/", "goals/2/progress/3", "goals/2/progress/?pagination=cursor&page_size=2",
+            "summary/weekly/", "summary/weekly/2/", "summary/monthly/", "summary/monthly/2/",
+        ):
+            sync = self.client.get(f"/api/{path}", **self.auth)
+            asynchronous = self.client.get(f"/api/async/{path}", **self.auth)
+            self.assertEqual(asynchronous.status_code, sync.status_code, path)
+            sync_data, async_data = sync.json(), asynchronous.json()
+            if isinstance(sync_data, dict) and "next" in sync_data:
+                # Pagination links differ only by the async/ prefix.
+                for link in ("next", "previous"):
+                    sync_data[link] = sync_data[link] and sync_data[link].replace("/api/", "/api/async/")
+            self.assertEqual(async_data, sync_data, path)
+
+    def test_unchanged_poll_is_304_without_queries(self):
+        for path in ("goals/", "goals/2", "goals/2/progress/", "goals/2/progress/3", "summary/weekly/", "summary/monthly/2/"):
+            response = self.client.get(f"/api/async/{path}", **self.auth)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertIn("private", response["Cache-Control"])
+            with self.assertNumQueries(0):
+                revalidated = self.client.get(f"/api/async/{path}", HTTP_IF_NONE_MATCH=response["ETag"], **self.auth)
+            self.assertEqual(revalidated.status_code, 304, path)
+        missing = self.client.get("/api/async/goals/9", **self.auth)
+        self.assertEqual(missing.status_code, 404)
+        self.assertFalse(missing.has_header("ETag"))
+
+    def test_unexpected_errors_are_json_500s_like_the_sync_views(self):
+        with mock.patch("core.async_views.abuild_summary", side_effect=OperationalError("database is locked")), \
+                mock.patch("core.views.build_summary", side_effect=OperationalError("database is locked")), \
+                self.assertLogs("core.async_views", logging.ERROR):
+            asynchronous = self.client.get("/api/async/summary/weekly/", **self.auth)
+            sync = self.client.get("/api/summary/weekly/", **self.auth)
+        self.assertEqual(asynchronous.status_code, 500)
+        self.assertEqual(asynchronous.json(), sync.json())
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/api/async/goals/").status_code, 401)
+        self.assertEqual(self.client.get("/api/async/goals/", HTTP_AUTHORIZATION="Bearer nonsense").status_code, 401)
+        self.assertEqual(self.client.get("/api/async/goals/9", **self.auth).status_code, 404)
+        self.assertEqual(self.client.get("/api/async/goals/?page=9", **self.auth).status_code, 404)
+        self.assertEqual(self.client.get("/api/async/summary/weekly/9/", **self.auth).status_code, 400)
+
+    def test_progress_is_throttled(self):
+        self.user.tier = "free"
+        self.user.save()
+        statuses = [self.client.get("/api/async/goals/2/progress/", **self.auth).status_code for _ in range(11)]
+        self.assertEqual(statuses[:10], [200] * 10)
+        self.assertEqual(statuses[10], 429)
+
+    async def test_served_by_the_asgi_handler(self):
+        response = await self.async_client.get(
+            "/api/async/summary/weekly/", headers={"Authorization": self.auth["HTTP_AUTHORIZATION"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["total_hours"], "3.00")
+
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tiered = TwoTierCache(f"tests-{self._testMethodName}", {
+            "OPTIONS": {"SHARED": "default", "MAX_ENTRIES": 2, "LOCAL_TIMEOUT": 5},
+        })
+
+    def test_l1_serves_repeat_reads_without_the_shared_tier(self):
+        self.tiered.set("summary", [1, 2])
+        with mock.patch.object(cache, "get") as shared_get:
+            self.assertEqual(self.tiered.get("summary"), [1, 2])
+        shared_get.assert_not_called()
+
+        # Another process filled L2; this one fetches it once, then holds it in L1.
+        cache.set("other", "from-l2")
+        self.assertEqual(self.tiered.get("other"), "from-l2")
+        self.assertEqual(self.tiered.get("other"), "from-l2")
+        self.assertIsNone(self.tiered.get("absent"))
+        self.assertEqual(
+            {k: v for k, v in self.tiered.stats().items() if k in ("l1_hits", "l2_hits", "misses")},
+            {"l1_hits": 2, "l2_hits": 1, "misses": 1},
+        )
+
+    def test_bounded_lru_and_short_ttl(self):
+        for key in ("a", "b", "c"):
+            self.tiered.set(key, key)
+        self.assertEqual(self.tiered.stats()["l1_entries"], 2)
+        self.assertNotIn(self.tiered.make_key("a"), self.tiered.store.entries)
+
+        with mock.patch("core.cache_backends.time.monotonic", return_value=time.monotonic() + 6):
+            cache.set("c", "changed")
+            self.assertEqual(self.tiered.get("c"), "changed")
+
+    def test_counters_are_never_served_from_l1(self):
+        self.tiered.set("count", 1)
+        cache.incr("count")
+        self.assertEqual(self.tiered.incr("count"), 3)
+        self.assertEqual(self.tiered.get("count"), 3)
+
+    def test_summaries_stay_coherent_through_generations(self):
+        user = CustomUser.objects.create_user(username="tiered", password="password123")
+        goal = Goal.objects.create(user=user, goal_name="Learn OCaml")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        for hours, expected in ((1, "1.00"), (2, "3.00")):
+            with self.captureOnCommitCallbacks(execute=True):
+                Progress.objects.create(goal=goal, progress="Session", total_hours=timedelta(hours=4), logged_hours=timedelta(hours=hours))
+            # The write bumped the generation, so the second read is a fresh key served from L1.
+            client.get("/api/summary/weekly/")
+            self.assertEqual(client.get("/api/summary/weekly/").data[0]["total_hours"], expected)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="cachedauth", password="password123")
+        self.client = APIClient()
+        response = self.client.post("/api/token/", {"username": "cachedauth", "password": "password123"}, format="json")
+        self.access = response.data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+    def test_token_carries_tier_claim(self):
+        self.assertEqual(AccessToken(self.access)["tier"], "free")
+
+    def test_repeat_requests_skip_the_user_query(self):
+        self.client.get("/api/summary/weekly/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/summary/weekly/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_tier_change_reaches_the_throttle(self):
+        self.client.get("/api/goals/")
+        self.user.tier = "premium"
+        self.user.save()
+        with mock.patch.object(TierUserThrottle, "allow_request", autospec=True, return_value=True) as allow:
+            self.client.get("/api/goals/1/progress/")
+        self.assertEqual(allow.call_args.args[1].user.tier, "premium")
+
+    def test_deactivation_rejects_the_next_request(self):
+        self.assertEqual(self.client.get("/api/goals/").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/goals/").status_code, 401)
+        self.assertEqual(self.client.get("/api/async/goals/").status_code, 401)
+
+    def test_queryset_delete_rejects_the_next_request(self):
+        self.assertEqual(self.client.get("/api/goals/").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomUser.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.client.get("/api/goals/").status_code, 401)
+        self.assertEqual(self.client.get("/api/async/goals/").status_code, 401)
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot query shapes so a refactor that loses an index shows up as a failure."""
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="planner", password="password123")
+        for category in ("Primary", "Minor"):
+            Goal.objects.create(user=self.user, goal_name=f"{category} goal", category=category)
+
+    def explain(self, queryset_or_sql):
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Tiny test tables make a sequential scan cheapest; ask whether an index *can* serve the query.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            if isinstance(queryset_or_sql, str):
+                prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+                with connection.cursor() as cursor:
+                    cursor.execute(prefix + queryset_or_sql)
+                    return "\n".join(str(row[-1]) for row in cursor.fetchall())
+            return queryset_or_sql.explain()
+
+    def assertIndexed(self, plan, index=None):
+        self.assertNotRegex(plan, r"\bSCAN core_|Seq Scan", plan)
+        if index is not None:
+            self.assertIn(index, plan)
+
+    def test_goal_list_filters_use_composite_indexes(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        for query, index in (
+            ("category=Primary", "goal_user_category_idx"),
+            ("is_complete=True", "goal_user_complete_idx"),
+            ("is_complete=False", "goal_user_open_idx"),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(client.get(f"/api/goals/?{query}").status_code, 200)
+            # Both the page's COUNT(*) and the page itself.
+            goal_queries = [q["sql"] for q in queries if 'FROM "core_goal"' in q["sql"]]
+            self.assertTrue(goal_queries)
+            for sql in goal_queries:
+                with self.subTest(query=query, sql=sql):
+                    self.assertIndexed(self.explain(sql), index)
+
+    def test_reminder_candidates_use_partial_index(self):
+        self.assertIndexed(self.explain(inactive_goals()), "goal_reminder_due_idx")
+
+    def test_summaries_read_rollups_by_index(self):
+        goal = Goal.objects.filter(user=self.user).first()
+        self.assertIndexed(self.explain(summary_queryset(self.user.id, ProgressRollup.Granularity.WEEK)))
+        self.assertIndexed(
+            self.explain(summary_queryset(self.user.id, ProgressRollup.Granularity.WEEK, goal.id)),
+            "progress_rollup_goal_idx",
+        )
+
+
+class AddTimeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="adder", password="password123")
+        self.goal = Goal.objects.create(user=self.user, goal_name="Learn Haskell")
+        self.progress = Progress.objects.create(goal=self.goal, progress="Monads", logged_hours=timedelta(hours=1), total_hours=timedelta(hours=2))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/goals/1/progress/1/add_time/"
+
+    def test_adds_time_and_completes_in_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"logged_hours": "01:30:00"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["logged_hours"], "02:30:00")
+        self.assertTrue(response.data["is_complete"])
+        progress_updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "core_progress"')]
+        self.assertEqual(len(progress_updates), 1)
+
+        goal = Goal.objects.get(pk=self.goal.pk)
+        self.assertEqual(goal.total_logged_hours, timedelta(hours=2, minutes=30))
+        self.assertIsNotNone(goal.last_progress_date)
+        self.assertEqual(
+            set(ProgressRollup.objects.values_list("logged_hours", flat=True)), {timedelta(hours=2, minutes=30)}
+        )
+
+    def test_negative_time_cannot_go_below_zero(self):
+        response = self.client.post(self.url, {"logged_hours": "-02:00:00"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {"logged_hours": "-00:30:00"}, format="json")
+        self.assertEqual(response.data["logged_hours"], "00:30:00")
+        self.assertFalse(response.data["is_complete"])
+
+    def test_unknown_entry_and_zero_delta(self):
+        self.assertEqual(self.client.post("/api/goals/1/progress/9/add_time/", {"logged_hours": "00:10:00"}, format="json").status_code, 404)
+        self.assertEqual(self.client.post(self.url, {"logged_hours": "00:00:00"}, format="json").status_code, 400)
+        other = CustomUser.objects.create_user(username="other", password="password123")
+        self.assertIsNone(Progress.add_time(other.id, 1, 1, timedelta(hours=1)))
+
+    def test_summary_cache_sees_added_time(self):
+        self.client.get("/api/summary/weekly/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {"logged_hours": "00:30:00"}, format="json")
+        self.assertEqual(self.client.get("/api/summary/weekly/").data[0]["total_hours"], "1.50")
+
+
+class AddTimeConcurrencyTests(TransactionTestCase):
+    def test_concurrent_increments_are_not_lost(self):
+        user = CustomUser.objects.create_user(username="devices", password="password123")
+        goal = Goal.objects.create(user=user, goal_name="Learn Erlang")
+        Progress.objects.create(goal=goal, progress="OTP", logged_hours=timedelta(), total_hours=timedelta(hours=10))
+
+        def log_minutes(_):
+            try:
+                logged = 0
+                while logged < 10:
+                    try:
+                        Progress.add_time(user.id, 1, 1, timedelta(minutes=1))
+                        logged += 1
+                    except OperationalError as exc:
+                        # The shared-cache in-memory SQLite test database reports a
+                        # locked table instead of waiting; retry like a busy timeout.
+                        if "locked" not in str(exc):
+                            raise
+                        time.sleep(0.001)
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(log_minutes, range(4)))
+
+        self.assertEqual(Progress.objects.get().logged_hours, timedelta(minutes=40))
+        self.assertEqual(Goal.objects.get().total_logged_hours, timedelta(minutes=40))
+
+
+class SummaryStampedeTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="stampede", password="password123")
+        goal = Goal.objects.create(user=self.user, goal_name="Learn Zig")
+        Progress.objects.create(goal=goal, progress="Comptime", logged_hours=timedelta(hours=1), total_hours=timedelta(hours=2))
+
+    def test_cold_key_is_computed_once(self):
+        from . import views
+        clients = 12
+        barrier = threading.Barrier(clients)
+
+        def slow_build(*args):
+            time.sleep(0.05)
+            return build_summary(*args)
+
+        def request(_):
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            barrier.wait()
+            try:
+                return client.get("/api/summary/weekly/")
+            finally:
+                close_old_connections()
+
+        build_summary = views.build_summary
+        with mock.patch.object(views, "build_summary", side_effect=slow_build) as aggregation:
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                responses = list(pool.map(request, range(clients)))
+
+        self.assertEqual(aggregation.call_count, 1)
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(len({json.dumps(response.data) for response in responses}), 1)
+
+
+class EarlyRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.key = "weekly_summary_1_all_v1"
+        # Expires in 50ms but took 1s to compute: XFetch refreshes it now.
+        summary_cache.set(self.key, (["old"], 1.0, time.time() + 0.05), timeout=60)
+
+    @mock.patch("core.caching.random.random", return_value=0.5)
+    def test_entry_near_expiry_is_refreshed_by_one_request(self, _):
+        self.assertEqual(cached_summary(self.key, lambda: ["new"], timeout=60), (["new"], False))
+        self.assertEqual(cached_summary(self.key, lambda: ["newer"], timeout=60), (["new"], True))
+
+    @mock.patch("core.caching.random.random", return_value=0.5)
+    def test_others_serve_current_value_while_one_refreshes(self, _):
+        cache.add(LOCK_KEY.format(key=self.key), 1)
+        compute = mock.Mock(return_value=["new"])
+        self.assertEqual(cached_summary(self.key, compute, timeout=60), (["old"], True))
+        compute.assert_not_called()
+
+    @override_settings(SUMMARY_CACHE_EARLY_REFRESH_BETA=0)
+    def test_early_refresh_can_be_disabled(self):
+        self.assertEqual(cached_summary(self.key, lambda: ["new"], timeout=60), (["old"], True))
+
+
+class SummaryWarmingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.active = []
+        for i in range(3):
+            user = CustomUser.objects.create(username=f"warm{i}")
+            goal = Goal.objects.create(user=user, goal_name=f"Goal {i}")
+            Progress.objects.create(goal=goal, progress="Session", logged_hours=timedelta(hours=1), total_hours=timedelta(hours=2))
+            self.active.append(user)
+        idle = CustomUser.objects.create(username="idle")
+        Goal.objects.create(user=idle, goal_name="Old goal", last_progress_date=timezone.now() - timedelta(days=30))
+
+    def tearDown(self):
+        celery_app.conf.task_always_eager = self.eager
+
+    def test_warms_active_users_in_batches_and_reports_coverage(self):
+        client = APIClient()
+        client.force_authenticate(user=self.active[0])
+        client.get("/api/summary/weekly/")
+
+        result = warm_summary_caches.apply(kwargs={"batch_size": 2}).get()
+        self.assertEqual(result["batches"], 2)
+        summary = result["summary"]
+        self.assertEqual((summary["users"], summary["computed"], summary["already_cached"]), (3, 8, 1))
+        self.assertEqual(summary["coverage"], 1.0)
+        self.assertEqual(summary["hit_ratio_before"], round(1 / 9, 4))
+
+        with self.assertNumQueries(0):
+            for kind in ("weekly", "monthly", "dashboard"):
+                self.assertEqual(client.get(f"/api/summary/{kind}/").status_code, 200)
+
+    def test_command_runs_inline_after_deploy(self):
+        first, second = StringIO(), StringIO()
+        call_command("warm_summary_caches", "--no_pause", stdout=first)
+        call_command("warm_summary_caches", "--no_pause", stdout=second)
+        self.assertIn("Summary Cache Warming", first.getvalue())
+        # Cold before the first run (hit ratio 0%), fully warm before the second.
+        self.assertIn(" 0.0% ", first.getvalue())
+        self.assertNotIn(" 0.0% ", second.getvalue())
+
+
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="fast", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.goal = Goal.objects.create(user=self.user, goal_name="Learn  Rust 🦀 \"quoted\"", deadline=timezone.now().date())
+        Goal.objects.create(user=self.user, goal_name="No deadline", category="Secondary")
+        Progress.objects.create(goal=self.goal, progress="Tiny", logged_hours=timedelta(seconds=1), total_hours=timedelta(hours=10000))
+        Progress.objects.create(goal=self.goal, progress="Half", logged_hours=timedelta(hours=1, microseconds=5), total_hours=timedelta(hours=2))
+        Progress.objects.create(goal=self.goal, progress="Unplanned", logged_hours=timedelta(), total_hours=timedelta())
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_list_rows_match_model_serializers(self):
+        goals = Goal.objects.filter(user=self.user).order_by("id")
+        progresses = Progress.objects.filter(goal=self.goal).order_by("id")
+        self.assertEqual(
+            self.render(FastGoalSerializer.serialize(FastGoalSerializer.values(goals))),
+            self.render(GoalSerializer(goals, many=True).data),
+        )
+        self.assertEqual(
+            self.render(FastProgressSerializer.serialize(FastProgressSerializer.values(progresses))),
+            self.render(ProgressSerializer(progresses, many=True).data),
+        )
+
+    def test_summary_rows_match_plain_serializers(self):
+        rows = summary_rows(self.user.id, ProgressRollup.Granularity.WEEK)
+        self.assertTrue(rows)
+        expected = WeeklySummarySerializer([{"week_start": start, "total_hours": hours} for start, hours in rows], many=True).data
+        self.assertEqual(self.render(serialize_summary(ProgressRollup.Granularity.WEEK, rows)), self.render(expected))
+
+    def test_responses_are_byte_identical_to_drf_renderer(self):
+        response = self.client.get("/api/goals/")
+        goals = Goal.objects.filter(user=self.user).order_by("id")
+        expected = {"count": 2, "next": None, "previous": None, "results": GoalSerializer(goals, many=True).data}
+        self.assertEqual(response.content, self.render(expected))
+        self.assertIn(b"\\u2028", response.content)
+
+        response = self.client.get(f"/api/goals/{self.goal.ordinal}/progress/")
+        expected = ProgressSerializer(Progress.objects.filter(goal=self.goal).order_by("id"), many=True).data
+        self.assertEqual(response.content, self.render(expected))
+
+        moment = datetime(2026, 10, 2, 9, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        for data in (
+            {"tiny": 2.5e-05, "small": 0.0001, "big": 1e16}, [1.5, " ", None, True], {"n": 2 ** 70},
+            {"utc": moment, "local": timezone.localtime(moment), "naive": moment.replace(tzinfo=None)},
+            [moment.date(), moment.time(), uuid.UUID(int=2 ** 100)],
+        ):
+            self.assertEqual(FastJSONRenderer().render(data), self.render(data))
+
+    def test_renderer_falls_back_without_orjson(self):
+        data = {"goal": " ", "hours": 0.5}
+        with mock.patch("core.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(data), self.render(data))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="poller", password="password123", tier="premium")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.goal = Goal.objects.create(user=self.user, goal_name="Learn Elixir")
+            Progress.objects.create(goal=self.goal, progress="Session", logged_hours=timedelta(hours=1), total_hours=timedelta(hours=2))
+
+    def test_unchanged_poll_is_304_without_queries(self):
+        # Last-Modified is only sent once the second of the last write has passed.
+        with mock.patch("core.conditional.time.time", return_value=time.time() + 2):
+            for path in ("/api/goals/", "/api/goals/1", "/api/goals/1/progress/", "/api/goals/1/progress/1", "/api/summary/weekly/", "/api/summary/monthly/1/", "/api/summary/dashboard/"):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200, path)
+                self.assertIn("private", response["Cache-Control"])
+                with self.assertNumQueries(0):
+                    revalidated = self.client.get(path, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(revalidated.status_code, 304, path)
+                self.assertEqual(revalidated.content, b"")
+                revalidated = self.client.get(path, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+                self.assertEqual(revalidated.status_code, 304, path)
+
+    def test_write_changes_validators(self):
+        time.sleep(1)
+        response = self.client.get("/api/goals/1/progress/")
+        time.sleep(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Progress.add_time(self.user.id, 1, 1, timedelta(minutes=5))
+        changed = self.client.get("/api/goals/1/progress/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], response["ETag"])
+        self.assertEqual(changed.data[0]["logged_hours"], "01:05:00")
+        changed = self.client.get("/api/goals/1/progress/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(changed.status_code, 200)
+
+    def test_validators_are_per_url_and_only_on_success(self):
+        etag = self.client.get("/api/goals/")["ETag"]
+        filtered = self.client.get("/api/goals/?category=Primary", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(filtered.status_code, 200)
+        self.assertNotEqual(filtered["ETag"], etag)
+
+        missing = self.client.get("/api/summary/weekly/9/")
+        self.assertEqual(missing.status_code, 400)
+        self.assertFalse(missing.has_header("ETag"))
+        self.assertFalse(missing.has_header("Last-Modified"))
+
+    def test_no_last_modified_within_the_second_of_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Progress.add_time(self.user.id, 1, 1, timedelta(minutes=5))
+        response = self.client.get("/api/goals/1/progress/", HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Last-Modified"))
+        self.assertTrue(response.has_header("ETag"))
+
+    def test_generation_tracks_last_write_time(self):
+        before = get_user_generation(self.user.id)
+        after = bump_user_generation(self.user.id)
+        self.assertGreater(after, before)
+        self.assertLessEqual(abs(generation_timestamp(after) - time.time()), 1)
+        self.assertGreater(bump_user_generation(self.user.id), after)
+
+
+class DatabaseProfileTests(TestCase):
+    postgres_url = "postgres://learnflow:secret@db:5432/learnflow"
+
+    def test_baseline_is_the_untuned_configuration(self):
+        self.assertEqual(database_config(None, "baseline"), {"ENGINE": "django.db.backends.sqlite3", "NAME": "mydatabase"})
+        config = database_config(self.postgres_url, "baseline")
+        self.assertEqual((config["CONN_MAX_AGE"], config["CONN_HEALTH_CHECKS"]), (600, False))
+        self.assertNotIn("pool", config.get("OPTIONS", {}))
+
+    def test_tuned_postgres_uses_a_checked_pool(self):
+        config = database_config(self.postgres_url, "tuned", {"DB_POOL_MAX_SIZE": "8", "DB_POOL_TIMEOUT": "5"})
+        self.assertEqual(config["OPTIONS"]["pool"], {"min_size": 1, "max_size": 8, "timeout": 5.0})
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+
+        config = database_config(self.postgres_url, "tuned", {"DB_POOL_MAX_SIZE": "0"})
+        self.assertNotIn("pool", config["OPTIONS"])
+        self.assertEqual((config["CONN_MAX_AGE"], config["CONN_HEALTH_CHECKS"]), (600, True))
+
+    def test_tuned_sqlite_sets_pragmas_on_connect(self):
+        config = database_config(None, "tuned")
+        self.assertEqual(config["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertIn("PRAGMA journal_mode=WAL", config["OPTIONS"]["init_command"])
+        with self.assertRaises(ValueError):
+            database_config(None, "fast")
+
+        if connection.vendor == "sqlite" and "init_command" in connection.settings_dict["OPTIONS"]:
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)
+                cursor.execute("PRAGMA cache_size")
+                self.assertEqual(cursor.fetchone()[0], -64 * 1024)
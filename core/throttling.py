@@ -1,6 +1,19 @@
 from rest_framework.throttling import UserRateThrottle
 
+TIER_RATES={
+    'premium':'1000/day',
+    'free':'10/day',
+}
+
 class TierUserThrottle(UserRateThrottle):
+    """Per-tier rate limit kept as two integer counters per (scope, tier, user).
+
+    Instead of SimpleRateThrottle's list of request timestamps, requests are
+    counted in fixed windows and the previous window is weighted by how much of
+    it still overlaps the sliding window (the "sliding window counter"
+    approximation). State stays constant whatever the rate, and counters are
+    bumped with the cache's ``incr`` (atomic on Redis).
+    """
     scope='tier_user'
     rate='10/day'
     def get_rate(self):
@@ -9,10 +22,50 @@ class TierUserThrottle(UserRateThrottle):
     def allow_request(self,request,view):
         if request.user.is_authenticated:
             tier = request.user.tier
-            self.rate = '1000/day' if tier == 'premium' else '10/day'
+            self.rate = TIER_RATES['premium'] if tier == 'premium' else TIER_RATES['free']
         else:
-            self.rate = '10/day'
-        return super().allow_request(request,view)
+            self.rate = TIER_RATES['free']
+        self.num_requests,self.duration=self.parse_rate(self.rate)
+
+        self.key=self.get_cache_key(request,view)
+        if self.key is None:
+            return True
+
+        self.now=self.timer()
+        window=int(self.now//self.duration)
+        current_key=f"{self.key}_{window}"
+        previous_key=f"{self.key}_{window-1}"
+        counts=self.cache.get_many([current_key,previous_key])
+        self.current_count=counts.get(current_key,0)
+        self.previous_count=counts.get(previous_key,0)
+        self.elapsed=self.now-window*self.duration
+
+        if self.estimated_count()>=self.num_requests:
+            return self.throttle_failure()
+
+        # Keep each window for two durations so it can act as the previous one.
+        timeout=2*self.duration
+        if not self.current_count and self.cache.add(current_key,1,timeout=timeout):
+            self.current_count=1
+            return True
+        try:
+            self.current_count=self.cache.incr(current_key)
+        except ValueError:
+            self.cache.set(current_key,1,timeout=timeout)
+            self.current_count=1
+        return True
+
+    def estimated_count(self):
+        overlap=1-self.elapsed/self.duration
+        return self.previous_count*overlap+self.current_count
+
+    def wait(self):
+        remaining=self.duration-self.elapsed
+        if self.current_count>=self.num_requests or not self.previous_count:
+            return remaining
+        # Time until the previous window's weighted share lets one more request in.
+        overlap_allowed=(self.num_requests-self.current_count)/self.previous_count
+        return max(0.0,self.duration*(1-overlap_allowed)-self.elapsed)
 
     def get_cache_key(self,request,view):
         if request.user.is_authenticated:
@@ -25,4 +78,4 @@ class TierUserThrottle(UserRateThrottle):
         return self.cache_format % {
             'scope':f"{self.scope}_{tier}",
             'ident':ident
-            }
\ No newline at end of file
+            }
@@ -1,18 +1,33 @@
 from django.urls import path
-from .views import ListUsers,GoalsView,ListProgressView,RegsisterUser,ProgressView,WeeklySummaryView,MonthlySummaryView
+from .async_views import AsyncGoalsView,AsyncProgressView,AsyncWeeklySummaryView,AsyncMonthlySummaryView
+from .views import ListUsers,GoalsView,ListProgressView,RegsisterUser,ProgressView,ProgressAddTimeView,BulkProgressView,WeeklySummaryView,MonthlySummaryView,DashboardSummaryView,MetricsView
 
 urlpatterns=[
-    path('users/',ListUsers.as_view()),
+    path('users/',ListUsers.as_view(),name="users"),
     path('goals/<int:goalNum>/progress/',ProgressView.as_view(),name="progress"),
-    path('goals/<int:goalNum>/progress/<int:progressNum>',ProgressView.as_view(),name="goals"),
+    path('goals/progress/bulk/',BulkProgressView.as_view(),name="progress_bulk"),
+    path('goals/<int:goalNum>/progress/<int:progressNum>',ProgressView.as_view(),name="progress_detail"),
+    path('goals/<int:goalNum>/progress/<int:progressNum>/add_time/',ProgressAddTimeView.as_view(),name="progress_add_time"),
 
     path('goals/',GoalsView.as_view(),name="goals"),
     path('goals/<int:goalNum>',GoalsView.as_view(),name="goals"),
-    path('progress/',ListProgressView.as_view()),
+    path('progress/',ListProgressView.as_view(),name="progress_list"),
     path('summary/weekly/', WeeklySummaryView.as_view(), name='weekly_summary'),
     path('summary/weekly/<int:goalNum>/',WeeklySummaryView.as_view(), name='weekly_summary_goal'),
     path('summary/monthly/', MonthlySummaryView.as_view(), name='monthly_summary'),
     path('summary/monthly/<int:goalNum>/', MonthlySummaryView.as_view(), name='monthly_summary_goal'),
-    path('user/',RegsisterUser.as_view(),name="register-user")
+    path('summary/dashboard/', DashboardSummaryView.as_view(), name='dashboard_summary'),
+    path('user/',RegsisterUser.as_view(),name="register-user"),
+    path('metrics/',MetricsView.as_view(),name="metrics"),
+
+    # Async (ASGI) variants of the read views
+    path('async/goals/',AsyncGoalsView.as_view(),name="async_goals"),
+    path('async/goals/<int:goalNum>',AsyncGoalsView.as_view(),name="async_goals"),
+    path('async/goals/<int:goalNum>/progress/',AsyncProgressView.as_view(),name="async_progress"),
+    path('async/goals/<int:goalNum>/progress/<int:progressNum>',AsyncProgressView.as_view(),name="async_progress_detail"),
+    path('async/summary/weekly/',AsyncWeeklySummaryView.as_view(),name="async_weekly_summary"),
+    path('async/summary/weekly/<int:goalNum>/',AsyncWeeklySummaryView.as_view(),name="async_weekly_summary_goal"),
+    path('async/summary/monthly/',AsyncMonthlySummaryView.as_view(),name="async_monthly_summary"),
+    path('async/summary/monthly/<int:goalNum>/',AsyncMonthlySummaryView.as_view(),name="async_monthly_summary_goal"),
     
 ]
\ No newline at end of file
@@ -1,83 +1,56 @@
 from rest_framework.views import APIView
 from .throttling import TierUserThrottle
-from .models import Goal,Progress,CustomUser
+from .models import Goal,Progress,CustomUser,ProgressRollup
 from rest_framework import status
-from django.db.models import Sum,Value,ExpressionWrapper, DecimalField
-from django.db.models.functions import TruncWeek,Coalesce,Extract,TruncMonth
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .serializers import GoalSerializer,ProgressSerializer,WeeklySummarySerializer,MonthlySummarySerializer
-from .pagination import CustomPagination
-from django.core.cache import cache
+from .serializers import GoalSerializer,ProgressSerializer,BulkProgressEntrySerializer,AddTimeSerializer
+from .summaries import build_summary,build_dashboard,dashboard_window
+from .fast_serializers import FastGoalSerializer,FastProgressSerializer
+from .caching import cached_summary,summary_cache_key,log_cache_status
+from .conditional import conditional_get
+from .pagination import CustomPagination,KeysetPagination
+from .streaming import STREAM_FORMATS,stream_rows
+from django.http import Http404,StreamingHttpResponse,HttpResponse,JsonResponse
+from django.views import View
+from .metrics import registry,cache_tier_stats,cache_tier_prometheus
 from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date,parse_datetime
+from datetime import datetime,time
 import logging
 
 logger=logging.getLogger(__name__)
 
 
+def goal_id_for_number(user, goalNum):
+    """Resolve a user's 1-based goalNum to a goal id with one indexed lookup (None if unknown)."""
+    return Goal.objects.filter(user=user, ordinal=goalNum).values_list('id', flat=True).first()
+
+
 class MonthlySummaryView(APIView):
-    permission_classes = [IsAuthenticated]#remove IsAuthenticated temporarily for benchmarking
+    permission_classes = [IsAuthenticated]
 
+    @conditional_get
     def get(self, request, goalNum=None):
-        #temporary code block for benchmarking
-        """
-        user_id=request.query_params.get('user_id',1)
-        try:
-            user_id = int(user_id)
-        except ValueError:
-            return Response({'error': 'Invalid user_id'}, status=status.HTTP_400_BAD_REQUEST)
-        user=CustomUser.objects.get(id=user_id)
-        """
-        #change request.user.id to user_id for benchmarking
-        cache_key = f"monthly_summary_{request.user.id}_{goalNum if goalNum is not None else 'all'}"
-        cached_data=cache.get(cache_key)
-        if cached_data is not None:
-            logger.info(f"Cache hit for key: {cache_key}",extra={'cache_status':'hit'})
-            return Response(cached_data)
-        
-        logger.info(f'Cache miss for key:{cache_key}',extra={'cache_status':'miss'})
-        try:
-            # Filter goals for the authenticated user, ordered consistently
-            #for benchmarking,filter by user=user replacing user=request.user
-            goals = Goal.objects.filter(user=request.user).order_by('id')
-            
+        cache_key = summary_cache_key('monthly', request.user.id, goalNum)
+
+        def compute():
             if goalNum is not None:
-                # Validate goalNum (1-based index)
-                if goalNum < 1 or goalNum > goals.count():
-                    return Response(
-                        {'error': 'Invalid goal number'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                # Get the nth goal (0-based index internally)
-                goal = goals[goalNum - 1]
-                queryset = Progress.objects.filter(goal=goal)
+                # goalNum is the goal's stored 1-based ordinal for this user
+                goal_id = goal_id_for_number(request.user, goalNum)
+                if goal_id is None:
+                    return None
             else:
                 # If no goalNum, aggregate across all goals for the user
-                #for benchmarking,filter by goal__user=user by replacing goal__user=request.user 
-                queryset = Progress.objects.filter(goal__user=request.user)
-
-            # Monthly summary: group by month, sum logged_hours (converted to hours)
-            monthly_data = queryset.annotate(
-                month_start=TruncMonth('created_at')
-            ).values('month_start').annotate(
-                total_hours=Coalesce(
-                    ExpressionWrapper(
-                        Sum(Extract('logged_hours', 'epoch') / 3600.0),  # Convert seconds to hours
-                        output_field=DecimalField(max_digits=10, decimal_places=2)
-                    ),
-                    Value(0.0, output_field=DecimalField(max_digits=10, decimal_places=2)),
-                    output_field=DecimalField(max_digits=10, decimal_places=2)
-                )
-            ).order_by('month_start')
-
-            # Serialize the data
-            serializer = MonthlySummarySerializer(monthly_data, many=True)
-
-            cache_timeout=getattr(settings,'MONTHLY_SUMMARY_CACHE_TIMEOUT',300)
+                goal_id = None
 
+            # Monthly summary: read the per-month rollups instead of scanning Progress
+            return build_summary(request.user.id, ProgressRollup.Granularity.MONTH, goal_id)
 
-            cache.set(cache_key,serializer.data,timeout=cache_timeout)
-            return Response(serializer.data)
+        try:
+            cache_timeout=getattr(settings,'MONTHLY_SUMMARY_CACHE_TIMEOUT',300)
+            data,hit=cached_summary(cache_key,compute,cache_timeout)
         except IndexError:
             return Response(
                 {'error': 'Goal not found'},
@@ -88,69 +61,33 @@ class MonthlySummaryView(APIView):
                 {'error': f'Server error: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        log_cache_status(logger,cache_key,hit=hit)
+        if data is None:
+            return Response(
+                {'error': 'Invalid goal number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(data)
 
 class WeeklySummaryView(APIView):
-    #refer the comments in MonthlySummaryView for changes before benchmarking
     permission_classes = [IsAuthenticated]
 
+    @conditional_get
     def get(self, request, goalNum=None):
-        """
-        user_id=request.query_params.get('user_id',1)
-        try:
-            user_id = int(user_id)
-        except ValueError:
-            return Response({'error': 'Invalid user_id'}, status=status.HTTP_400_BAD_REQUEST)
-        user=CustomUser.objects.get(id=user_id)
-        """
-        cache_key = f"weekly_summary_{request.user.id}_{goalNum if goalNum is not None else 'all'}"
-        cached_data=cache.get(cache_key)
-        if cached_data is not None:
-            logger.info(f"Cache hit for key: {cache_key}",extra={'cache_status':'hit'})
-            return Response(cached_data)
-        
-        logger.info(f'Cache miss for key:{cache_key}',extra={'cache_status':'miss'})
-        try:
-            
-            goals = Goal.objects.filter(user=request.user).order_by('id')
-            
+        cache_key = summary_cache_key('weekly', request.user.id, goalNum)
+
+        def compute():
             if goalNum is not None:
-                
-                if goalNum < 1 or goalNum > goals.count():
-                    return Response(
-                        {'error': 'Invalid goal number'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                goal = goals[goalNum - 1]
-                queryset = Progress.objects.filter(goal=goal)
+                goal_id = goal_id_for_number(request.user, goalNum)
+                if goal_id is None:
+                    return None
             else:
-                
-                queryset = Progress.objects.filter(goal__user=request.user)
+                goal_id = None
+            return build_summary(request.user.id, ProgressRollup.Granularity.WEEK, goal_id)
 
-            
-            weekly_data = queryset.annotate(
-                week_start=TruncWeek('created_at')
-            ).values('week_start').annotate(
-                total_hours=Coalesce(
-                    ExpressionWrapper(
-                        # Extract hours from interval sum
-                        Sum(
-                            Extract('logged_hours', 'epoch') / 3600.0  # Convert seconds to hours
-                        ),
-                        output_field=DecimalField(max_digits=10, decimal_places=2)
-                    ),
-                    Value(0.0, output_field=DecimalField(max_digits=10, decimal_places=2)),
-                    output_field=DecimalField(max_digits=10, decimal_places=2)
-                )
-            ).order_by('week_start')
-
-            
-            serializer = WeeklySummarySerializer(weekly_data, many=True)
+        try:
             cache_timeout=getattr(settings,'WEEKLY_SUMMARY_CACHE_TIMEOUT',300)
-
-
-            cache.set(cache_key,serializer.data,timeout=cache_timeout)
-            return Response(serializer.data)
+            data,hit=cached_summary(cache_key,compute,cache_timeout)
         except IndexError:
             return Response(
                 {'error': 'Goal not found'},
@@ -161,8 +98,56 @@ class WeeklySummaryView(APIView):
                 {'error': f'Server error: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        log_cache_status(logger,cache_key,hit=hit)
+        if data is None:
+            return Response(
+                {'error': 'Invalid goal number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(data)
+
+
+def parse_since(value):
+    """A ``since`` query value (ISO date or datetime) as an aware datetime; None if invalid."""
+    try:
+        moment=parse_datetime(value)
+        if moment is None:
+            day=parse_date(value)
+            moment=datetime.combine(day,time()) if day is not None else None
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment=timezone.make_aware(moment)
+    return moment
 
-            
+
+class DashboardSummaryView(APIView):
+    """Weekly and monthly totals, per-category totals and per-goal completion in one response."""
+    permission_classes = [IsAuthenticated]
+
+    @conditional_get
+    def get(self, request):
+        since = request.query_params.get('since')
+        window = None
+        if since is not None:
+            since = parse_since(since)
+            if since is None:
+                return Response({'error': 'since must be an ISO date or datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            # Every since with the same first week and month shares a cache entry: the
+            # payload only depends on which buckets it starts from.
+            buckets = dashboard_window(since)
+            window = '-'.join(
+                buckets[granularity].strftime('%Y%m%d')
+                for granularity in (ProgressRollup.Granularity.WEEK, ProgressRollup.Granularity.MONTH)
+            )
+
+        cache_key = summary_cache_key('dashboard', request.user.id, window=window)
+        data, hit = cached_summary(
+            cache_key, lambda: build_dashboard(request.user.id, since),
+            getattr(settings, 'DASHBOARD_SUMMARY_CACHE_TIMEOUT', 300),
+        )
+        log_cache_status(logger, cache_key, hit=hit)
+        return Response(data)
 
 
 class ListUsers(APIView):
@@ -173,8 +158,10 @@ class ListUsers(APIView):
 class GoalsView(APIView):
     permission_classes=[IsAuthenticated]
     pagination_class=CustomPagination
+    cursor_pagination_class=KeysetPagination
     
     
+    @conditional_get
     def get(self,request,goalNum=None):
         
         goals = Goal.objects.filter(user=request.user)
@@ -190,20 +177,27 @@ class GoalsView(APIView):
 
         if goalNum:
             try:
-                goal = goals.order_by('id')[goalNum-1] 
+                if category or is_complete:
+                    # Numbering within a filtered subset has no stored ordinal to use.
+                    goal = goals.order_by('id')[goalNum-1]
+                else:
+                    goal = goals.get(ordinal=goalNum)
                 serializer = GoalSerializer(goal) 
                 return Response(serializer.data)
-            except IndexError:
+            except (IndexError, Goal.DoesNotExist):
                 return Response({"error": "Goal not found"}, status=status.HTTP_404_NOT_FOUND)
         else:
-            paginator=self.pagination_class()
-            page=paginator.paginate_queryset(goals,request)
+            if self.cursor_pagination_class.requested(request):
+                paginator=self.cursor_pagination_class()
+            else:
+                goals=goals.order_by('id')
+                paginator=self.pagination_class()
+            # Read-only list: values() rows through the fast serializer, same JSON as GoalSerializer.
+            rows=FastGoalSerializer.values(goals)
+            page=paginator.paginate_queryset(rows,request)
             if page is not None:
-                serializer = GoalSerializer(page, many=True)
-                return paginator.get_paginated_response(serializer.data)
-            serializer = GoalSerializer(goals, many=True)
-                     
-            return Response(serializer.data)
+                return paginator.get_paginated_response(FastGoalSerializer.serialize(page))
+            return Response(FastGoalSerializer.serialize(rows))
 
     def post(self, request):
         serializer = GoalSerializer(data=request.data)
@@ -216,31 +210,36 @@ class GoalsView(APIView):
 class ProgressView(APIView):
     permission_classes=[IsAuthenticated]
     throttle_classes=[TierUserThrottle]
+    cursor_pagination_class=KeysetPagination
     
+    @conditional_get
     def get(self, request, goalNum, progressNum=None):
-        goals = Goal.objects.filter(user=request.user).order_by("id")
-        try:
-            goal = goals[goalNum - 1]
-        except IndexError:
+        goal_id = goal_id_for_number(request.user, goalNum)
+        if goal_id is None:
             return Response({"error": "invalid goalNum"}, status=404)
 
-        progresses = Progress.objects.filter(goal=goal).order_by("id")
+        progresses = Progress.objects.filter(goal_id=goal_id).order_by("id")
 
         if progressNum:
             try:
-                progress = progresses[progressNum - 1]
-            except IndexError:
+                progress = progresses.get(ordinal=progressNum)
+            except Progress.DoesNotExist:
                 return Response({"error": "invalid progressNum"}, status=404)
             return Response(ProgressSerializer(progress).data, status=200)
 
-        return Response(ProgressSerializer(progresses, many=True).data, status=200)
+        rows = FastProgressSerializer.values(progresses)
+        if self.cursor_pagination_class.requested(request):
+            paginator = self.cursor_pagination_class()
+            page = paginator.paginate_queryset(rows, request)
+            return paginator.get_paginated_response(FastProgressSerializer.serialize(page))
+
+        return Response(FastProgressSerializer.serialize(rows), status=200)
 
     
     def post(self,request,goalNum):
-        goals=Goal.objects.filter(user=request.user).order_by("id")
         try:
-            goal=goals[goalNum-1]
-        except IndexError:
+            goal=Goal.objects.get(user=request.user,ordinal=goalNum)
+        except Goal.DoesNotExist:
             return Response({"error":"invalid goalNum"},status=404)
         
         serializer=ProgressSerializer(data=request.data)
@@ -252,17 +251,16 @@ class ProgressView(APIView):
         return Response(serializer.errors,status=400)
     
     def patch(self, request, goalNum, progressNum):
-            goals = Goal.objects.filter(user=request.user).order_by("id")
             try:
-                goal = goals[goalNum - 1]
-            except IndexError:
+                goal = Goal.objects.get(user=request.user, ordinal=goalNum)
+            except Goal.DoesNotExist:
                 return Response({"error": "invalid goalNum"}, status=404)
 
-            progresses = Progress.objects.filter(goal=goal).order_by("id")
             try:
-                progress = progresses[progressNum - 1]
-            except IndexError:
+                progress = Progress.objects.get(goal=goal, ordinal=progressNum)
+            except Progress.DoesNotExist:
                 return Response({"error": "invalid progressNum"}, status=404)
+            progress.goal = goal
 
             
             progress.logged_hours = request.data.get("logged_hours", progress.logged_hours)
@@ -276,9 +274,93 @@ class ProgressView(APIView):
 
     
 
+class ProgressAddTimeView(APIView):
+    """Add (or, with a negative duration, remove) logged time on one progress entry.
+
+    Unlike PATCH this never reads the row first: the increment is a single
+    conditional UPDATE, so two devices logging time at once both count.
+    """
+    permission_classes=[IsAuthenticated]
+    throttle_classes=[TierUserThrottle]
+
+    def post(self,request,goalNum,progressNum):
+        serializer=AddTimeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,status=400)
+
+        progress=Progress.add_time(request.user.id,goalNum,progressNum,serializer.validated_data["logged_hours"])
+        if progress is None:
+            if not Progress.objects.filter(goal__user_id=request.user.id,goal__ordinal=goalNum,ordinal=progressNum).exists():
+                return Response({"error":"invalid goalNum or progressNum"},status=404)
+            return Response({"error":"logged_hours cannot go below zero"},status=400)
+        return Response(ProgressSerializer(progress).data,status=200)
+
+
+class BulkProgressView(APIView):
+    """Log many progress entries, possibly across several goals, in one request.
+
+    Accepts a list (or ``{"entries": [...]}``) of progress payloads, each with the
+    ``goalNum`` it belongs to. The whole batch costs one throttle slot and is
+    inserted in a single transaction.
+    """
+    permission_classes=[IsAuthenticated]
+    throttle_classes=[TierUserThrottle]
+    max_batch_size=500
+
+    def post(self,request):
+        entries=request.data.get("entries") if isinstance(request.data,dict) else request.data
+        if not isinstance(entries,list) or not entries:
+            return Response({"error":"expected a non-empty list of entries"},status=400)
+        if len(entries)>self.max_batch_size:
+            return Response({"error":f"at most {self.max_batch_size} entries per batch"},status=400)
+
+        serializer=BulkProgressEntrySerializer(data=entries,many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors,status=400)
+
+        goal_numbers={entry["goalNum"] for entry in serializer.validated_data}
+        goal_ids=dict(
+            Goal.objects.filter(user=request.user,ordinal__in=goal_numbers).values_list("ordinal","id")
+        )
+        missing=sorted(goal_numbers-goal_ids.keys())
+        if missing:
+            return Response({"error":"invalid goalNum","goalNums":missing},status=404)
+
+        progresses=[]
+        for entry in serializer.validated_data:
+            entry=dict(entry)
+            progresses.append(Progress(goal_id=goal_ids[entry.pop("goalNum")],**entry))
+        created=Progress.bulk_log(progresses,request.user.id)
+        return Response(ProgressSerializer(created,many=True).data,status=201)
+
+
 class ListProgressView(APIView):
+    permission_classes=[IsAuthenticated]
+    stream_chunk_size=2000
+
     def get(self,request):
-        progress=Progress.objects.all().values('progress','goal__goal_name')
+        # Only ever the caller's own entries.
+        progress=Progress.objects.filter(goal__user=request.user)
+        goal=request.query_params.get('goal')
+        if goal is not None:
+            try:
+                goal_id=goal_id_for_number(request.user,int(goal))
+            except ValueError:
+                return Response({"error":"goal must be a goalNum"},status=status.HTTP_400_BAD_REQUEST)
+            # An unknown goalNum filters everything out, like any other filter.
+            progress=progress.filter(goal_id=goal_id) if goal_id is not None else progress.none()
+        progress=progress.values('progress','goal__goal_name')
+
+        stream_format=request.query_params.get('stream')
+        if stream_format is not None:
+            if stream_format not in STREAM_FORMATS:
+                return Response({"error":"stream must be one of: "+", ".join(STREAM_FORMATS)},status=status.HTTP_400_BAD_REQUEST)
+            rows=progress.order_by('id').iterator(chunk_size=self.stream_chunk_size)
+            return StreamingHttpResponse(
+                stream_rows(rows,stream_format),
+                content_type=STREAM_FORMATS[stream_format],
+            )
+
         progress=list(progress)
         return Response(progress)
 
@@ -316,7 +398,24 @@ class RegsisterUser(APIView):
             },
             status=status.HTTP_201_CREATED
         )
-        
 
-    
-    
+
+class MetricsView(View):
+    """Per-endpoint request metrics and two-tier cache hit counts for this process,
+    as Prometheus text or JSON (``?output=json``).
+
+    Scrapers must send ``METRICS_TOKEN`` as ``Authorization: Bearer <token>``.
+    Without a token the endpoint only exists with DEBUG on.
+    """
+    def get(self,request):
+        token=getattr(settings,'METRICS_TOKEN',None)
+        if not token:
+            if not settings.DEBUG:
+                raise Http404
+        elif request.headers.get('Authorization')!=f"Bearer {token}":
+            return JsonResponse({"error":"invalid metrics token"},status=403)
+        tiers=cache_tier_stats()
+        if request.GET.get('output')=='json':
+            return JsonResponse({**registry.snapshot(),'cache_tiers':tiers})
+        body=registry.prometheus()+cache_tier_prometheus(tiers)
+        return HttpResponse(body,content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,74 @@
+"""``DATABASES['default']`` for a performance profile (``DB_PROFILE``).
+
+``tuned`` (the default):
+
+- PostgreSQL: Django's native connection pool (psycopg 3), one pool per
+  gunicorn/celery process, sized by ``DB_POOL_MIN_SIZE``/``DB_POOL_MAX_SIZE``
+  and waiting at most ``DB_POOL_TIMEOUT`` seconds for a free connection.
+  Connections are checked before they are handed out. ``DB_POOL_MAX_SIZE=0``
+  keeps persistent per-thread connections (``DB_CONN_MAX_AGE``) instead, with
+  health checks.
+- SQLite: WAL journal (readers never block the writer or each other),
+  ``synchronous=NORMAL``, memory-mapped reads, a bigger page cache and in-memory
+  temp tables, set on every new connection. Write transactions start
+  ``IMMEDIATE`` and wait up to ``DB_SQLITE_TIMEOUT`` seconds for the write lock
+  instead of failing with "database is locked".
+
+``baseline`` is the configuration before profiles existed, kept for
+comparison (see the benchmark_database command).
+"""
+import dj_database_url
+
+PROFILES=('tuned','baseline')
+SQLITE_NAME='mydatabase'
+POSTGRES_ENGINE='django.db.backends.postgresql'
+SQLITE_ENGINE='django.db.backends.sqlite3'
+
+SQLITE_PRAGMAS=(
+    ('journal_mode','WAL'),
+    # Durable at every checkpoint; a power loss can drop the last commits, never corrupt.
+    ('synchronous','NORMAL'),
+    ('mmap_size',256*1024*1024),
+    # Negative means KiB: 64 MiB per connection.
+    ('cache_size',-64*1024),
+    ('temp_store','MEMORY'),
+)
+
+
+def sqlite_init_command(pragmas=SQLITE_PRAGMAS):
+    return ';'.join(f"PRAGMA {name}={value}" for name,value in pragmas)
+
+
+def database_config(url=None,profile='tuned',environ=None):
+    """The default database's settings dict for ``DATABASE_URL`` (SQLite file when unset)."""
+    environ=environ if environ is not None else {}
+    if profile not in PROFILES:
+        raise ValueError(f"DB_PROFILE must be one of {', '.join(PROFILES)}, not {profile!r}")
+
+    if profile=='baseline':
+        if url:
+            return dj_database_url.parse(url,conn_max_age=600)
+        return {'ENGINE':SQLITE_ENGINE,'NAME':SQLITE_NAME}
+
+    conn_max_age=int(environ.get('DB_CONN_MAX_AGE',600))
+    if url:
+        config=dj_database_url.parse(url,conn_max_age=conn_max_age,conn_health_checks=True)
+    else:
+        config={'ENGINE':SQLITE_ENGINE,'NAME':SQLITE_NAME,'CONN_MAX_AGE':conn_max_age,'CONN_HEALTH_CHECKS':True}
+    options=config.setdefault('OPTIONS',{})
+
+    if config['ENGINE']==POSTGRES_ENGINE:
+        pool_max_size=int(environ.get('DB_POOL_MAX_SIZE',4))
+        if pool_max_size>0:
+            # The pool replaces persistent connections; Django rejects both at once.
+            config['CONN_MAX_AGE']=0
+            options['pool']={
+                'min_size':min(int(environ.get('DB_POOL_MIN_SIZE',1)),pool_max_size),
+                'max_size':pool_max_size,
+                'timeout':float(environ.get('DB_POOL_TIMEOUT',10)),
+            }
+    elif config['ENGINE']==SQLITE_ENGINE:
+        options['init_command']=sqlite_init_command()
+        options['transaction_mode']='IMMEDIATE'
+        options['timeout']=float(environ.get('DB_SQLITE_TIMEOUT',20))
+    return config
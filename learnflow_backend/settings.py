@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -84,21 +85,16 @@ WSGI_APPLICATION = 'learnflow_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-import dj_database_url
+from .database import database_config
 
-# Database configuration
+# Database configuration: PostgreSQL from DATABASE_URL, else a local SQLite file.
+# DB_PROFILE=tuned (default) pools Postgres connections and tunes SQLite for
+# concurrent readers; DB_PROFILE=baseline is the untuned setup (see database.py).
 DATABASE_URL = os.environ.get('DATABASE_URL')
-if DATABASE_URL:
-    DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
-    }
-else:
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': 'mydatabase',
-        }
-    }
+DB_PROFILE = os.environ.get('DB_PROFILE', 'tuned')
+DATABASES = {
+    'default': database_config(DATABASE_URL, DB_PROFILE, os.environ)
+}
 
 
 
@@ -148,8 +144,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK={
     'DEFAULT_AUTHENTICATION_CLASSES':(
-         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+         'core.authentication.CachedJWTAuthentication',
+    ),
+    # Same bytes as DRF's JSONRenderer, encoded with orjson when it is installed.
+    'DEFAULT_RENDERER_CLASSES':(
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+}
+
+SIMPLE_JWT={
+    'TOKEN_OBTAIN_SERIALIZER':'core.serializers.TierTokenObtainPairSerializer',
 }
 
 #Cache config
@@ -158,11 +163,56 @@ CACHES={
     'default':{
         'BACKEND':'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION':'unique-learnflow'
-    }
+    },
+    # Summary payloads: a per-process LRU (L1) in front of the shared 'default'
+    # alias (L2). Generations, throttle counters and locks stay on 'default'.
+    'tiered':{
+        'BACKEND':'core.cache_backends.TwoTierCache',
+        'LOCATION':'learnflow-l1',
+        'OPTIONS':{
+            'SHARED':'default',
+            'MAX_ENTRIES':int(os.environ.get('L1_CACHE_MAX_ENTRIES',1000)),
+            'LOCAL_TIMEOUT':int(os.environ.get('L1_CACHE_TIMEOUT',5)),
+        },
+    },
 }
 
-MONTHLY_SUMMARY_CACHE_TIMEOUT=300
-WEEKLY_SUMMARY_CACHE_TIMEOUT=300
+# Share the cache across gunicorn workers when Redis is available.
+SHARED_CACHE=bool(os.environ.get('REDIS_CACHE_URL'))
+if SHARED_CACHE:
+    CACHES['default']={
+        'BACKEND':'django.core.cache.backends.redis.RedisCache',
+        'LOCATION':os.environ['REDIS_CACHE_URL'],
+    }
+
+# CachedJWTAuthentication keeps each user's auth row here instead of querying
+# it per request. Deactivation and deletes drop the row only from the shared
+# alias, so they apply in every process only with REDIS_CACHE_URL; on LocMem
+# other workers would keep authenticating the user until the row expires, so
+# it expires within seconds there.
+AUTH_USER_CACHE_ALIAS='default'
+AUTH_USER_CACHE_TIMEOUT=60*15 if SHARED_CACHE else 10
+
+SUMMARY_CACHE_ALIAS='tiered'
+
+# Summary keys carry a per-user generation that is bumped on every Goal/Progress
+# write, so entries never go stale and can live for a day -- but only when every
+# process shares 'default' (REDIS_CACHE_URL). On LocMem each gunicorn worker and
+# Celery process has its own generations, and a write seen by one leaves the
+# others' entries (and 304s) stale, so keep the old 5 minutes there.
+SUMMARY_CACHE_TIMEOUT=60*60*24 if SHARED_CACHE else 60*5
+MONTHLY_SUMMARY_CACHE_TIMEOUT=SUMMARY_CACHE_TIMEOUT
+WEEKLY_SUMMARY_CACHE_TIMEOUT=SUMMARY_CACHE_TIMEOUT
+DASHBOARD_SUMMARY_CACHE_TIMEOUT=SUMMARY_CACHE_TIMEOUT
+
+# Stampede protection (core.caching.cached_summary): one request per key
+# recomputes under a lock held at most SUMMARY_CACHE_LOCK_TIMEOUT seconds, the
+# others wait up to SUMMARY_CACHE_LOCK_WAIT seconds for its result. Entries are
+# refreshed early with a probability scaled by SUMMARY_CACHE_EARLY_REFRESH_BETA
+# (0 turns early refresh off).
+SUMMARY_CACHE_LOCK_TIMEOUT=10
+SUMMARY_CACHE_LOCK_WAIT=2
+SUMMARY_CACHE_EARLY_REFRESH_BETA=1.0
 
 LOGGING={
     'version':1,
@@ -180,11 +230,16 @@ LOGGING={
         }
     },
     'handlers':{
+        # JSON lines written by a background thread in batches; logging calls
+        # only enqueue. See core/log_handlers.py.
         'file':{
             'level':'INFO',
-            'class':'logging.FileHandler',
+            'class':'core.log_handlers.QueuedRotatingFileHandler',
             'filename':'caches.log',
-            'formatter':'verbose'
+            'maxBytes':10*1024*1024,
+            'backupCount':5,
+            'batch_size':256,
+            'queue_size':10000,
         },
         'console':{
             'level':'INFO',
@@ -233,8 +288,26 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.send_reminder_emails',
         'schedule': crontab(hour=0, minute=0),
     },
+    'warm-summary-caches': {
+        'task': 'core.tasks.warm_summary_caches',
+        'schedule': crontab(minute='*/30'),
+    },
 }
 
+# The beat task fans reminders out as this many user-id range shards.
+REMINDER_SHARD_COUNT = int(os.environ.get('REMINDER_SHARD_COUNT', 8))
+
+# Summary warming: users with progress in the last SUMMARY_WARM_ACTIVE_WITHIN_HOURS
+# are warmed SUMMARY_WARM_BATCH_SIZE at a time, at most SUMMARY_WARM_RATE_LIMIT
+# batches per worker.
+SUMMARY_WARM_ACTIVE_WITHIN_HOURS = int(os.environ.get('SUMMARY_WARM_ACTIVE_WITHIN_HOURS', 24 * 7))
+SUMMARY_WARM_BATCH_SIZE = int(os.environ.get('SUMMARY_WARM_BATCH_SIZE', 50))
+SUMMARY_WARM_RATE_LIMIT = os.environ.get('SUMMARY_WARM_RATE_LIMIT', '30/m')
+
+# /api/metrics/ requires 'Authorization: Bearer <METRICS_TOKEN>'; unset, it is a
+# 404 unless DEBUG is on.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 